@@ -0,0 +1,256 @@
+"""Bibliography subsets that only contain the entries a project cites.
+
+A typical technote cites a few dozen entries, but the lsst-texmf bib files
+that it vendors contain tens of thousands. `write_bib_subset` writes a bib
+file that only contains the cited entries (and the entries they
+crossreference), so that sphinxcontrib-bibtex has much less to parse.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "CITED_BIB_FILENAME",
+    "CITE_ROLE_PATTERN",
+    "find_cited_keys",
+    "find_cited_keys_in_dir",
+    "find_keys_missing_from_bib",
+    "find_source_files",
+    "write_bib_subset",
+)
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, List, Set, Tuple, Union
+
+from .utils import atomic_write
+
+CITED_BIB_FILENAME = "lsstbib-cited.bib"
+"""Default name of the bib file, in a technote's root directory, that
+contains the cited subset of the lsst-texmf bib files.
+"""
+
+CITE_ROLE_PATTERN = re.compile(
+    r"""
+    (?:
+        :(?:foot)?cite(?::[a-z]+)?:  # reStructuredText role
+        |
+        \{(?:foot)?cite(?::[a-z]+)?\}  # MyST role
+    )
+    `(?P<keys>[^`]+)`
+    """,
+    re.VERBOSE,
+)
+"""Regular expression that matches sphinxcontrib-bibtex citation roles,
+such as ``:cite:`key``` and ``:cite:p:`key1,key2```, in reStructuredText
+and MyST Markdown.
+"""
+
+_BIB_ENTRY_KEY_PATTERN = re.compile(
+    r"^\s*@\s*(?!(?:comment|preamble|string)\b)\w+\s*[{(]\s*([^,\s]+)\s*,",
+    re.MULTILINE | re.IGNORECASE,
+)
+"""The key of an entry in a bib file, such as ``Smith2020`` in
+``@article{Smith2020,``.
+"""
+
+_PRE_POST_TEXT_PATTERN = re.compile(r"\{[^}]*\}")
+"""Pre- and post-text in citation roles, such as ``{see}key{p. 2}``."""
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def find_cited_keys(
+    paths: Iterable[PathLike], encoding: str = "utf-8"
+) -> Set[str]:
+    """Find the bibliography keys cited in source files.
+
+    Parameters
+    ----------
+    paths : iterable of path-like
+        Paths of reStructuredText or Markdown source files.
+    encoding : `str`, optional
+        Encoding of the source files.
+
+    Returns
+    -------
+    keys : `set` of `str`
+        The cited keys.
+    """
+    keys: Set[str] = set()
+    for path in paths:
+        text = Path(path).read_text(encoding=encoding)
+        for match in CITE_ROLE_PATTERN.finditer(text):
+            role_keys = _PRE_POST_TEXT_PATTERN.sub("", match.group("keys"))
+            keys.update(k.strip() for k in role_keys.split(",") if k.strip())
+    return keys
+
+
+def find_source_files(
+    root_dir: PathLike, suffixes: Tuple[str, ...] = (".rst", ".md")
+) -> List[str]:
+    """Find the source files of a project.
+
+    Parameters
+    ----------
+    root_dir : path-like
+        Root directory of the project. Hidden directories and ``_build``
+        directories are skipped.
+    suffixes : `tuple` of `str`, optional
+        File name suffixes of source files.
+
+    Returns
+    -------
+    paths : `list` of `str`
+        Paths of the source files, sorted.
+    """
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames[:] = [
+            d for d in dirnames if not d.startswith(".") and d != "_build"
+        ]
+        for filename in filenames:
+            if filename.endswith(suffixes):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+def find_cited_keys_in_dir(
+    root_dir: PathLike,
+    suffixes: Tuple[str, ...] = (".rst", ".md"),
+    encoding: str = "utf-8",
+) -> Set[str]:
+    """Find the bibliography keys cited in the source files of a project.
+
+    Parameters
+    ----------
+    root_dir : path-like
+        Root directory of the project. Hidden directories and ``_build``
+        directories are skipped.
+    suffixes : `tuple` of `str`, optional
+        File name suffixes of source files.
+    encoding : `str`, optional
+        Encoding of the source files.
+
+    Returns
+    -------
+    keys : `set` of `str`
+        The cited keys.
+    """
+    return find_cited_keys(
+        find_source_files(root_dir, suffixes=suffixes), encoding=encoding
+    )
+
+
+def find_keys_missing_from_bib(
+    keys: Iterable[str],
+    bibfiles: Iterable[PathLike],
+    encoding: str = "utf-8-sig",
+) -> List[str]:
+    """Find the cited keys that aren't in any of a set of bib files, such as
+    a subset that was written before a new reference was cited.
+
+    Parameters
+    ----------
+    keys : iterable of `str`
+        The cited keys (see `find_cited_keys_in_dir`).
+    bibfiles : iterable of path-like
+        Paths of the bib files.
+    encoding : `str`, optional
+        Encoding of the bib files.
+
+    Returns
+    -------
+    missing_keys : `list` of `str`
+        Cited keys that aren't in the bib files, sorted.
+
+    Notes
+    -----
+    The entry keys are found with a regular expression, rather than by
+    parsing the bib files, so that this check is fast enough to run at the
+    start of a build. Like BibTeX, keys are compared case-insensitively.
+    """
+    bib_keys: Set[str] = set()
+    for bibfile in bibfiles:
+        text = Path(bibfile).read_text(encoding=encoding)
+        bib_keys.update(
+            key.lower() for key in _BIB_ENTRY_KEY_PATTERN.findall(text)
+        )
+    return sorted(key for key in set(keys) if key.lower() not in bib_keys)
+
+
+def write_bib_subset(
+    bibfiles: Iterable[PathLike],
+    keys: Iterable[str],
+    output: PathLike,
+    encoding: str = "utf-8-sig",
+) -> Tuple[List[str], List[str]]:
+    """Write the cited entries of bib files, and the entries they
+    crossreference, to a new bib file.
+
+    Parameters
+    ----------
+    bibfiles : iterable of path-like
+        Paths of the bib files, in the order that they are parsed.
+    keys : iterable of `str`
+        The cited keys (see `find_cited_keys_in_dir`).
+    output : path-like
+        Path of the bib file to write. The file is written atomically, and
+        only if its content changed.
+    encoding : `str`, optional
+        Encoding of the bib files.
+
+    Returns
+    -------
+    written_keys : `list` of `str`
+        Keys of the entries in the subset, including crossreferenced entries.
+    missing_keys : `list` of `str`
+        Cited keys that aren't in the bib files, sorted.
+    """
+    from pybtex.database import BibliographyData
+    from pybtex.database.input.bibtex import Parser
+
+    parser = Parser(encoding)
+    for bibfile in bibfiles:
+        parser.parse_file(str(bibfile))
+    entries = parser.data.entries
+
+    # Entry lookups are case-insensitive, like BibTeX
+    selected = {}
+    missing = []
+    for key in sorted(set(keys)):
+        if key in entries:
+            entry = entries[key]
+            selected[entry.key] = entry
+        else:
+            missing.append(key)
+
+    # Follow crossrefs, which BibTeX needs to appear after the entries that
+    # reference them
+    crossrefs = {}
+    pending = list(selected.values())
+    while pending:
+        entry = pending.pop()
+        target_key = entry.fields.get("crossref")
+        if target_key is None or target_key not in entries:
+            continue
+        target = entries[target_key]
+        if target.key in selected or target.key in crossrefs:
+            continue
+        crossrefs[target.key] = target
+        pending.append(target)
+
+    order = {key: i for i, key in enumerate(entries.keys())}
+    subset_keys = sorted(selected, key=order.__getitem__) + sorted(
+        crossrefs, key=order.__getitem__
+    )
+    subset = BibliographyData(
+        entries=[(k, entries[k]) for k in subset_keys],
+        preamble=parser.data.preamble_list,
+    )
+    content = subset.to_string("bibtex").encode("utf-8")
+
+    output = Path(output)
+    if not output.is_file() or output.read_bytes() != content:
+        atomic_write(output, content)
+    return subset_keys, missing
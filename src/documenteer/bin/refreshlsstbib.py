@@ -7,9 +7,15 @@ import logging
 import os
 import sys
 import urllib
+from concurrent.futures import ThreadPoolExecutor
 
-import requests
-
+from ..bibsubset import (
+    CITED_BIB_FILENAME,
+    find_cited_keys_in_dir,
+    write_bib_subset,
+)
+from ..requestsutils import get_pooled_session, get_pooled_session_stats
+from ..utils import atomic_write
 from ..version import __version__
 
 
@@ -36,6 +42,9 @@ def run():
 
     error_count = process_bib_files(args.dir)
 
+    if args.prune_to_citations:
+        prune_bib_files(args.dir, args.source_dir, args.subset_file)
+
     sys.exit(error_count)
 
 
@@ -60,6 +69,28 @@ def make_parser():
         help="Directory to download bib files into. Default is the current "
         "working directory.",
     )
+    parser.add_argument(
+        "--prune-to-citations",
+        action="store_true",
+        default=False,
+        help="After downloading, also write a bib file that only contains "
+        "the entries cited in the project's source files (and the entries "
+        "they crossreference). Technotes use this file instead of the full "
+        "bib files if it exists.",
+    )
+    parser.add_argument(
+        "--source-dir",
+        default=".",
+        help="Root directory of the project's reStructuredText and Markdown "
+        "source files, which are scanned for citations with "
+        "--prune-to-citations. Default is the current working directory.",
+    )
+    parser.add_argument(
+        "--subset-file",
+        default=CITED_BIB_FILENAME,
+        help="Path of the bib file written by --prune-to-citations. Default "
+        "is %(default)s.",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -71,20 +102,51 @@ def make_parser():
     return parser
 
 
-def process_bib_files(local_dir):
-    """Run the refresh-lsst-bib program's logic: iterates through bib URLs,
-    downloads the file from GitHub, and writes it to a local directory.
+ROOT_BLOB_URL = (
+    "https://raw.githubusercontent.com/lsst/lsst-texmf/master/"
+    "texmf/bibtex/bib/"
+)
+"""URL of the lsst-texmf directory containing the bib files."""
+
+BIB_FILENAMES = (
+    "books.bib",
+    "lsst-dm.bib",
+    "lsst.bib",
+    "refs.bib",
+    "refs_ads.bib",
+)
+"""Names of the bib files to download."""
+
+ETAG_SUFFIX = ".etag"
+"""Suffix of the sidecar files that store the ETag of each bib file."""
+
+
+def process_bib_files(local_dir, root_url=ROOT_BLOB_URL):
+    """Run the refresh-lsst-bib program's logic: downloads the bib files
+    from GitHub, concurrently, and writes them to a local directory.
 
     Parameters
     ----------
     local_dir : `str`
         Directory to write bib files into.
+    root_url : `str`, optional
+        URL of the directory containing the bib files.
 
     Returns
     -------
     error_count : `int`
         Number of download errors.
+
+    Notes
+    -----
+    The ETag of each downloaded file is saved in a sidecar file (with an
+    ``.etag`` suffix) so that later runs can make conditional requests. Bib
+    files are only rewritten if their content changed, and are written
+    atomically, so that tools that cache parsed bib files by modification
+    time stay warm.
     """
+    import requests
+
     logger = logging.getLogger(__name__)
 
     # check the output directory exists
@@ -92,38 +154,112 @@ def process_bib_files(local_dir):
         logger.error('Output directory "{}" does not exist'.format(local_dir))
         sys.exit(1)
 
-    root_blob_url = (
-        "https://raw.githubusercontent.com/lsst/lsst-texmf/"
-        "master/texmf/bibtex/bib/"
-    )
-    bib_filenames = [
-        "books.bib",
-        "lsst-dm.bib",
-        "lsst.bib",
-        "refs.bib",
-        "refs_ads.bib",
-    ]
+    def refresh(bib_filename):
+        url = urllib.parse.urljoin(root_url, bib_filename)
+        local_filename = os.path.join(local_dir, bib_filename)
+        try:
+            return url, _refresh_file(url, local_filename), None
+        except (requests.RequestException, OSError) as e:
+            return url, False, e
 
     error_count = 0
-    for bib_filename in bib_filenames:
-        url = urllib.parse.urljoin(root_blob_url, bib_filename)
-        logger.info("Downloading {}".format(url))
-        try:
-            content = _get_content(url)
-        except requests.HTTPError as e:
-            logger.exception(str(e))
-            logger.warning("Could not download {}".format(url))
-            error_count += 1
-            continue
+    with ThreadPoolExecutor(max_workers=len(BIB_FILENAMES)) as executor:
+        for url, updated, error in executor.map(refresh, BIB_FILENAMES):
+            if error is not None:
+                logger.error(str(error))
+                logger.warning("Could not download {}".format(url))
+                error_count += 1
+            elif updated:
+                logger.info("Updated from {}".format(url))
+            else:
+                logger.info("Unchanged: {}".format(url))
 
-        local_filename = os.path.join(local_dir, bib_filename)
-        with open(local_filename, "w") as f:
-            f.write(content)
+    stats = get_pooled_session_stats()
+    logger.debug(
+        "Made %d requests over %d connections",
+        stats["requests"],
+        stats["connections"],
+    )
 
     return error_count
 
 
-def _get_content(url):
-    response = requests.get(url)
+def _refresh_file(url, local_filename):
+    """Download a file, if it changed, with a conditional request.
+
+    Returns
+    -------
+    updated : `bool`
+        `True` if the local file was written.
+    """
+    etag_filename = local_filename + ETAG_SUFFIX
+    headers = {}
+    if os.path.isfile(local_filename) and os.path.isfile(etag_filename):
+        with open(etag_filename) as f:
+            etag = f.read().strip()
+        if etag:
+            headers["If-None-Match"] = etag
+
+    response = get_pooled_session().get(url, headers=headers, timeout=30.0)
+    if response.status_code == 304:
+        return False
     response.raise_for_status()
-    return response.text
+
+    content = response.content
+    updated = True
+    if os.path.isfile(local_filename):
+        with open(local_filename, "rb") as f:
+            updated = f.read() != content
+    if updated:
+        atomic_write(local_filename, content)
+
+    etag = response.headers.get("ETag")
+    if etag:
+        atomic_write(etag_filename, etag.encode("utf-8"))
+    elif os.path.isfile(etag_filename):
+        os.remove(etag_filename)
+    return updated
+
+
+def prune_bib_files(local_dir, source_dir, subset_file):
+    """Write the entries of the downloaded bib files that are cited by a
+    project to a single bib file.
+
+    Parameters
+    ----------
+    local_dir : `str`
+        Directory containing the downloaded bib files (see
+        `BIB_FILENAMES`).
+    source_dir : `str`
+        Root directory of the project's source files.
+    subset_file : `str`
+        Path of the bib file to write.
+
+    Returns
+    -------
+    missing_keys : `list` of `str`
+        Cited keys that aren't in the bib files.
+    """
+    logger = logging.getLogger(__name__)
+
+    # Only read the downloaded files; local_dir can also contain other bib
+    # files, such as subset_file itself from an earlier run
+    bibfiles = [
+        os.path.join(local_dir, name)
+        for name in BIB_FILENAMES
+        if os.path.isfile(os.path.join(local_dir, name))
+    ]
+    keys = find_cited_keys_in_dir(source_dir)
+    written_keys, missing_keys = write_bib_subset(bibfiles, keys, subset_file)
+    logger.info(
+        "Wrote {} entries for {} cited keys to {}".format(
+            len(written_keys), len(keys), subset_file
+        )
+    )
+    for key in missing_keys:
+        logger.info(
+            "Cited key {} is not in {} (it may be in local.bib)".format(
+                key, local_dir
+            )
+        )
+    return missing_keys
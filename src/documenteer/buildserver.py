@@ -0,0 +1,514 @@
+"""A build server that keeps a warm Python process for repeated Sphinx
+builds.
+
+Each ``package-docs build`` starts a new interpreter that imports Sphinx,
+the project's extensions, and (for ``lssttasks``) the LSST packages that
+the documentation describes. A `BuildServer` does those imports once, and
+then runs a build whenever a client sends a request over a local Unix
+socket.
+
+This module powers the ``package-docs serve-build`` and ``stack-docs
+serve-build`` commands.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "SOCKET_FILENAME",
+    "BuildResult",
+    "BuildServer",
+    "BuildServerError",
+    "default_socket_path",
+    "is_server_running",
+    "request_build",
+    "request_project_build",
+    "request_project_build_status",
+    "serve_project",
+    "stop_server",
+)
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+SOCKET_FILENAME = "documenteer-build.sock"
+"""Name of the server's socket file in the build directory."""
+
+_MAX_REQUEST_SIZE = 64 * 1024
+"""Maximum size, in bytes, of a request line."""
+
+_MAX_SOCKET_PATH_LENGTH = 100
+"""Conservative limit on the length of a Unix socket path (the operating
+system limit is 104 or 108 bytes).
+"""
+
+
+class BuildServerError(RuntimeError):
+    """Exception related to the build server, such as a missing server or
+    an invalid request.
+    """
+
+
+@dataclass
+class BuildResult:
+    """The result of a build run by the server."""
+
+    status: int
+    """Status code of the build. ``0`` is expected. Greater than ``0``
+    indicates an error.
+    """
+
+    seconds: float
+    """Duration of the build, in seconds."""
+
+    build_number: int
+    """Number of builds the server has run, including this one."""
+
+
+def default_socket_path(root_dir: str) -> str:
+    """Get the default path of the build server's socket for a project.
+
+    Parameters
+    ----------
+    root_dir : `str`
+        Root directory of the Sphinx project.
+
+    Returns
+    -------
+    socket_path : `str`
+        Path of the socket file (`SOCKET_FILENAME`) in the project's
+        ``_build`` directory. If that path is too long for a Unix socket,
+        the socket is in the temporary directory instead, with a name
+        derived from the project's path.
+    """
+    root_dir = os.path.abspath(root_dir)
+    socket_path = os.path.join(root_dir, "_build", SOCKET_FILENAME)
+    if len(socket_path) > _MAX_SOCKET_PATH_LENGTH:
+        digest = hashlib.sha256(root_dir.encode("utf-8")).hexdigest()[:16]
+        socket_path = os.path.join(
+            tempfile.gettempdir(), f"documenteer-build-{digest}.sock"
+        )
+    return socket_path
+
+
+class BuildServer:
+    """A server that runs builds in this process when clients request them
+    over a Unix socket.
+
+    Parameters
+    ----------
+    build : callable
+        Function, with no arguments, that runs a build and returns its status
+        code (such as `documenteer.sphinxrunner.run_sphinx` with its
+        arguments bound).
+    socket_path : `str`
+        Path of the Unix socket to listen on. The socket file is removed when
+        the server stops.
+    request_timeout : `float`, optional
+        Seconds to wait for a client to send its request after it connects.
+        Clients that don't send a request in time are disconnected, so that
+        they can't block the server.
+
+    Notes
+    -----
+    The server handles one request at a time, so requests that arrive
+    during a build wait for it to finish. Clients communicate with the
+    server through `request_build`, `is_server_running`, and `stop_server`.
+
+    Sphinx still reads :file:`conf.py` and sets up the extensions for every
+    build, but the modules they import stay loaded between builds.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], int],
+        socket_path: str,
+        request_timeout: float = 5.0,
+    ) -> None:
+        self.build = build
+        self.socket_path = socket_path
+        self.request_timeout = request_timeout
+        self.build_count = 0
+        self._socket: Optional[socket.socket] = None
+        self._logger = logging.getLogger(__name__)
+
+    def bind(self) -> None:
+        """Create the socket and start listening for requests.
+
+        Raises
+        ------
+        BuildServerError
+            Raised if another server is already listening on the socket,
+            or if Unix sockets aren't available.
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise BuildServerError(
+                "The build server requires Unix domain sockets."
+            )
+        if len(self.socket_path) > _MAX_SOCKET_PATH_LENGTH:
+            raise BuildServerError(
+                f"The socket path {self.socket_path} is too long for a Unix "
+                "socket."
+            )
+        if os.path.exists(self.socket_path) and _is_stale_socket(
+            self.socket_path
+        ):
+            # Left behind by a server that didn't stop cleanly
+            try:
+                os.remove(self.socket_path)
+            except FileNotFoundError:
+                pass
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self.socket_path)
+            sock.listen()
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+
+    def serve_forever(self) -> None:
+        """Handle requests until a client sends a ``stop`` request.
+
+        The socket is created with `bind` if it doesn't exist yet, and is
+        removed when the server stops (including on `KeyboardInterrupt`).
+        """
+        if self._socket is None:
+            self.bind()
+        assert self._socket is not None
+        self._logger.info("Build server listening on %s", self.socket_path)
+        try:
+            while True:
+                connection, _ = self._socket.accept()
+                with connection:
+                    stop = self._handle_connection(connection)
+                if stop:
+                    break
+        finally:
+            self.close()
+        self._logger.info("Build server stopped")
+
+    def close(self) -> None:
+        """Close the socket and remove the socket file."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            try:
+                os.remove(self.socket_path)
+            except FileNotFoundError:
+                pass
+
+    def run_build(self) -> BuildResult:
+        """Run a build in this process.
+
+        Returns
+        -------
+        result : `BuildResult`
+            The result of the build. Exceptions raised by the build are
+            logged and reported as a status of ``1``, so that the server
+            keeps running.
+        """
+        self.build_count += 1
+        start = time.perf_counter()
+        try:
+            status = self.build()
+        except Exception:
+            self._logger.exception("Build %d failed", self.build_count)
+            status = 1
+        result = BuildResult(
+            status=status,
+            seconds=time.perf_counter() - start,
+            build_number=self.build_count,
+        )
+        self._logger.info(
+            "Build %d finished with status %d in %.1f s",
+            result.build_number,
+            result.status,
+            result.seconds,
+        )
+        return result
+
+    def _handle_connection(self, connection: socket.socket) -> bool:
+        """Handle a request, and return `True` if the server should stop."""
+        connection.settimeout(self.request_timeout)
+        try:
+            with connection.makefile("rb") as f:
+                line = f.readline(_MAX_REQUEST_SIZE)
+        except socket.timeout:
+            self._logger.warning(
+                "Timed out waiting for a request; closing the connection"
+            )
+            return False
+        # The client waits for builds to finish, so sending the response
+        # has no time limit
+        connection.settimeout(None)
+        try:
+            request = json.loads(line)
+            command = request["command"]
+        except (ValueError, TypeError, KeyError):
+            self._send(connection, {"error": "Invalid request."})
+            return False
+
+        if command == "build":
+            self._send(connection, asdict(self.run_build()))
+            return False
+        elif command == "ping":
+            self._send(connection, {"build_count": self.build_count})
+            return False
+        elif command == "stop":
+            self._send(connection, {})
+            return True
+        self._send(connection, {"error": f"Unknown command {command!r}."})
+        return False
+
+    @staticmethod
+    def _send(connection: socket.socket, message: Dict[str, Any]) -> None:
+        try:
+            connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        except OSError:
+            # The client disconnected; the build result is still logged
+            pass
+
+
+def _is_stale_socket(socket_path: str) -> bool:
+    """Test if a socket file was left behind by a server that stopped.
+
+    Only a refused connection counts as stale. A running server accepts
+    connections even while it's busy with a build (when it can't answer a
+    ``ping`` request), so any other outcome means that the socket is in use.
+
+    Raises
+    ------
+    BuildServerError
+        Raised if a server is listening on the socket, or if the socket
+        can't be checked.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5.0)
+        try:
+            sock.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return True
+        except OSError as e:
+            raise BuildServerError(
+                f"Can't check the build server socket {socket_path}: {e}"
+            ) from e
+    raise BuildServerError(
+        f"A build server is already running at {socket_path}."
+    )
+
+
+def _send_request(
+    socket_path: str, command: str, timeout: Optional[float]
+) -> Dict[str, Any]:
+    """Send a request to the build server and return its response."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise BuildServerError(
+            "The build server requires Unix domain sockets."
+        )
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+        except OSError as e:
+            raise BuildServerError(
+                f"No build server is running at {socket_path}: {e}"
+            ) from e
+        sock.sendall(json.dumps({"command": command}).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise BuildServerError(
+            f"The build server at {socket_path} closed the connection."
+        )
+    response = json.loads(line)
+    if "error" in response:
+        raise BuildServerError(response["error"])
+    return response
+
+
+def request_build(
+    socket_path: str, timeout: Optional[float] = None
+) -> BuildResult:
+    """Request a build from a running build server and wait for it to
+    finish.
+
+    Parameters
+    ----------
+    socket_path : `str`
+        Path of the server's Unix socket.
+    timeout : `float`, optional
+        Timeout, in seconds, for the build. By default, waits indefinitely.
+
+    Returns
+    -------
+    result : `BuildResult`
+        The result of the build.
+
+    Raises
+    ------
+    BuildServerError
+        Raised if no server is running at ``socket_path``.
+    """
+    return BuildResult(**_send_request(socket_path, "build", timeout))
+
+
+def is_server_running(socket_path: str, timeout: float = 5.0) -> bool:
+    """Test if a build server is running and accepting requests.
+
+    Parameters
+    ----------
+    socket_path : `str`
+        Path of the server's Unix socket.
+    timeout : `float`, optional
+        Timeout, in seconds. A server that is running a build doesn't respond
+        until the build finishes.
+
+    Returns
+    -------
+    running : `bool`
+        `True` if the server responded.
+    """
+    try:
+        _send_request(socket_path, "ping", timeout)
+    except (BuildServerError, OSError, ValueError):
+        return False
+    return True
+
+
+def stop_server(socket_path: str, timeout: Optional[float] = None) -> None:
+    """Stop a running build server, after any build that it is running.
+
+    Parameters
+    ----------
+    socket_path : `str`
+        Path of the server's Unix socket.
+    timeout : `float`, optional
+        Timeout, in seconds. By default, waits indefinitely.
+
+    Raises
+    ------
+    BuildServerError
+        Raised if no server is running at ``socket_path``.
+    """
+    _send_request(socket_path, "stop", timeout)
+
+
+def serve_project(
+    root_dir: str, doctree_dir: Optional[Union[str, Path]] = None
+) -> None:
+    """Run a build server for a Sphinx project until a client stops it or
+    the user presses Control-C.
+
+    The server listens on the project's `default_socket_path`, and runs
+    `documenteer.sphinxrunner.run_sphinx` once before it handles requests,
+    so that the first requested build is already warm.
+
+    Parameters
+    ----------
+    root_dir : `str`
+        Root directory of the Sphinx project.
+    doctree_dir : `str` or `pathlib.Path`, optional
+        Directory for the doctrees and the build environment (see
+        `~documenteer.sphinxrunner.run_sphinx`).
+
+    Raises
+    ------
+    BuildServerError
+        Raised if the server can't listen on the socket, such as when
+        another server is already running for the project.
+    """
+    from .sphinxrunner import run_sphinx
+
+    server = BuildServer(
+        functools.partial(run_sphinx, root_dir, doctree_dir=doctree_dir),
+        default_socket_path(root_dir),
+    )
+    server.bind()
+    try:
+        # The first build imports everything the documentation needs
+        server.run_build()
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def request_project_build(root_dir: str, serve_command: str) -> BuildResult:
+    """Request a build from the build server of a Sphinx project, and log
+    its result.
+
+    Parameters
+    ----------
+    root_dir : `str`
+        Root directory of the Sphinx project.
+    serve_command : `str`
+        Command that starts the server, such as ``package-docs
+        serve-build``, for the error message when no server is running.
+
+    Returns
+    -------
+    result : `BuildResult`
+        The result of the build.
+
+    Raises
+    ------
+    BuildServerError
+        Raised if no server is running for the project.
+    """
+    try:
+        result = request_build(default_socket_path(root_dir))
+    except BuildServerError as e:
+        raise BuildServerError(
+            f"{e}\nStart one with {serve_command}, or build without the "
+            "--server option."
+        ) from e
+    logging.getLogger(__name__).info(
+        "Sphinx build %d finished with status %d in %.1f s (see the server's "
+        "output for the build log)",
+        result.build_number,
+        result.status,
+        result.seconds,
+    )
+    return result
+
+
+def request_project_build_status(root_dir: str, serve_command: str) -> int:
+    """Request a build from the build server of a Sphinx project for a
+    command-line interface, such as ``package-docs build --server``.
+
+    Parameters
+    ----------
+    root_dir : `str`
+        Root directory of the Sphinx project.
+    serve_command : `str`
+        Command that starts the server, such as ``package-docs
+        serve-build``, for the error message when no server is running.
+
+    Returns
+    -------
+    status : `int`
+        Status code of the build (``0`` if it succeeded).
+
+    Raises
+    ------
+    click.ClickException
+        Raised if no server is running for the project.
+    """
+    import click
+
+    try:
+        result = request_project_build(root_dir, serve_command)
+    except BuildServerError as e:
+        raise click.ClickException(str(e))
+    return result.status
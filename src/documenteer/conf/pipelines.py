@@ -71,6 +71,7 @@ __all__ = (
     "html_file_suffix",
     "html_search_language",
     "html_extra_path",
+    "documenteer_doxygen_html_dir",
     # AUTOMODAPI
     "numpydoc_show_class_members",
     "autosummary_generate",
@@ -99,6 +100,7 @@ __all__ = (
 import datetime
 import os
 from pathlib import Path
+from typing import List
 
 import lsst_sphinx_bootstrap_theme
 
@@ -136,6 +138,7 @@ extensions = [
     "documenteer.sphinxext.lssttasks",
     "documenteer.ext.autocppapi",
     "documenteer.ext.autodocreset",
+    "documenteer.ext.doxygenhtml",
     "sphinx_click",
 ]
 
@@ -274,9 +277,15 @@ else:
 # Add any extra paths that contain custom files (such as robots.txt or
 # .htaccess) here, relative to this directory. These files are copied
 # directly to the root of the documentation.
-html_extra_path = []
+html_extra_path: List[str] = []
+
+# The Doxygen HTML site isn't in html_extra_path; instead, the
+# documenteer.ext.doxygenhtml extension hardlinks it into the output after
+# the build.
 if os.path.exists("_doxygen/html"):
-    html_extra_path.append("_doxygen/html")
+    documenteer_doxygen_html_dir = "_doxygen/html"
+else:
+    documenteer_doxygen_html_dir = ""
 
 # If not '', a 'Last updated on:' timestamp is inserted at every page
 # bottom, using the given strftime format.
@@ -73,6 +73,7 @@ __all__ = (
     # BIBTEX
     "bibtex_bibfiles",
     "bibtex_default_style",
+    "documenteer_bibtex_subsets",
 )
 
 import datetime
@@ -82,6 +83,8 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import lsst_dd_rtd_theme
 import yaml
 
+from documenteer.bibsubset import CITED_BIB_FILENAME
+from documenteer.sphinxconfig.gitcache import GitMetadataCache
 from documenteer.sphinxconfig.utils import (
     get_project_content_commit_date,
     read_git_branch,
@@ -114,8 +117,12 @@ copyright = _metadata["copyright"]
 # directories to ignore when looking for source files.
 exclude_patterns = _metadata.get("exclude_patterns", ["_build", "README.rst"])
 
+# Cache of the Git branch and content commit date in _build, so that
+# importing conf.py in an incremental build doesn't read the Git history
+_git_cache = GitMetadataCache("_build")
+
 try:
-    version = read_git_branch()
+    version = read_git_branch(cache=_git_cache)
     _git_branch = version
 except Exception as e:
     print("Caught exception: {}".format(e))
@@ -154,7 +161,9 @@ if "last_revised" in _metadata:
 else:
     # obain date from Git commit at most recent content commit since HEAD
     try:
-        _date = get_project_content_commit_date(exclusions=exclude_patterns)
+        _date = get_project_content_commit_date(
+            exclusions=exclude_patterns, cache=_git_cache
+        )
     except Exception as e:
         print("Caught exception: {}".format(e))
         print("Cannot get project content git commit date.")
@@ -310,7 +319,15 @@ intersphinx_cache_limit = 5  # days
 bibtex_bibfiles = []
 if Path("local.bib").exists():
     bibtex_bibfiles.append("local.bib")
-for path in Path("lsstbib").glob("*.bib"):
-    bibtex_bibfiles.append(str(path))
+_lsstbib_files = [str(path) for path in Path("lsstbib").glob("*.bib")]
+if Path(CITED_BIB_FILENAME).exists():
+    # Subset of lsstbib written by refresh-lsst-bib --prune-to-citations.
+    # The documenteer.sphinxext.bibtex extension uses the full lsstbib files
+    # instead if a reference was cited after the subset was written.
+    bibtex_bibfiles.append(CITED_BIB_FILENAME)
+    documenteer_bibtex_subsets = {CITED_BIB_FILENAME: _lsstbib_files}
+else:
+    bibtex_bibfiles.extend(_lsstbib_files)
+    documenteer_bibtex_subsets = {}
 
 bibtex_default_style = "lsst_aa"
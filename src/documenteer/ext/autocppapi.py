@@ -16,19 +16,25 @@ from sphinx.util.docutils import SphinxDirective
 from ..sphinxext.utils import parse_rst_content
 from ..version import __version__
 
-try:
-    from sphinxcontrib.doxylink import doxylink
-except ImportError:
-    print(
-        "sphinxcontrib.doxylink is missing. Install documenteer with the "
-        "pipelines extra:\n\n  pip install documenteer[pipelines]"
-    )
-    raise
-
-
 if TYPE_CHECKING:
     import sphinx.application
     import sphinx.config
+    from sphinxcontrib.doxylink import doxylink
+
+
+def _import_doxylink() -> Any:
+    """Import the doxylink module on first use, since importing it also
+    imports requests.
+    """
+    try:
+        from sphinxcontrib.doxylink import doxylink
+    except ImportError:
+        print(
+            "sphinxcontrib.doxylink is missing. Install documenteer with the "
+            "pipelines extra:\n\n  pip install documenteer[pipelines]"
+        )
+        raise
+    return doxylink
 
 
 def cache_doxylink_symbolmap(
@@ -54,7 +60,7 @@ def cache_doxylink_symbolmap(
     """
     doxylink_role: str = config["documenteer_autocppapi_doxylink_role"]
     try:
-        symbol_map: Union[doxylink.SymbolMap, None] = load_symbolmap(
+        symbol_map: Union["doxylink.SymbolMap", None] = load_symbolmap(
             doxylink_role, config
         )
     except SymbolMapLoadError:
@@ -70,7 +76,7 @@ def cache_doxylink_symbolmap(
 
 def load_symbolmap(
     doxylink_role: str, config: "sphinx.config.Config"
-) -> doxylink.SymbolMap:
+) -> "doxylink.SymbolMap":
     """Load the doxylink SymbolMap given Sphinx configuration.
 
     Raises
@@ -90,7 +96,7 @@ def load_symbolmap(
                         f"{doxylink_role} role."
                     )
                 doc = ET.parse(str(tag_path))
-                return doxylink.SymbolMap(doc)
+                return _import_doxylink().SymbolMap(doc)
     raise SymbolMapLoadError(
         f"Could not load tag file for Doxylink {doxylink_role} role."
     )
@@ -101,7 +107,7 @@ class SymbolMapLoadError(RuntimeError):
 
 
 def filter_symbolmap(
-    symbol_map: doxylink.SymbolMap,
+    symbol_map: "doxylink.SymbolMap",
     kinds: Optional[Set[str]] = None,
     match: Optional[str] = None,
 ) -> List[str]:
@@ -173,9 +179,9 @@ class AutoCppApi(SphinxDirective):
 
         try:
             key = "documenteer_autocppapi_symbolmaps"
-            symbol_map: Union[doxylink.SymbolMap, None] = self.env.config[key][
-                doxylink_role
-            ]
+            symbol_map: Union["doxylink.SymbolMap", None] = self.env.config[
+                key
+            ][doxylink_role]
         except KeyError:
             symbol_map = load_symbolmap(doxylink_role, self.env.config)
 
@@ -206,7 +212,7 @@ class AutoCppApi(SphinxDirective):
         *,
         prefix: str,
         heading: str,
-        symbol_map: doxylink.SymbolMap,
+        symbol_map: "doxylink.SymbolMap",
         doxylink_role: str,
         kinds: Optional[Set[str]] = None,
     ) -> List[nodes.Node]:
@@ -0,0 +1,223 @@
+"""Sphinx extension that links the Doxygen HTML site into the HTML output,
+instead of copying it with ``html_extra_path``.
+
+A Doxygen site for the LSST Science Pipelines has tens of thousands of
+files. After an HTML build, this extension hardlinks each file into the
+output directory (or, if the directories are on different file systems,
+makes a copy-on-write reflink where the file system supports it). If
+neither works, it copies the files that changed since the previous build.
+"""
+
+__all__ = ["setup", "sync_tree", "SyncStats"]
+
+import errno
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from sphinx.util import logging
+
+from ..version import __version__
+
+if TYPE_CHECKING:
+    import sphinx.application
+
+_FICLONE = 0x40049409
+"""The Linux ``FICLONE`` ioctl request code (``_IOW(0x94, 9, int)``), which
+makes a reflink (a copy-on-write clone) of a file.
+"""
+
+_LINK_ERRNOS = frozenset(
+    [errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP]
+)
+"""Errors that indicate a link method isn't available for the file system,
+rather than a problem with a particular file.
+"""
+
+_REFLINK_ERRNOS = _LINK_ERRNOS | {errno.EINVAL, errno.ENOTTY, errno.EBADF}
+
+
+@dataclass
+class SyncStats:
+    """Statistics for a `sync_tree` run."""
+
+    hardlinked: int = 0
+    """Number of files that were hardlinked."""
+
+    reflinked: int = 0
+    """Number of files that were reflinked."""
+
+    copied: int = 0
+    """Number of files that were copied."""
+
+    unchanged: int = 0
+    """Number of files that were already up to date."""
+
+    @property
+    def total(self) -> int:
+        """Total number of files (`int`)."""
+        return self.hardlinked + self.reflinked + self.copied + self.unchanged
+
+
+def sync_tree(src_dir: str, dest_dir: str, method: str = "link") -> SyncStats:
+    """Make the files in a destination directory match the files in a
+    source directory, by linking or copying.
+
+    Parameters
+    ----------
+    src_dir : `str`
+        Source directory.
+    dest_dir : `str`
+        Destination directory. Files that aren't in ``src_dir`` are left
+        alone.
+    method : `str`, optional
+        ``"link"`` to hardlink files, falling back to reflinks and then to
+        copies if the file system doesn't support them. ``"copy"`` to only
+        copy files.
+
+    Returns
+    -------
+    stats : `SyncStats`
+        Counts of the files that were linked, copied, or already up to date.
+
+    Notes
+    -----
+    A destination file is up to date if it's a hardlink to the source file,
+    or if it has the same size and modification time as the source file.
+    Files that aren't up to date are replaced atomically.
+    """
+    if method not in ("link", "copy"):
+        raise ValueError(f"Unknown method {method!r}; use 'link' or 'copy'.")
+    stats = SyncStats()
+    use_hardlink = method == "link"
+    use_reflink = method == "link" and sys.platform.startswith("linux")
+
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        relpath = os.path.relpath(dirpath, src_dir)
+        dest_dirpath = os.path.normpath(os.path.join(dest_dir, relpath))
+        os.makedirs(dest_dirpath, exist_ok=True)
+        for filename in filenames:
+            src = os.path.join(dirpath, filename)
+            dest = os.path.join(dest_dirpath, filename)
+            src_stat = os.stat(src)
+            try:
+                dest_stat: Optional[os.stat_result] = os.stat(dest)
+            except FileNotFoundError:
+                dest_stat = None
+            if dest_stat is not None and (
+                (
+                    dest_stat.st_ino == src_stat.st_ino
+                    and dest_stat.st_dev == src_stat.st_dev
+                )
+                or (
+                    dest_stat.st_size == src_stat.st_size
+                    and dest_stat.st_mtime_ns == src_stat.st_mtime_ns
+                )
+            ):
+                stats.unchanged += 1
+                continue
+
+            temp = os.path.join(dest_dirpath, f".{filename}.tmp")
+            if use_hardlink:
+                try:
+                    _replace_with(os.link, src, temp, dest)
+                    stats.hardlinked += 1
+                    continue
+                except OSError as e:
+                    if e.errno not in _LINK_ERRNOS:
+                        raise
+                    use_hardlink = False
+            if use_reflink:
+                try:
+                    _replace_with(_reflink, src, temp, dest)
+                    stats.reflinked += 1
+                    continue
+                except OSError as e:
+                    if e.errno not in _REFLINK_ERRNOS:
+                        raise
+                    use_reflink = False
+            _replace_with(shutil.copy2, src, temp, dest)
+            stats.copied += 1
+    return stats
+
+
+def _replace_with(make: Any, src: str, temp: str, dest: str) -> None:
+    """Make a file at a temporary path and move it over the destination."""
+    try:
+        os.remove(temp)
+    except FileNotFoundError:
+        pass
+    make(src, temp)
+    try:
+        os.replace(temp, dest)
+    except BaseException:
+        os.remove(temp)
+        raise
+
+
+def _reflink(src: str, dest: str) -> None:
+    """Make a copy-on-write clone of a file (Linux only)."""
+    import fcntl
+
+    with open(src, "rb") as src_file, open(dest, "wb") as dest_file:
+        try:
+            fcntl.ioctl(dest_file.fileno(), _FICLONE, src_file.fileno())
+        except OSError:
+            dest_file.close()
+            os.remove(dest)
+            raise
+    shutil.copystat(src, dest)
+
+
+def link_doxygen_html(
+    app: "sphinx.application.Sphinx", exception: Optional[Exception]
+) -> None:
+    """Link the Doxygen HTML site into the HTML output after a successful
+    build.
+
+    This function is connected to the ``build-finished`` event.
+    """
+    logger = logging.getLogger(__name__)
+    html_dir = app.config["documenteer_doxygen_html_dir"]
+    if exception is not None or not html_dir or app.builder.format != "html":
+        return
+    src_dir = os.path.join(app.confdir, html_dir)
+    if not os.path.isdir(src_dir):
+        logger.debug("doxygen html: %s doesn't exist", src_dir)
+        return
+
+    start = time.perf_counter()
+    stats = sync_tree(
+        src_dir,
+        app.outdir,
+        method=app.config["documenteer_doxygen_html_method"],
+    )
+    logger.info(
+        "doxygen html: %d files (%d hardlinked, %d reflinked, %d copied, "
+        "%d unchanged) in %.1f s",
+        stats.total,
+        stats.hardlinked,
+        stats.reflinked,
+        stats.copied,
+        stats.unchanged,
+        time.perf_counter() - start,
+    )
+
+
+def setup(app: "sphinx.application.Sphinx") -> Dict[str, Any]:
+    """Set up the ``documenteer.ext.doxygenhtml`` Sphinx extension."""
+    # Configuration values
+    app.add_config_value("documenteer_doxygen_html_dir", "", "")
+    app.add_config_value("documenteer_doxygen_html_method", "link", "")
+
+    # Events
+    app.connect("build-finished", link_doxygen_html)
+
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -0,0 +1,266 @@
+"""A persistent, size-bounded HTTP response cache that revalidates entries
+with conditional requests.
+"""
+
+from __future__ import annotations
+
+__all__ = ("HttpCache", "HttpCacheEntry")
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .utils import atomic_write
+
+if TYPE_CHECKING:
+    import requests
+
+
+@dataclass
+class HttpCacheEntry:
+    """Metadata for a cached HTTP response."""
+
+    url: str
+    """The requested URL."""
+
+    etag: Optional[str]
+    """The ``ETag`` response header, if any."""
+
+    last_modified: Optional[str]
+    """The ``Last-Modified`` response header, if any."""
+
+    encoding: Optional[str]
+    """The text encoding of the response body."""
+
+    fetched: float
+    """Unix time when the response was last fetched or revalidated."""
+
+    size: int
+    """Size of the response body, in bytes."""
+
+
+class HttpCache:
+    """A persistent cache of HTTP response bodies.
+
+    Parameters
+    ----------
+    directory : `str`
+        Directory where responses are stored. It is created if necessary.
+    max_age : `float`, optional
+        Time, in seconds, that a cached response is used without contacting
+        the server. Older responses are revalidated with a conditional
+        request (``If-None-Match`` or ``If-Modified-Since``) before they are
+        reused.
+    max_size : `int`, optional
+        Maximum total size, in bytes, of the cached response bodies. The least
+        recently used responses are evicted when the cache grows beyond this
+        size.
+
+    Notes
+    -----
+    Each response is stored as a pair of files named after the SHA-256 hash
+    of the URL: a ``.json`` file with the `HttpCacheEntry` metadata and a
+    ``.body`` file with the response body. Files are written atomically (to a
+    temporary file that is renamed) so that the cache can be shared by
+    parallel processes. The modification time of the body file records when
+    the entry was last used.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        max_age: float = 86400.0,
+        max_size: int = 50 * 1024 * 1024,
+    ) -> None:
+        self.directory = directory
+        self.max_age = max_age
+        self.max_size = max_size
+        # Counts of responses served from the cache without a request,
+        # revalidated with a 304 Not Modified response, and downloaded.
+        self.stats: Dict[str, int] = {"hits": 0, "revalidated": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_text(
+        self, url: str, session: requests.Session, timeout: float = 10.0
+    ) -> str:
+        """Get the text content of a URL, from the cache if possible.
+
+        Parameters
+        ----------
+        url : `str`
+            The URL.
+        session : `requests.Session`
+            Session used for requests to the server.
+        timeout : `float`, optional
+            Request timeout, in seconds.
+
+        Returns
+        -------
+        text : `str`
+            The response body, decoded as text.
+
+        Raises
+        ------
+        requests.HTTPError
+            Raised if the server responds with an error status.
+        """
+        body, encoding = self.get_bytes(url, session, timeout=timeout)
+        return body.decode(encoding or "utf-8", errors="replace")
+
+    def get_bytes(
+        self, url: str, session: requests.Session, timeout: float = 10.0
+    ) -> Tuple[bytes, Optional[str]]:
+        """Get the content of a URL, from the cache if possible.
+
+        Parameters
+        ----------
+        url : `str`
+            The URL.
+        session : `requests.Session`
+            Session used for requests to the server.
+        timeout : `float`, optional
+            Request timeout, in seconds.
+
+        Returns
+        -------
+        body : `bytes`
+            The response body.
+        encoding : `str` or `None`
+            The text encoding of the response body, if known.
+
+        Raises
+        ------
+        requests.HTTPError
+            Raised if the server responds with an error status.
+        """
+        entry = self._read_entry(url)
+        body = self._read_body(url) if entry is not None else None
+        if entry is not None and body is not None:
+            if time.time() - entry.fetched < self.max_age:
+                self._count("hits")
+                self._touch(url)
+                return body, entry.encoding
+
+        headers = {}
+        if entry is not None and body is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = session.get(url, headers=headers, timeout=timeout)
+        if (
+            response.status_code == 304
+            and entry is not None
+            and body is not None
+        ):
+            self._count("revalidated")
+            entry.fetched = time.time()
+            self._write_entry(entry)
+            self._touch(url)
+            return body, entry.encoding
+
+        response.raise_for_status()
+        self._count("misses")
+        body = response.content
+        entry = HttpCacheEntry(
+            url=url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            encoding=response.encoding or response.apparent_encoding,
+            fetched=time.time(),
+            size=len(body),
+        )
+        atomic_write(self._path(url, ".body"), body)
+        self._write_entry(entry)
+        self.evict(keep=url)
+        return body, entry.encoding
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """Evict the least recently used responses until the cache is within
+        its maximum size.
+
+        Parameters
+        ----------
+        keep : `str`, optional
+            URL of a response that must not be evicted, such as the response
+            that was just added.
+
+        Returns
+        -------
+        evicted : `list` of `str`
+            Base names (URL hashes) of the evicted responses.
+        """
+        bodies = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(".body"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            bodies.append((stat.st_mtime, name[: -len(".body")], stat.st_size))
+            total += stat.st_size
+
+        keep_key = self._key(keep) if keep is not None else None
+        evicted = []
+        for _, key, size in sorted(bodies):
+            if total <= self.max_size:
+                break
+            if key == keep_key:
+                continue
+            for suffix in (".body", ".json"):
+                try:
+                    os.remove(os.path.join(self.directory, key + suffix))
+                except FileNotFoundError:
+                    pass
+            total -= size
+            evicted.append(key)
+        return evicted
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, url: str, suffix: str) -> str:
+        return os.path.join(self.directory, self._key(url) + suffix)
+
+    def _read_entry(self, url: str) -> Optional[HttpCacheEntry]:
+        try:
+            with open(self._path(url, ".json")) as f:
+                entry = HttpCacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        if entry.url != url:
+            return None
+        return entry
+
+    def _read_body(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(url, ".body"), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_entry(self, entry: HttpCacheEntry) -> None:
+        atomic_write(
+            self._path(entry.url, ".json"),
+            json.dumps(asdict(entry)).encode("utf-8"),
+        )
+
+    def _touch(self, url: str) -> None:
+        try:
+            os.utime(self._path(url, ".body"))
+        except OSError:
+            pass
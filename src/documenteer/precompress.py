@@ -0,0 +1,325 @@
+"""Precompressed copies of the text files in a built HTML site.
+
+Static file servers (such as nginx with ``gzip_static`` and
+``brotli_static``) can serve a precompressed ``.gz`` or ``.br`` sibling of a
+file instead of compressing the file for every request. `precompress_site`
+writes those siblings for a site's HTML, JavaScript (including Sphinx's
+:file:`searchindex.js`), CSS, and SVG files.
+
+This module powers the ``--precompress`` option of ``package-docs build``
+and ``stack-docs build``.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "BROTLI_QUALITY",
+    "GZIP_LEVEL",
+    "PRECOMPRESSED_EXTENSIONS",
+    "PrecompressStats",
+    "precompress_after_build",
+    "precompress_site",
+)
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .utils import atomic_write
+
+PRECOMPRESSED_EXTENSIONS = (".html", ".js", ".css", ".svg")
+"""Extensions of the files that are precompressed."""
+
+GZIP_LEVEL = 9
+"""Compression level for ``.gz`` files."""
+
+BROTLI_QUALITY = 11
+"""Compression quality for ``.br`` files."""
+
+_MANIFEST_VERSION = 1
+"""Version of the manifest format, which also covers the compression
+settings.
+"""
+
+_SUFFIXES = {"gz": ".gz", "br": ".br"}
+
+
+@dataclass
+class PrecompressStats:
+    """Statistics for a `precompress_site` run."""
+
+    compressed: int = 0
+    """Number of files that were compressed."""
+
+    unchanged: int = 0
+    """Number of files whose content didn't change since the previous run,
+    and weren't compressed again.
+    """
+
+    removed: int = 0
+    """Number of compressed files that were removed because their source
+    file no longer exists.
+    """
+
+
+def precompress_site(
+    html_dir: str,
+    formats: Sequence[str] = ("gz", "br"),
+    manifest_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> PrecompressStats:
+    """Write ``.gz`` and ``.br`` siblings of the text files in an HTML
+    site.
+
+    Parameters
+    ----------
+    html_dir : `str`
+        Directory of the built HTML site.
+    formats : sequence of `str`, optional
+        Compression formats: ``"gz"`` and ``"br"``. Brotli (``"br"``)
+        needs the brotli package; if it isn't installed, only ``.gz``
+        files are written.
+    manifest_path : `str`, optional
+        Path of the JSON file that records the content hash of each
+        compressed file, for incremental runs. Defaults to
+        :file:`precompress.json` next to ``html_dir`` (so that it isn't
+        part of the site).
+    max_workers : `int`, optional
+        Number of processes that compress files. Defaults to the number of
+        CPUs.
+
+    Returns
+    -------
+    stats : `PrecompressStats`
+        Statistics for the run.
+
+    Notes
+    -----
+    A file is compressed again only if its content hash changed since the
+    previous run; files whose size and modification time are unchanged
+    aren't read at all. Compressed files are only written if they're smaller
+    than the source file, and are written atomically. Gzip files don't
+    include a timestamp, so their content only depends on the source file.
+    """
+    logger = logging.getLogger(__name__)
+    html_dir = os.path.abspath(html_dir)
+    if manifest_path is None:
+        manifest_path = os.path.join(
+            os.path.dirname(html_dir), "precompress.json"
+        )
+
+    formats = [f for f in formats if _check_format(f)]
+    settings = {
+        "version": _MANIFEST_VERSION,
+        "formats": formats,
+        "gzip_level": GZIP_LEVEL,
+        "brotli_quality": BROTLI_QUALITY,
+    }
+    previous = _read_manifest(manifest_path)
+    all_previous_files: Dict[str, Any] = previous.get("files", {})
+    if previous.get("settings") == settings:
+        previous_files = all_previous_files
+    else:
+        previous_files = {}
+
+    stats = PrecompressStats()
+    files: Dict[str, Any] = {}
+    tasks: List[Tuple[str, str, Optional[str], List[str]]] = []
+    for dirpath, _, filenames in os.walk(html_dir):
+        for filename in filenames:
+            if not filename.endswith(PRECOMPRESSED_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, html_dir)
+            stat = os.stat(path)
+            entry = previous_files.get(relpath)
+            if (
+                entry is not None
+                and entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and _siblings_exist(path, entry["written"])
+            ):
+                files[relpath] = entry
+                stats.unchanged += 1
+                continue
+            tasks.append(
+                (
+                    relpath,
+                    path,
+                    entry["sha256"] if entry is not None else None,
+                    formats,
+                )
+            )
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(_compress_file, tasks, chunksize=chunksize)
+            )
+    else:
+        results = [_compress_file(task) for task in tasks]
+
+    for relpath, entry, compressed in results:
+        if compressed:
+            stats.compressed += 1
+        else:
+            stats.unchanged += 1
+        files[relpath] = entry
+
+    # Remove the compressed files of source files that were removed
+    for relpath, entry in all_previous_files.items():
+        if relpath in files:
+            continue
+        path = os.path.join(html_dir, relpath)
+        for fmt in entry["written"]:
+            try:
+                os.remove(path + _SUFFIXES[fmt])
+                stats.removed += 1
+            except FileNotFoundError:
+                pass
+
+    _write_manifest(manifest_path, {"settings": settings, "files": files})
+    logger.info(
+        "Precompressed %d files (%d unchanged, %d removed)",
+        stats.compressed,
+        stats.unchanged,
+        stats.removed,
+    )
+    return stats
+
+
+def precompress_after_build(
+    build: Callable[[], int], html_dir: str
+) -> Callable[[], int]:
+    """Wrap a build function so that the site is precompressed after every
+    successful build.
+
+    Parameters
+    ----------
+    build : callable
+        Function, with no arguments, that runs a build and returns its status
+        code, such as the rebuild function for
+        `documenteer.watch.watch_and_rebuild`.
+    html_dir : `str`
+        Directory of the built HTML site.
+
+    Returns
+    -------
+    build : callable
+        Function that runs ``build`` and, if it succeeds, `precompress_site`
+        on ``html_dir``. It returns the status code of the build.
+    """
+
+    def build_and_precompress() -> int:
+        status = build()
+        if status == 0:
+            precompress_site(html_dir)
+        return status
+
+    return build_and_precompress
+
+
+def _check_format(fmt: str) -> bool:
+    """Test if a compression format is available."""
+    if fmt not in _SUFFIXES:
+        raise ValueError(f"Unknown compression format {fmt!r}.")
+    if fmt == "br":
+        try:
+            import brotli  # noqa: F401
+        except ImportError:
+            logging.getLogger(__name__).warning(
+                "brotli is not installed, so .br files are not written. "
+                "Install it with: pip install documenteer[precompress]"
+            )
+            return False
+    return True
+
+
+def _siblings_exist(path: str, formats: Sequence[str]) -> bool:
+    return all(os.path.exists(path + _SUFFIXES[f]) for f in formats)
+
+
+def _compress_file(
+    task: Tuple[str, str, Optional[str], List[str]]
+) -> Tuple[str, Dict[str, Any], bool]:
+    """Compress a file into its siblings, unless its content is unchanged.
+
+    This function runs in worker processes.
+
+    Returns
+    -------
+    result : `tuple`
+        The relative path, the manifest entry, and whether the file was
+        compressed.
+    """
+    relpath, path, previous_sha256, formats = task
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        content = f.read()
+    sha256 = hashlib.sha256(content).hexdigest()
+    entry: Dict[str, Any] = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+    }
+
+    # Siblings in formats that are no longer written, such as .br files
+    # when brotli isn't installed anymore, would be served with stale
+    # content
+    for fmt in _SUFFIXES:
+        if fmt not in formats:
+            _remove_if_exists(path + _SUFFIXES[fmt])
+
+    if sha256 == previous_sha256:
+        # The file was rewritten with the same content. Keep the siblings
+        # that exist; formats that weren't smaller than the source have no
+        # sibling.
+        entry["written"] = [
+            f for f in formats if os.path.exists(path + _SUFFIXES[f])
+        ]
+        return relpath, entry, False
+
+    written = []
+    for fmt in formats:
+        if fmt == "gz":
+            data = gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+        else:
+            import brotli
+
+            data = brotli.compress(content, quality=BROTLI_QUALITY)
+        sibling = path + _SUFFIXES[fmt]
+        if len(data) < len(content):
+            atomic_write(sibling, data, mode=stat.st_mode & 0o777)
+            written.append(fmt)
+        else:
+            _remove_if_exists(sibling)
+    entry["written"] = written
+    return relpath, entry, True
+
+
+def _remove_if_exists(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _read_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(path: str, data: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    atomic_write(path, json.dumps(data).encode("utf-8"))
@@ -0,0 +1,217 @@
+"""Offline snapshots of remote content, stored as a content-addressed archive
+with a lockfile that maps URLs to content hashes.
+
+The ``package-docs freeze-remote`` command creates a snapshot of the content
+of a project's ``remote-code-block`` directives. While the snapshot exists,
+the ``remote-code-block`` directive reads from it instead of the network.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "LOCKFILE_NAME",
+    "RemoteSnapshot",
+    "SnapshotEntry",
+    "freeze_urls",
+)
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .requestsutils import configure_pooled_session, get_pooled_session
+from .utils import atomic_write
+
+LOCKFILE_NAME = "lock.json"
+"""Name of the lockfile in a snapshot directory."""
+
+OBJECTS_DIRNAME = "objects"
+"""Name of the directory, in a snapshot directory, that contains the content
+files (named by their SHA-256 hashes).
+"""
+
+
+@dataclass
+class SnapshotEntry:
+    """Lockfile entry for the content of a URL."""
+
+    sha256: str
+    """SHA-256 hash of the content, which is also the content file's name."""
+
+    size: int
+    """Size of the content, in bytes."""
+
+    encoding: Optional[str]
+    """Text encoding of the content, if known."""
+
+
+class RemoteSnapshot:
+    """A snapshot of remote content.
+
+    Parameters
+    ----------
+    directory : `str`
+        The snapshot directory, which contains the lockfile (`LOCKFILE_NAME`)
+        and the content files.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.entries: Dict[str, SnapshotEntry] = {}
+
+    @property
+    def lockfile_path(self) -> str:
+        """Path of the lockfile (`str`)."""
+        return os.path.join(self.directory, LOCKFILE_NAME)
+
+    def exists(self) -> bool:
+        """Test if the snapshot's lockfile exists."""
+        return os.path.isfile(self.lockfile_path)
+
+    def load(self) -> RemoteSnapshot:
+        """Load the lockfile.
+
+        Returns
+        -------
+        RemoteSnapshot
+            This snapshot.
+        """
+        with open(self.lockfile_path) as f:
+            data = json.load(f)
+        self.entries = {
+            url: SnapshotEntry(**entry) for url, entry in data["urls"].items()
+        }
+        return self
+
+    def save(self) -> None:
+        """Write the lockfile, and remove content files that aren't
+        referenced by it.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        data = {
+            "urls": {
+                url: asdict(entry)
+                for url, entry in sorted(self.entries.items())
+            }
+        }
+        atomic_write(
+            self.lockfile_path,
+            (json.dumps(data, indent=2) + "\n").encode("utf-8"),
+        )
+
+        referenced = {entry.sha256 for entry in self.entries.values()}
+        objects_dir = os.path.join(self.directory, OBJECTS_DIRNAME)
+        if os.path.isdir(objects_dir):
+            for name in os.listdir(objects_dir):
+                if name not in referenced:
+                    os.remove(os.path.join(objects_dir, name))
+
+    def add(self, url: str, content: bytes, encoding: Optional[str]) -> None:
+        """Add content to the snapshot.
+
+        Parameters
+        ----------
+        url : `str`
+            URL of the content.
+        content : `bytes`
+            The content.
+        encoding : `str`, optional
+            Text encoding of the content.
+        """
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self._object_path(sha256)
+        if not os.path.isfile(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, content)
+        self.entries[url] = SnapshotEntry(
+            sha256=sha256, size=len(content), encoding=encoding
+        )
+
+    def get_text(self, url: str) -> str:
+        """Get the text content of a URL from the snapshot.
+
+        Parameters
+        ----------
+        url : `str`
+            The URL.
+
+        Returns
+        -------
+        text : `str`
+            The content.
+
+        Raises
+        ------
+        KeyError
+            Raised if the URL isn't in the snapshot.
+        ValueError
+            Raised if the content doesn't match its hash in the lockfile.
+        """
+        try:
+            entry = self.entries[url]
+        except KeyError:
+            raise KeyError(
+                f"{url} is not in the remote content snapshot at "
+                f"{self.directory}. Run package-docs freeze-remote to update "
+                "the snapshot."
+            )
+        with open(self._object_path(entry.sha256), "rb") as f:
+            content = f.read()
+        if hashlib.sha256(content).hexdigest() != entry.sha256:
+            raise ValueError(
+                f"Content for {url} in {self.directory} does not match its "
+                "hash in the lockfile."
+            )
+        return content.decode(entry.encoding or "utf-8", errors="replace")
+
+    def _object_path(self, sha256: str) -> str:
+        return os.path.join(self.directory, OBJECTS_DIRNAME, sha256)
+
+
+def freeze_urls(
+    urls: Iterable[str], directory: str, concurrency: int = 8
+) -> Tuple[RemoteSnapshot, List[Tuple[str, Exception]]]:
+    """Download content into a new snapshot, replacing any existing one.
+
+    Parameters
+    ----------
+    urls : iterable of `str`
+        URLs to download.
+    directory : `str`
+        The snapshot directory.
+    concurrency : `int`, optional
+        Maximum number of concurrent downloads.
+
+    Returns
+    -------
+    snapshot : `RemoteSnapshot`
+        The snapshot, which is saved in ``directory``.
+    errors : `list` of `tuple`
+        URLs that couldn't be downloaded, with the exception raised. These
+        URLs aren't included in the snapshot.
+    """
+    configure_pooled_session(pool_maxsize=max(concurrency, 10))
+    session = get_pooled_session()
+
+    def fetch(url: str) -> Tuple[str, Optional[bytes], Optional[str], Any]:
+        try:
+            response = session.get(url, timeout=30.0)
+            response.raise_for_status()
+        except Exception as exc:
+            return url, None, None, exc
+        encoding = response.encoding or response.apparent_encoding
+        return url, response.content, encoding, None
+
+    snapshot = RemoteSnapshot(directory)
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        for url, content, encoding, exc in executor.map(fetch, sorted(urls)):
+            if content is None:
+                errors.append((url, exc))
+                continue
+            snapshot.add(url, content, encoding)
+    snapshot.save()
+    return snapshot, errors
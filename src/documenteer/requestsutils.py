@@ -1,11 +1,29 @@
 """Utilities for working with requests.
 """
 
-__all__ = ("requests_retry_session",)
+__all__ = (
+    "requests_retry_session",
+    "configure_pooled_session",
+    "get_pooled_session",
+    "close_pooled_session",
+    "get_pooled_session_stats",
+)
 
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+import os
+import threading
+
+_POOL_SETTINGS = {"pool_connections": 10, "pool_maxsize": 10}
+"""Connection pool settings for the pooled session (see
+`configure_pooled_session`).
+"""
+
+_pooled_session = None
+"""The process-wide pooled session (see `get_pooled_session`)."""
+
+_pooled_session_pid = None
+"""ID of the process that created ``_pooled_session``."""
+
+_pooled_session_lock = threading.Lock()
 
 
 def requests_retry_session(
@@ -13,6 +31,8 @@ def requests_retry_session(
     backoff_factor=0.3,
     status_forcelist=(500, 502, 504),
     session=None,
+    pool_connections=10,
+    pool_maxsize=10,
 ):
     """Create a requests session that handles errors by retrying.
 
@@ -26,6 +46,10 @@ def requests_retry_session(
         Status codes that must be retried.
     session : `requests.Session`
         An existing requests session to configure.
+    pool_connections : `int`, optional
+        Number of hosts to keep connection pools for.
+    pool_maxsize : `int`, optional
+        Maximum number of connections to keep open to each host.
 
     Returns
     -------
@@ -38,7 +62,16 @@ def requests_retry_session(
     This function is based on
     https://www.peterbe.com/plog/best-practice-with-retries-with-requests
     by Peter Bengtsson.
+
+    Each call creates a new session, with new connections. Use
+    `get_pooled_session` to reuse connections across requests.
     """
+    # requests is imported on first use so that importing modules that use
+    # this module (like Sphinx extensions) doesn't import it
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.packages.urllib3.util.retry import Retry
+
     session = session or requests.Session()
     retry = Retry(
         total=retries,
@@ -47,7 +80,121 @@ def requests_retry_session(
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+    )
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
+
+
+def configure_pooled_session(pool_connections=10, pool_maxsize=10):
+    """Configure the connection pools of the process-wide pooled session.
+
+    Parameters
+    ----------
+    pool_connections : `int`, optional
+        Number of hosts to keep connection pools for.
+    pool_maxsize : `int`, optional
+        Maximum number of connections to keep open to each host. This should
+        be at least the number of threads that make concurrent requests.
+
+    Notes
+    -----
+    If the settings change, the existing pooled session is closed and the
+    next call to `get_pooled_session` creates a new one.
+    """
+    settings = {
+        "pool_connections": pool_connections,
+        "pool_maxsize": pool_maxsize,
+    }
+    if settings == _POOL_SETTINGS:
+        return
+    _POOL_SETTINGS.update(settings)
+    close_pooled_session()
+
+
+def get_pooled_session():
+    """Get the process-wide requests session, which keeps connections alive
+    and reuses them across requests.
+
+    Returns
+    -------
+    session : `requests.Session`
+        The session, configured with retries (see `requests_retry_session`)
+        and the connection pool settings from `configure_pooled_session`.
+
+    Notes
+    -----
+    The session is created on first use. Connections can't be shared
+    between processes, so a process that is forked (for example, by a
+    parallel Sphinx build) gets its own session on first use instead of the
+    parent's.
+    """
+    global _pooled_session, _pooled_session_pid
+    with _pooled_session_lock:
+        if _pooled_session is None or _pooled_session_pid != os.getpid():
+            _pooled_session = requests_retry_session(**_POOL_SETTINGS)
+            _pooled_session_pid = os.getpid()
+        return _pooled_session
+
+
+def close_pooled_session():
+    """Close the process-wide pooled session and its connections."""
+    global _pooled_session, _pooled_session_pid
+    with _pooled_session_lock:
+        if _pooled_session is not None and _pooled_session_pid == os.getpid():
+            _pooled_session.close()
+        _pooled_session = None
+        _pooled_session_pid = None
+
+
+def get_pooled_session_stats():
+    """Get connection reuse statistics for the process-wide pooled session.
+
+    Returns
+    -------
+    stats : `dict`
+        Statistics, with keys:
+
+        ``pools``
+            Number of per-host connection pools.
+        ``connections``
+            Number of connections that were opened.
+        ``requests``
+            Number of requests that were made.
+        ``reused``
+            Number of requests that reused an open connection.
+    """
+    stats = {"pools": 0, "connections": 0, "requests": 0, "reused": 0}
+    with _pooled_session_lock:
+        if _pooled_session is None or _pooled_session_pid != os.getpid():
+            return stats
+        adapters = {id(a): a for a in _pooled_session.adapters.values()}
+        for adapter in adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats["pools"] += 1
+                stats["connections"] += pool.num_connections
+                stats["requests"] += pool.num_requests
+    stats["reused"] = max(stats["requests"] - stats["connections"], 0)
+    return stats
+
+
+def _reset_after_fork():
+    """Drop the parent's pooled session in a forked child process, without
+    closing the parent's connections.
+    """
+    global _pooled_session, _pooled_session_pid, _pooled_session_lock
+    _pooled_session_lock = threading.Lock()
+    _pooled_session = None
+    _pooled_session_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
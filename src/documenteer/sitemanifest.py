@@ -0,0 +1,194 @@
+"""Content-hash manifests of built HTML sites.
+
+A manifest records the size, modification time, and SHA-256 hash of every
+file in a site. Comparing the manifest of a new build with the manifest of
+the published site (`diff_manifests`) gives the files that an uploader
+needs to transfer or delete.
+
+This module powers the ``stack-docs manifest`` command.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "ManifestDiff",
+    "build_manifest",
+    "diff_manifests",
+    "read_manifest",
+    "write_manifest",
+)
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .utils import atomic_write
+
+_MANIFEST_VERSION = 1
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class ManifestDiff:
+    """Differences between two manifests (see `diff_manifests`)."""
+
+    added: List[str] = field(default_factory=list)
+    """Paths of the files that are only in the new manifest."""
+
+    modified: List[str] = field(default_factory=list)
+    """Paths of the files whose content changed."""
+
+    removed: List[str] = field(default_factory=list)
+    """Paths of the files that are only in the previous manifest."""
+
+    unchanged: int = 0
+    """Number of files whose content didn't change."""
+
+    @property
+    def changed(self) -> bool:
+        """Whether any file was added, modified, or removed (`bool`)."""
+        return bool(self.added or self.modified or self.removed)
+
+
+def build_manifest(
+    site_dir: str,
+    previous: Optional[Dict[str, Any]] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Make a manifest of the files in a site.
+
+    Parameters
+    ----------
+    site_dir : `str`
+        Directory of the built site.
+    previous : `dict`, optional
+        A previous manifest of the same directory, made on this machine.
+        Files whose size and modification time are the same as in this
+        manifest reuse its hash instead of being read again.
+    max_workers : `int`, optional
+        Number of threads that hash files. Defaults to the number of CPUs
+        (`hashlib` releases the GIL while it hashes).
+
+    Returns
+    -------
+    manifest : `dict`
+        The manifest. Its ``"files"`` item maps the POSIX path of each file,
+        relative to ``site_dir``, to the file's ``"size"``, ``"mtime_ns"``,
+        and ``"sha256"``.
+    """
+    previous_files: Dict[str, Any] = {}
+    if previous is not None and previous.get("version") == _MANIFEST_VERSION:
+        previous_files = previous.get("files", {})
+
+    files: Dict[str, Any] = {}
+    to_hash: List[Tuple[str, str, os.stat_result]] = []
+    for dirpath, dirnames, filenames in os.walk(site_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            relpath = os.path.relpath(path, site_dir).replace(os.sep, "/")
+            stat = os.stat(path)
+            entry = previous_files.get(relpath)
+            if (
+                entry is not None
+                and entry["size"] == stat.st_size
+                and entry["mtime_ns"] == stat.st_mtime_ns
+            ):
+                files[relpath] = entry
+            else:
+                to_hash.append((relpath, path, stat))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hashes = executor.map(_hash_file, [path for _, path, _ in to_hash])
+        for (relpath, _, stat), sha256 in zip(to_hash, hashes):
+            files[relpath] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": sha256,
+            }
+
+    return {
+        "version": _MANIFEST_VERSION,
+        "files": dict(sorted(files.items())),
+    }
+
+
+def diff_manifests(
+    previous: Dict[str, Any], current: Dict[str, Any]
+) -> ManifestDiff:
+    """Compare two manifests by the content hashes of their files.
+
+    Parameters
+    ----------
+    previous : `dict`
+        The previous manifest, such as the manifest of the published site.
+    current : `dict`
+        The manifest of the new build.
+
+    Returns
+    -------
+    diff : `ManifestDiff`
+        The files that were added, modified, and removed, sorted by path.
+    """
+    previous_files = previous.get("files", {})
+    current_files = current.get("files", {})
+    diff = ManifestDiff()
+    for relpath, entry in sorted(current_files.items()):
+        previous_entry = previous_files.get(relpath)
+        if previous_entry is None:
+            diff.added.append(relpath)
+        elif previous_entry["sha256"] != entry["sha256"]:
+            diff.modified.append(relpath)
+        else:
+            diff.unchanged += 1
+    diff.removed = sorted(set(previous_files) - set(current_files))
+    return diff
+
+
+def read_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """Read a manifest file.
+
+    Parameters
+    ----------
+    path : `str`
+        Path of the manifest file.
+
+    Returns
+    -------
+    manifest : `dict` or `None`
+        The manifest, or `None` if the file doesn't exist or isn't valid
+        JSON.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    """Write a manifest file atomically.
+
+    Parameters
+    ----------
+    path : `str`
+        Path of the manifest file.
+    manifest : `dict`
+        The manifest (see `build_manifest`).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    atomic_write(path, (json.dumps(manifest, indent=1) + "\n").encode("utf-8"))
+
+
+def _hash_file(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
@@ -0,0 +1,235 @@
+"""A cache of Git-derived metadata for Sphinx configuration modules.
+
+Configuration modules like ``documenteer.conf.technote`` read the Git branch
+and commit dates every time Sphinx imports :file:`conf.py`. `GitMetadataCache`
+stores those values in the build directory, keyed on the state of the Git
+repository (the ``HEAD`` commit and a hash of the index). The key is
+computed by reading files in the :file:`.git` directory directly, so a cache
+hit doesn't import GitPython or run ``git``.
+"""
+
+__all__ = [
+    "CACHE_FILENAME",
+    "GitMetadataCache",
+    "find_git_dir",
+    "read_git_state_key",
+]
+
+import datetime
+import hashlib
+import json
+import os
+
+from ..utils import atomic_write
+
+CACHE_FILENAME = "documenteer-git-metadata.json"
+"""Name of the cache file in the build directory."""
+
+
+def find_git_dir(path="."):
+    """Find the Git directory of the repository containing a path.
+
+    Parameters
+    ----------
+    path : `str`, optional
+        A path in the repository's working tree. Current working directory by
+        default.
+
+    Returns
+    -------
+    git_dir : `str` or `None`
+        Path of the Git directory (usually :file:`.git`, or the directory
+        that a :file:`.git` file points to in a worktree or submodule), or
+        `None` if ``path`` isn't in a Git repository.
+    """
+    path = os.path.abspath(path)
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):
+            with open(candidate) as f:
+                content = f.read().strip()
+            if content.startswith("gitdir:"):
+                return os.path.normpath(
+                    os.path.join(path, content[len("gitdir:") :].strip())
+                )
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _read_ref(git_dir, common_dir, ref):
+    """Resolve a ref (such as ``refs/heads/main``) to a commit SHA from the
+    loose or packed refs of a Git directory.
+    """
+    for directory in (git_dir, common_dir):
+        try:
+            with open(os.path.join(directory, ref)) as f:
+                content = f.read().strip()
+        except OSError:
+            continue
+        if content.startswith("ref: "):
+            return _read_ref(git_dir, common_dir, content[len("ref: ") :])
+        return content
+    try:
+        with open(os.path.join(common_dir, "packed-refs")) as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    except OSError:
+        pass
+    return None
+
+
+def read_git_state_key(path="."):
+    """Make a key for the state of a Git repository without running ``git``.
+
+    Parameters
+    ----------
+    path : `str`, optional
+        A path in the repository's working tree. Current working directory by
+        default.
+
+    Returns
+    -------
+    key : `str` or `None`
+        A hash of the ``HEAD`` reference (which includes the branch name),
+        the ``HEAD`` commit SHA, and the content of the index. `None` if
+        ``path`` isn't in a Git repository or ``HEAD`` can't be resolved
+        (for example, before the first commit).
+    """
+    git_dir = find_git_dir(path)
+    if git_dir is None:
+        return None
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, "commondir")) as f:
+            common_dir = os.path.normpath(
+                os.path.join(git_dir, f.read().strip())
+            )
+    except OSError:
+        pass
+
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+    if head.startswith("ref: "):
+        sha = _read_ref(git_dir, common_dir, head[len("ref: ") :])
+    else:
+        sha = head
+    if not sha:
+        return None
+
+    index_hash = hashlib.sha256()
+    try:
+        with open(os.path.join(git_dir, "index"), "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                index_hash.update(chunk)
+    except OSError:
+        pass
+
+    key = hashlib.sha256()
+    for part in (head, sha, index_hash.hexdigest()):
+        key.update(part.encode("utf-8"))
+        key.update(b"\0")
+    return key.hexdigest()
+
+
+class GitMetadataCache:
+    """A cache of Git-derived metadata, stored in the build directory.
+
+    Parameters
+    ----------
+    build_dir : `str`, optional
+        The Sphinx build directory. The cache is only used if this directory
+        exists, so importing a configuration in a fresh checkout doesn't
+        create it.
+    repo_path : `str`, optional
+        A path in the Git repository's working tree. Current working
+        directory by default.
+
+    Examples
+    --------
+    >>> cache = GitMetadataCache("_build")
+    >>> branch = cache.get("branch", read_git_branch)  # doctest: +SKIP
+
+    Notes
+    -----
+    The whole cache is discarded when the ``HEAD`` commit, branch, or index
+    changes (see `read_git_state_key`). Values can be `str`, `None`, or
+    `datetime.datetime` objects.
+    """
+
+    def __init__(self, build_dir="_build", repo_path="."):
+        self.path = os.path.join(build_dir, CACHE_FILENAME)
+        self.key = None
+        self._values = {}
+        if not os.path.isdir(build_dir):
+            return
+        self.key = read_git_state_key(repo_path)
+        if self.key is None:
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("key") == self.key:
+            self._values = data.get("values", {})
+
+    @property
+    def enabled(self):
+        """Whether the cache is used (`bool`)."""
+        return self.key is not None
+
+    def get(self, name, compute):
+        """Get a value from the cache, or compute and cache it.
+
+        Parameters
+        ----------
+        name : `str`
+            Name of the value. The name should include any parameters that
+            the value depends on.
+        compute : callable
+            Function, with no arguments, that computes the value on a cache
+            miss. Exceptions raised by this function are not cached.
+
+        Returns
+        -------
+        value
+            The value.
+        """
+        if not self.enabled:
+            return compute()
+        if name in self._values:
+            return self._decode(self._values[name])
+        value = compute()
+        self._values[name] = self._encode(value)
+        self._save()
+        return value
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, datetime.datetime):
+            return {"datetime": value.isoformat()}
+        return {"value": value}
+
+    @staticmethod
+    def _decode(encoded):
+        if "datetime" in encoded:
+            return datetime.datetime.fromisoformat(encoded["datetime"])
+        return encoded["value"]
+
+    def _save(self):
+        data = {"key": self.key, "values": self._values}
+        try:
+            atomic_write(self.path, json.dumps(data).encode("utf-8"))
+        except OSError:
+            pass
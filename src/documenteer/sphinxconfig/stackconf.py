@@ -17,6 +17,7 @@ import lsst_sphinx_bootstrap_theme
 
 from documenteer.packagemetadata import Semver, get_package_version_semver
 
+from .gitcache import GitMetadataCache
 from .utils import read_git_commit_timestamp
 
 
@@ -487,7 +488,7 @@ def build_package_configs(
     c = _insert_single_package_eups_version(c, version)
 
     try:
-        date = read_git_commit_timestamp()
+        date = read_git_commit_timestamp(cache=GitMetadataCache("_build"))
     except Exception:
         date = datetime.datetime.now()
 
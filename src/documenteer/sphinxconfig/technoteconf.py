@@ -10,6 +10,7 @@ import os
 import lsst_dd_rtd_theme
 import yaml
 
+from ..sphinxconfig.gitcache import GitMetadataCache
 from ..sphinxconfig.utils import (
     get_project_content_commit_date,
     read_git_branch,
@@ -84,9 +85,12 @@ def _build_confs(metadata):
         "exclude_patterns", ["_build", "README.rst"]
     )
 
+    # Cache of Git metadata in _build, for incremental builds
+    git_cache = GitMetadataCache("_build")
+
     # attempt to obtain the version as the Git branch
     try:
-        c["version"] = read_git_branch()
+        c["version"] = read_git_branch(cache=git_cache)
         c["git_branch"] = c["version"]
     except Exception as e:
         print("Caught exception: {}".format(e))
@@ -126,7 +130,7 @@ def _build_confs(metadata):
         # obain date from git commit at most recent content commit since HEAD
         try:
             date = get_project_content_commit_date(
-                exclusions=c["exclude_patterns"]
+                exclusions=c["exclude_patterns"], cache=git_cache
             )
         except Exception as e:
             print("Caught exception: {}".format(e))
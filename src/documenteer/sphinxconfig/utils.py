@@ -1,33 +1,46 @@
 """Utilities for sphinx configuration."""
 
+import datetime
+import json
 import logging
 import os
 import re
 
-import git
 from sphinx.util.matching import Matcher
 
+# GitPython is imported by the functions that use it, so that configuration
+# modules that get Git metadata from a GitMetadataCache don't import it.
+
 TICKET_BRANCH_PATTERN = re.compile(r"^tickets/([A-Z]+-[0-9]+)$")
 
 # does it start with vN and look like a version tag?
 TAG_PATTERN = re.compile(r"^v\d")
 
 
-def read_git_branch():
+def read_git_branch(cache=None):
     """Obtain the current branch name from the Git repository. If on Travis CI,
     use the ``TRAVIS_BRANCH`` environment variable.
+
+    Parameters
+    ----------
+    cache : `documenteer.sphinxconfig.gitcache.GitMetadataCache`, optional
+        Cache for the branch name.
     """
     if os.getenv("TRAVIS"):
         return os.getenv("TRAVIS_BRANCH")
+    elif cache is not None:
+        return cache.get("branch", read_git_branch)
     else:
         try:
+            import git
+
             repo = git.repo.base.Repo(search_parent_directories=True)
             return repo.active_branch.name
         except Exception:
             return ""
 
 
-def read_git_commit_timestamp(repo_path=None):
+def read_git_commit_timestamp(repo_path=None, cache=None):
     """Obtain the timestamp from the current head commit of a Git repository.
 
     Parameters
@@ -35,12 +48,22 @@ def read_git_commit_timestamp(repo_path=None):
     repo_path : `str`, optional
         Path to the Git repository. Leave as `None` to use the current working
         directory.
+    cache : `documenteer.sphinxconfig.gitcache.GitMetadataCache`, optional
+        Cache for the timestamp.
 
     Returns
     -------
     commit_timestamp : `datetime.datetime`
         The datetime of the head commit.
     """
+    if cache is not None:
+        name = "commit_timestamp:{}".format(
+            os.path.abspath(repo_path or os.path.curdir)
+        )
+        return cache.get(name, lambda: read_git_commit_timestamp(repo_path))
+
+    import git
+
     repo = git.repo.base.Repo(path=repo_path, search_parent_directories=True)
     head_commit = repo.head.commit
     return head_commit.committed_datetime
@@ -68,17 +91,101 @@ def read_git_commit_timestamp_for_file(filepath, repo_path=None):
     IOError
         Raised if the ``filepath`` does not exist in the Git repository.
     """
+    import git
+
     repo = git.repo.base.Repo(path=repo_path, search_parent_directories=True)
-    head_commit = repo.head.commit
 
     # most recent commit datetime of the given file
-    for commit in head_commit.iter_parents(filepath):
+    for commit in repo.iter_commits(repo.head.commit, paths=filepath):
         return commit.committed_datetime
 
     # Only get here if git could not find the file path in the history
     raise IOError("File {} not found".format(filepath))
 
 
+def read_git_commit_timestamps_for_files(filepaths, root_dir="."):
+    """Obtain the timestamps for the most recent commits to several files
+    in a Git repository, with a single pass over the repository's history.
+
+    Parameters
+    ----------
+    filepaths : iterable of `str`
+        File paths, relative to ``root_dir``.
+    root_dir : `str`, optional
+        Directory in the Git repository that the ``filepaths`` are relative
+        to. Current working directory by default.
+
+    Returns
+    -------
+    commit_timestamps : `dict`
+        Mapping of file paths to the `datetime.datetime` of the most recent
+        commit to each file. File paths that are not in the Git history are
+        not included.
+
+    Notes
+    -----
+    This function is equivalent to calling
+    `read_git_commit_timestamp_for_file` for each file path, but it reads
+    the output of a single ``git log --name-only`` command, newest commits
+    first, and stops once every file has been seen.
+    """
+    import git
+
+    root_dir = os.path.abspath(root_dir)
+    # Raises if root_dir isn't in a Git repository
+    git.repo.base.Repo(path=root_dir, search_parent_directories=True)
+
+    # Git reports paths with forward slashes
+    remaining = {p.replace(os.path.sep, "/"): p for p in filepaths}
+    commit_timestamps = {}
+    if not remaining:
+        return commit_timestamps
+
+    # With -z, the commit lines (marked with \x01) and file names are
+    # NUL-terminated, and file names are not quoted.
+    process = git.cmd.Git(root_dir).log(
+        "HEAD",
+        "--format=%x01%cI",
+        "--name-only",
+        "--no-renames",
+        "--relative",
+        "-z",
+        "--",
+        ".",
+        as_process=True,
+    )
+    commit_datetime = None
+    try:
+        for token in _iter_nul_terminated(process.stdout):
+            token = token.lstrip("\n")
+            if token.startswith("\x01"):
+                commit_datetime = datetime.datetime.fromisoformat(token[1:])
+            elif token in remaining:
+                commit_timestamps[remaining.pop(token)] = commit_datetime
+                if not remaining:
+                    break
+    finally:
+        process.proc.kill()
+        process.proc.wait()
+    return commit_timestamps
+
+
+def _iter_nul_terminated(stream, chunk_size=65536):
+    """Iterate over the NUL-terminated strings in a binary stream."""
+    read = getattr(stream, "read1", stream.read)
+    buffer = b""
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        *tokens, buffer = buffer.split(b"\0")
+        for token in tokens:
+            yield token.decode("utf-8", errors="surrogateescape")
+    if buffer:
+        yield buffer.decode("utf-8", errors="surrogateescape")
+
+
 def get_filepaths_with_extension(extname, root_dir="."):
     """Get relative filepaths of files in a directory, and sub-directories,
     with the given extension.
@@ -116,7 +223,71 @@ def get_filepaths_with_extension(extname, root_dir="."):
     return selected_filenames
 
 
-def get_project_content_commit_date(root_dir=".", exclusions=None):
+PRUNED_DIRNAMES = frozenset(("_build", "node_modules", "__pycache__"))
+"""Names of directories that `get_filepaths_with_extensions` doesn't
+search.
+"""
+
+
+def get_filepaths_with_extensions(extnames, root_dir=".", exclusions=None):
+    """Get relative filepaths of files in a directory, and sub-directories,
+    with any of the given extensions, in a single pass over the directory
+    tree.
+
+    Parameters
+    ----------
+    extnames : iterable of `str`
+        Extension names (e.g. 'txt', 'rst'). Extension comparison is
+        case-insensitive.
+    root_dir : `str`, optional
+        Root directory. Current working directory by default.
+    exclusions : `list` of `str`, optional
+        Sphinx-style glob patterns for file paths or top-level directory
+        paths to ignore.
+
+    Returns
+    -------
+    filepaths : `list` of `str`
+        File paths, relative to ``root_dir``, with the given extensions.
+
+    Notes
+    -----
+    Hidden directories (such as ``.git``), directories in `PRUNED_DIRNAMES`,
+    virtual environments, and top-level directories that match
+    ``exclusions`` are not searched.
+    """
+    # needed for comparison with os.path.splitext, and case-insensitivity
+    extnames = {
+        (e if e.startswith(".") else "." + e).lower() for e in extnames
+    }
+    exclude = Matcher(exclusions if exclusions else [])
+
+    root_dir = os.path.abspath(root_dir)
+
+    selected_filenames = []
+    for dirname, sub_dirnames, filenames in os.walk(root_dir):
+        rel_dirname = os.path.relpath(dirname, start=root_dir)
+        if rel_dirname == os.path.curdir:
+            rel_dirname = ""
+        sub_dirnames[:] = [
+            d
+            for d in sub_dirnames
+            if not (
+                d.startswith(".")
+                or d in PRUNED_DIRNAMES
+                or (not rel_dirname and exclude(d))
+                or os.path.isfile(os.path.join(dirname, d, "pyvenv.cfg"))
+            )
+        ]
+        for filename in filenames:
+            if os.path.splitext(filename)[-1].lower() in extnames:
+                filepath = os.path.join(rel_dirname, filename)
+                if not exclude(filepath):
+                    selected_filenames.append(filepath)
+    return selected_filenames
+
+
+def get_project_content_commit_date(root_dir=".", exclusions=None, cache=None):
     """Get the datetime for the most recent commit to a project that
     affected Sphinx content.
 
@@ -139,6 +310,8 @@ def get_project_content_commit_date(root_dir=".", exclusions=None):
         Root directory. This is the current working directory by default.
     exclusions : `list` of `str`, optional
         List of file paths or directory paths to ignore.
+    cache : `documenteer.sphinxconfig.gitcache.GitMetadataCache`, optional
+        Cache for the commit date.
 
     Returns
     -------
@@ -150,41 +323,41 @@ def get_project_content_commit_date(root_dir=".", exclusions=None):
     RuntimeError
         Raised if no content files are found.
     """
+    if cache is not None:
+        name = "content_commit_date:{}".format(
+            json.dumps([os.path.abspath(root_dir), exclusions])
+        )
+        return cache.get(
+            name,
+            lambda: get_project_content_commit_date(
+                root_dir=root_dir, exclusions=exclusions
+            ),
+        )
+
     logger = logging.getLogger(__name__)
 
     # Supported 'content' extensions
     extensions = ("rst", "ipynb", "png", "jpeg", "jpg", "svg", "gif")
 
-    content_paths = []
-    for extname in extensions:
-        content_paths += get_filepaths_with_extension(
-            extname, root_dir=root_dir
-        )
-
     # Known files that should be excluded; lower case for comparison
-    exclude = Matcher(
-        exclusions if exclusions else ["readme.rst", "license.rst"]
+    content_paths = get_filepaths_with_extensions(
+        extensions,
+        root_dir=root_dir,
+        exclusions=exclusions if exclusions else ["readme.rst", "license.rst"],
     )
-
-    # filter out excluded files
-    content_paths = [
-        p
-        for p in content_paths
-        if not (exclude(p) or exclude(p.split(os.path.sep)[0]))
-    ]
     logger.debug("Found content paths: {}".format(", ".join(content_paths)))
 
     if not content_paths:
         raise RuntimeError("No content files found in {}".format(root_dir))
 
+    commit_timestamps = read_git_commit_timestamps_for_files(
+        content_paths, root_dir=root_dir
+    )
     commit_datetimes = []
     for filepath in content_paths:
         try:
-            datetime = read_git_commit_timestamp_for_file(
-                filepath, repo_path=root_dir
-            )
-            commit_datetimes.append(datetime)
-        except IOError:
+            commit_datetimes.append(commit_timestamps[filepath])
+        except KeyError:
             logger.warning(
                 "Could not get commit for {}, skipping".format(filepath)
             )
@@ -17,17 +17,22 @@ automatically enabled. They should be specified individually. They are:
 __all__ = ["setup"]
 
 from ..version import __version__
-from . import (
-    jira,
-    lsstdocushare,
-    mockcoderefs,
-    packagetoctree,
-    remotecodeblock,
-)
 
 
 def setup(app):
     """Wrapper for the `setup` functions of each extension module."""
+    # The extension modules are imported here, rather than when the package
+    # is imported, so that importing one extension (like
+    # documenteer.sphinxext.bibtex) doesn't import all of them and their
+    # dependencies.
+    from . import (
+        jira,
+        lsstdocushare,
+        mockcoderefs,
+        packagetoctree,
+        remotecodeblock,
+    )
+
     jira.setup(app)
     lsstdocushare.setup(app)
     mockcoderefs.setup(app)
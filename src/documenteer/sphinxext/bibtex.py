@@ -1,10 +1,30 @@
 """Extensions to support LSST bibliographies with
 `sphinxcontrib-bibtex <http://sphinxcontrib-bibtex.readthedocs.io>`_.
+
+Besides the ``lsst_aa`` bibliography style, this extension keeps a cache of
+parsed bib files in the doctree directory so that builds don't re-parse
+large, unchanged bib files (such as the lsst-texmf files in technotes) with
+pybtex.
 """
 
-__all__ = ("LsstBibtexStyle", "setup")
+__all__ = (
+    "LsstBibtexStyle",
+    "BibCache",
+    "parse_bibdata_cached",
+    "check_bib_subsets",
+    "setup",
+)
+
+import copy
+import hashlib
+import os
+import pickle
+from pathlib import Path
 
+import pybtex
 import pybtex.style.formatting.plain
+from pybtex.database import BibliographyDataError
+from pybtex.database.input.bibtex import Parser, month_names
 from pybtex.plugin import register_plugin
 from pybtex.style.formatting import toplevel
 from pybtex.style.template import (
@@ -17,6 +37,31 @@ from pybtex.style.template import (
     sentence,
     tag,
 )
+from sphinx.util.logging import getLogger
+
+from ..bibsubset import (
+    find_cited_keys,
+    find_keys_missing_from_bib,
+    find_source_files,
+)
+from ..packagemetadata import (
+    PackageNotFoundError,
+    Semver,
+    get_package_version_semver,
+)
+from ..utils import atomic_write
+from ..version import __version__
+
+_MIN_BIBTEX_CACHE_VERSION_STR = "2.6.0"
+"""Oldest sphinxcontrib-bibtex version that the bib file cache supports.
+
+The cache replaces sphinxcontrib-bibtex's internal ``parse_bibdata``
+function, and uses the internal ``BibData``, ``BibFile``, ``get_mtime``,
+and ``is_bibdata_outdated`` APIs of its ``bibfile`` module. With older
+versions, the stock ``cite`` domain is used.
+"""
+
+_MIN_BIBTEX_CACHE_VERSION = Semver.parse(_MIN_BIBTEX_CACHE_VERSION_STR)
 
 
 class LsstBibtexStyle(pybtex.style.formatting.plain.Style):
@@ -43,6 +88,338 @@ class LsstBibtexStyle(pybtex.style.formatting.plain.Style):
         return template.format_data(e)
 
 
+class BibCache:
+    """A cache of parsed bib files.
+
+    Parameters
+    ----------
+    directory : `str`
+        Directory where parsed bib files are stored. It is created if
+        necessary.
+
+    Notes
+    -----
+    Each parsed bib file is pickled to a file named after a hash of the bib
+    file's content, its encoding, the pybtex version, and the ``@string``
+    macros defined by the bib files parsed before it (since a bib file can
+    use macros defined by an earlier file).
+    """
+
+    format_version = 1
+    """Version of the cache's file format."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.used = set()
+        self.stats = {"hits": 0, "misses": 0}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def make_key(self, content, encoding, macros):
+        """Make the cache key for a bib file.
+
+        Parameters
+        ----------
+        content : `bytes`
+            Content of the bib file.
+        encoding : `str`
+            Encoding of the bib file.
+        macros : `dict`
+            The ``@string`` macros defined before the bib file is parsed.
+
+        Returns
+        -------
+        key : `str`
+            The cache key.
+        """
+        h = hashlib.sha256()
+        h.update(
+            repr((self.format_version, pybtex.__version__, encoding)).encode(
+                "utf-8"
+            )
+        )
+        h.update(hashlib.sha256(content).digest())
+        h.update(repr(sorted(macros.items())).encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key):
+        """Get a parsed bib file.
+
+        Parameters
+        ----------
+        key : `str`
+            The cache key (see `make_key`).
+
+        Returns
+        -------
+        parsed : `tuple` or `None`
+            Tuple of the entries (a `list` of key and
+            ``pybtex.database.Entry`` tuples), the preamble (a `list`), and
+            the ``@string`` macros defined after the bib file is parsed (a
+            `dict`), or `None` if the bib file isn't cached.
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                parsed = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            self.stats["misses"] += 1
+            return None
+        self.used.add(key)
+        self.stats["hits"] += 1
+        return parsed
+
+    def put(self, key, parsed):
+        """Add a parsed bib file to the cache.
+
+        Parameters
+        ----------
+        key : `str`
+            The cache key (see `make_key`).
+        parsed : `tuple`
+            The parsed bib file (see `get`).
+        """
+        atomic_write(
+            self._path(key),
+            pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        self.used.add(key)
+
+    def prune(self):
+        """Remove the parsed bib files that weren't used by this build."""
+        for name in os.listdir(self.directory):
+            key, ext = os.path.splitext(name)
+            if ext == ".pickle" and key not in self.used:
+                os.remove(os.path.join(self.directory, name))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+
+def parse_bibdata_cached(bibfilenames, encoding, cache):
+    """Parse bib files, reusing the parsed data of unchanged files from a
+    cache.
+
+    This function is a drop-in replacement for
+    ``sphinxcontrib.bibtex.bibfile.parse_bibdata``.
+
+    Parameters
+    ----------
+    bibfilenames : `list` of `pathlib.Path`
+        Paths of the bib files.
+    encoding : `str`
+        Encoding of the bib files.
+    cache : `BibCache`
+        The cache of parsed bib files.
+
+    Returns
+    -------
+    bibdata : ``sphinxcontrib.bibtex.bibfile.BibData``
+        The parsed data.
+    """
+    from sphinxcontrib.bibtex.bibfile import BibData, BibFile, get_mtime
+
+    logger = getLogger(__name__)
+
+    data = Parser(encoding).data
+    macros = dict(month_names)
+    bibfiles = {}
+    for filename in bibfilenames:
+        if not filename.is_file():
+            logger.warning(
+                "could not open bibtex file {0}.".format(filename),
+                type="bibtex",
+                subtype="bibfile_error",
+            )
+            bibfiles[filename] = BibFile(mtime=get_mtime(filename), keys={})
+            continue
+
+        key = cache.make_key(filename.read_bytes(), encoding, macros)
+        parsed = cache.get(key)
+        if parsed is not None:
+            logger.info(
+                "loaded bibtex file {0} from cache... ".format(filename),
+                nonl=True,
+            )
+        else:
+            logger.info(
+                "parsing bibtex file {0}... ".format(filename), nonl=True
+            )
+            parser = Parser(encoding, macros=macros)
+            try:
+                parser.parse_file(filename)
+            except BibliographyDataError as exc:
+                # Don't cache the partially-parsed file, so that the warning
+                # is repeated by the next build.
+                logger.warning(
+                    "bibliography data error in {0}: {1}".format(
+                        filename, exc
+                    ),
+                    type="bibtex",
+                    subtype="bibfile_data_error",
+                )
+                error = True
+            else:
+                error = False
+            parsed = (
+                list(parser.data.entries.items()),
+                list(parser.data.preamble_list),
+                dict(parser.macros),
+            )
+            if not error:
+                cache.put(key, parsed)
+
+        entries, preamble, macros = parsed
+        new_keys = {}
+        try:
+            for entry_key, entry in entries:
+                data.add_entry(entry_key, entry)
+                new_keys[entry.key] = None
+        except BibliographyDataError as exc:
+            logger.warning(
+                "bibliography data error in {0}: {1}".format(filename, exc),
+                type="bibtex",
+                subtype="bibfile_data_error",
+            )
+        data.add_to_preamble(*preamble)
+        logger.info("parsed {0} entries".format(len(new_keys)))
+        bibfiles[filename] = BibFile(mtime=get_mtime(filename), keys=new_keys)
+
+    return BibData(encoding=encoding, bibfiles=bibfiles, data=data)
+
+
+def _make_cached_domain(base_domain_class):
+    """Make a subclass of sphinxcontrib-bibtex's ``BibtexDomain`` that
+    parses bib files through a `BibCache`.
+    """
+    from sphinxcontrib.bibtex.bibfile import is_bibdata_outdated
+
+    class CachedBibtexDomain(base_domain_class):
+        def __init__(self, env):
+            # Put up-to-date bib data into the domain data before the base
+            # class checks it, so that the base class doesn't re-parse the
+            # bib files.
+            config = env.app.config
+            if config.bibtex_bibfiles is not None:
+                bibfiles = [
+                    (Path(env.app.confdir) / bibfile).resolve()
+                    for bibfile in config.bibtex_bibfiles
+                ]
+                if self.name not in env.domaindata:
+                    data = copy.deepcopy(self.initial_data)
+                    data["version"] = self.data_version
+                    env.domaindata[self.name] = data
+                data = env.domaindata[self.name]
+                if is_bibdata_outdated(
+                    data["bibdata"], bibfiles, config.bibtex_encoding
+                ):
+                    cache = BibCache(
+                        os.path.join(env.app.doctreedir, "bibtex-cache")
+                    )
+                    data["bibdata"] = parse_bibdata_cached(
+                        bibfiles, config.bibtex_encoding, cache
+                    )
+                    cache.prune()
+                    getLogger(__name__).info(
+                        "bibtex cache: %d of %d bib files loaded from cache",
+                        cache.stats["hits"],
+                        len(bibfiles),
+                    )
+            super().__init__(env)
+
+    return CachedBibtexDomain
+
+
+def install_bib_cache(app, config):
+    """Replace sphinxcontrib-bibtex's ``cite`` domain with one that caches
+    parsed bib files (``config-inited`` event handler).
+    """
+    if not config.documenteer_bibtex_cache:
+        return
+    if "sphinxcontrib.bibtex" not in app.extensions:
+        return
+    logger = getLogger(__name__)
+    try:
+        bibtex_version = get_package_version_semver("sphinxcontrib-bibtex")
+    except (PackageNotFoundError, ValueError):
+        bibtex_version = None
+    if bibtex_version is None or bibtex_version < _MIN_BIBTEX_CACHE_VERSION:
+        logger.debug(
+            "Not caching bib files; the cache requires sphinxcontrib-bibtex "
+            "%s or later",
+            _MIN_BIBTEX_CACHE_VERSION_STR,
+        )
+        return
+    try:
+        from sphinxcontrib.bibtex.bibfile import (  # noqa: F401
+            BibData,
+            BibFile,
+            get_mtime,
+            is_bibdata_outdated,
+        )
+        from sphinxcontrib.bibtex.domain import BibtexDomain
+    except ImportError:
+        logger.debug(
+            "Not caching bib files; unsupported sphinxcontrib-bibtex version"
+        )
+        return
+    app.add_domain(_make_cached_domain(BibtexDomain), override=True)
+
+
+def check_bib_subsets(app, config):
+    """Use the full bib files instead of a bib file subset that doesn't
+    contain every cited key (``config-inited`` event handler).
+
+    The ``documenteer_bibtex_subsets`` configuration maps the paths of
+    subsets, such as the ``lsstbib-cited.bib`` file written by
+    ``refresh-lsst-bib --prune-to-citations``, to the paths of the full bib
+    files. A subset is only checked if a source file was modified after it,
+    so that builds of unchanged projects don't scan their source files.
+    """
+    subsets = config.documenteer_bibtex_subsets
+    if not subsets or not config.bibtex_bibfiles:
+        return
+    logger = getLogger(__name__)
+    bibfiles = list(config.bibtex_bibfiles)
+    source_paths = None
+    for subset, full_bibfiles in subsets.items():
+        if subset not in bibfiles or not full_bibfiles:
+            continue
+        try:
+            subset_mtime = os.stat(os.path.join(app.srcdir, subset)).st_mtime
+        except OSError:
+            continue
+        if source_paths is None:
+            source_paths = find_source_files(app.srcdir)
+        if all(os.stat(p).st_mtime <= subset_mtime for p in source_paths):
+            continue
+        missing_keys = find_keys_missing_from_bib(
+            find_cited_keys(source_paths),
+            [os.path.join(app.srcdir, bibfile) for bibfile in bibfiles],
+        )
+        if not missing_keys:
+            continue
+        logger.warning(
+            "%s doesn't contain the cited keys %s, so %s are used instead. "
+            "Run refresh-lsst-bib --prune-to-citations to update it.",
+            subset,
+            ", ".join(missing_keys),
+            ", ".join(full_bibfiles),
+        )
+        index = bibfiles.index(subset)
+        bibfiles[index : index + 1] = full_bibfiles
+    config.bibtex_bibfiles = bibfiles
+
+
 def setup(app):
     """Add this plugin to the Sphinx application."""
     register_plugin("pybtex.style.formatting", "lsst_aa", LsstBibtexStyle)
+
+    app.add_config_value("documenteer_bibtex_cache", True, "env")
+    app.add_config_value("documenteer_bibtex_subsets", {}, "env")
+    app.connect("config-inited", check_bib_subsets)
+    app.connect("config-inited", install_bib_cache)
+
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -0,0 +1,131 @@
+"""A per-build index of document names for directives that generate
+toctrees from the documents found in the project.
+
+Directives like ``module-toctree``, ``package-toctree``, and the lssttasks
+topic listings select documents by path prefix. Scanning
+``env.found_docs`` in each directive is slow for sites with tens of
+thousands of documents (such as automodapi's ``py-api`` pages), so this
+extension builds a sorted index of the document names once, before the
+documents are read, and the directives query it with `get_docname_index`.
+"""
+
+__all__ = ["setup", "DocnameIndex", "get_docname_index"]
+
+import weakref
+from bisect import bisect_left
+from typing import Iterable, List
+
+from sphinx.environment import BuildEnvironment
+
+from ..version import __version__
+
+_INDEXES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+"""Docname indexes for the current read phase, keyed by build environment.
+
+The indexes are kept outside of the environment so that they aren't
+pickled with it.
+"""
+
+
+class DocnameIndex:
+    """Sorted index of document names, supporting fast prefix queries.
+
+    Parameters
+    ----------
+    docnames : iterable of `str`
+        Document names (usually ``env.found_docs``).
+    """
+
+    def __init__(self, docnames: Iterable[str]) -> None:
+        self._docnames = sorted(docnames)
+
+    def __len__(self) -> int:
+        return len(self._docnames)
+
+    def prefixed(self, prefix: str) -> List[str]:
+        """Get the document names that start with a prefix.
+
+        Parameters
+        ----------
+        prefix : `str`
+            The prefix, such as ``"tasks/lsst.pipe.tasks"``.
+
+        Returns
+        -------
+        docnames : `list` of `str`
+            The matching document names, sorted.
+        """
+        start = bisect_left(self._docnames, prefix)
+        docnames = []
+        for docname in self._docnames[start:]:
+            if not docname.startswith(prefix):
+                break
+            docnames.append(docname)
+        return docnames
+
+    def index_pages(self, base_dir: str) -> List[str]:
+        """Get the document names with the form ``<base_dir>/<name>/index``.
+
+        Parameters
+        ----------
+        base_dir : `str`
+            Base directory of all sub-directories containing index pages.
+
+        Returns
+        -------
+        docnames : `list` of `str`
+            The matching document names, sorted.
+        """
+        docnames = []
+        for docname in self.prefixed(base_dir + "/"):
+            parts = docname.split("/")
+            if len(parts) == 3 and parts[2] == "index":
+                docnames.append(docname)
+        return docnames
+
+
+def get_docname_index(env: BuildEnvironment) -> DocnameIndex:
+    """Get the docname index for a build environment.
+
+    Parameters
+    ----------
+    env : ``sphinx.environment.BuildEnvironment``
+        The build environment.
+
+    Returns
+    -------
+    DocnameIndex
+        The index of ``env.found_docs``. The index is created when reading
+        begins, or on demand if this extension's event handlers haven't run.
+    """
+    try:
+        return _INDEXES[env]
+    except KeyError:
+        index = DocnameIndex(env.found_docs)
+        _INDEXES[env] = index
+        return index
+
+
+def _build_index(app, env, docnames):
+    """Build the docname index once the documents to read are known
+    (``env-before-read-docs`` event handler).
+    """
+    _INDEXES[env] = DocnameIndex(env.found_docs)
+
+
+def _drop_index(app, env):
+    """Drop the docname index once reading is done (``env-updated`` event
+    handler).
+    """
+    _INDEXES.pop(env, None)
+
+
+def setup(app):
+    app.connect("env-before-read-docs", _build_index)
+    app.connect("env-updated", _drop_index)
+
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
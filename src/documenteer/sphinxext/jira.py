@@ -8,6 +8,8 @@ import logging
 
 from docutils import nodes, utils
 
+from ..version import __version__
+
 log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
@@ -159,3 +161,9 @@ def setup(app):
     app.add_role("jira", jira_role)
     app.add_role("jirab", jira_bracket_role)
     app.add_role("jirap", jira_parens_role)
+
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
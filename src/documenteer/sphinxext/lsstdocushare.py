@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from docutils import nodes
 
+from ..version import __version__
+
 if TYPE_CHECKING:
     from docutils.nodes import Node, system_message
     from docutils.parsers.rst.states import Inliner
@@ -93,7 +95,7 @@ def lsst_doc_shortlink_titlecase_display_role(
     return [node], []
 
 
-def setup(app: Sphinx) -> None:
+def setup(app: Sphinx) -> Dict[str, Any]:
     # LSST Data Management
     app.add_role("ldm", lsst_doc_shortlink_role)
     # LSST Systems Engineering
@@ -143,3 +145,9 @@ def setup(app: Sphinx) -> None:
     app.add_role("ittn", lsstio_doc_shortlink_role)
     # T&S Technical Note
     app.add_role("tstn", lsstio_doc_shortlink_role)
+
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
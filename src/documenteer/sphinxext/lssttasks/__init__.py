@@ -9,18 +9,12 @@ from .configfieldlists import (
     ConfigFieldListingDirective,
     StandaloneConfigFieldsDirective,
     SubtaskListingDirective,
+    setup_render_cache,
 )
-from .crossrefs import (
-    config_ref_role,
-    configfield_ref_role,
-    pending_config_xref,
-    pending_configfield_xref,
-    pending_task_xref,
-    process_pending_config_xref_nodes,
-    process_pending_configfield_xref_nodes,
-    process_pending_task_xref_nodes,
-    task_ref_role,
-)
+from .configtree import setup_config_tree
+from .crossrefs import config_ref_role, configfield_ref_role, task_ref_role
+from .domain import LsstDomain
+from .importprofile import setup_import_profile
 from .pyapisummary import TaskApiDirective
 from .topiclists import (
     CmdLineTaskListDirective,
@@ -39,6 +33,7 @@ from .topics import (
 
 
 def setup(app):
+    app.setup_extension("documenteer.sphinxext.docnameindex")
     app.add_directive(
         ConfigFieldListingDirective.directive_name,
         ConfigFieldListingDirective,
@@ -69,16 +64,19 @@ def setup(app):
     )
     app.add_directive(ConfigListDirective.directive_name, ConfigListDirective)
     app.add_directive(TaskApiDirective.directive_name, TaskApiDirective)
-    app.add_node(pending_task_xref)
-    app.add_node(pending_config_xref)
-    app.add_node(pending_configfield_xref)
+    app.add_domain(LsstDomain)
     app.add_node(task_topic_list)
-    app.connect("doctree-resolved", process_pending_task_xref_nodes)
-    app.connect("doctree-resolved", process_pending_config_xref_nodes)
-    app.connect("doctree-resolved", process_pending_configfield_xref_nodes)
     app.connect("doctree-resolved", process_task_topic_list)
     app.add_role("lsst-task", task_ref_role)
     app.add_role("lsst-config", config_ref_role)
     app.add_role("lsst-config-field", configfield_ref_role)
+    setup_render_cache(app)
+    setup_config_tree(app)
+    setup_import_profile(app)
 
-    return {"version": __version__}
+    return {
+        "version": __version__,
+        "env_version": 2,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -9,10 +9,12 @@ __all__ = (
 )
 
 import functools
-from typing import Any, Callable, Dict
+import time
+from typing import Any, Callable, Dict, Tuple
 
 from docutils import nodes
 from docutils.parsers.rst import Directive
+from sphinx import addnodes
 from sphinx.errors import SphinxError
 from sphinx.util.logging import getLogger
 
@@ -21,12 +23,9 @@ from ..utils import (
     make_section,
     parse_rst_content,
 )
-from .crossrefs import (
-    format_configfield_id,
-    pending_config_xref,
-    pending_task_xref,
-)
+from .crossrefs import make_pending_xref
 from .taskutils import (
+    get_registry_target_name,
     get_subtask_fields,
     get_task_config_class,
     get_task_config_fields,
@@ -42,6 +41,27 @@ FIELD_FORMATTERS: Dict[str, Callable[[str, Any, str, Any, int], Any]] = {}
 External users should access this through `get_field_formatter`.
 """
 
+_RENDER_CACHE: Dict[Tuple[str, ...], Tuple[Any, str, float]] = {}
+"""Internal cache of rendered configuration field sections.
+
+Keys are ``(config class name, field name, formatter name, py:module,
+py:class)`` tuples. Values are ``(section, field_id, seconds)`` tuples of a
+pristine copy of the rendered section, the field ID it was rendered with, and
+the time it took to render. Access this through `render_field_section`.
+"""
+
+_UNCACHEABLE_NODES = (
+    nodes.footnote,
+    nodes.footnote_reference,
+    nodes.citation,
+    nodes.citation_reference,
+    nodes.substitution_reference,
+    nodes.system_message,
+)
+"""Node types that are registered with the document while parsing, so that
+sections containing them can't be reused in another document.
+"""
+
 
 class ConfigFieldListingDirective(Directive):
     """``lsst-task-config-fields`` directive that renders documentation for
@@ -81,7 +101,11 @@ class ConfigFieldListingDirective(Directive):
         logger.debug("%s using Task class %s", task_class_name)
 
         task_config_class = get_task_config_class(task_class_name)
+        config_class_name = ".".join(
+            (task_config_class.__module__, task_config_class.__name__)
+        )
         config_fields = get_task_config_fields(task_config_class)
+        domain = self.state.document.settings.env.get_domain("lsst")
 
         all_nodes = []
         for field_name, field in config_fields.items():
@@ -90,13 +114,6 @@ class ConfigFieldListingDirective(Directive):
             if isinstance(field, (ConfigurableField, RegistryField)):
                 continue
 
-            field_id = format_configfield_id(
-                ".".join(
-                    (task_config_class.__module__, task_config_class.__name__)
-                ),
-                field_name,
-            )
-
             try:
                 format_field_nodes = get_field_formatter(field)
             except ValueError:
@@ -106,9 +123,18 @@ class ConfigFieldListingDirective(Directive):
                 )
                 continue
 
+            field_id = domain.note_configfield(
+                config_class_name, field_name, self.lineno
+            )
             all_nodes.append(
-                format_field_nodes(
-                    field_name, field, field_id, self.state, self.lineno
+                render_field_section(
+                    format_field_nodes,
+                    config_class_name,
+                    field_name,
+                    field,
+                    field_id,
+                    self.state,
+                    self.lineno,
                 )
             )
 
@@ -168,16 +194,14 @@ class SubtaskListingDirective(Directive):
         )
 
         task_config_class = get_task_config_class(task_class_name)
+        config_class_name = ".".join(
+            (task_config_class.__module__, task_config_class.__name__)
+        )
         subtask_fields = get_subtask_fields(task_config_class)
+        domain = self.state.document.settings.env.get_domain("lsst")
 
         all_nodes = []
         for field_name, field in subtask_fields.items():
-            field_id = format_configfield_id(
-                ".".join(
-                    (task_config_class.__module__, task_config_class.__name__)
-                ),
-                field_name,
-            )
             try:
                 format_field_nodes = get_field_formatter(field)
             except ValueError:
@@ -187,9 +211,18 @@ class SubtaskListingDirective(Directive):
                 )
                 continue
 
+            field_id = domain.note_configfield(
+                config_class_name, field_name, self.lineno
+            )
             all_nodes.append(
-                format_field_nodes(
-                    field_name, field, field_id, self.state, self.lineno
+                render_field_section(
+                    format_field_nodes,
+                    config_class_name,
+                    field_name,
+                    field,
+                    field_id,
+                    self.state,
+                    self.lineno,
                 )
             )
 
@@ -237,17 +270,18 @@ class StandaloneConfigFieldsDirective(Directive):
         )
 
         config_class = get_type(config_class_name)
+        # Field IDs use the class's own importable name, not the argument,
+        # which could be a re-exported name
+        full_config_class_name = ".".join(
+            (config_class.__module__, config_class.__name__)
+        )
 
         config_fields = get_task_config_fields(config_class)
+        domain = self.state.document.settings.env.get_domain("lsst")
 
         all_nodes = []
 
         for field_name, field in config_fields.items():
-            field_id = format_configfield_id(
-                ".".join((config_class.__module__, config_class.__name__)),
-                field_name,
-            )
-
             try:
                 format_field_nodes = get_field_formatter(field)
             except ValueError:
@@ -257,9 +291,18 @@ class StandaloneConfigFieldsDirective(Directive):
                 )
                 continue
 
+            field_id = domain.note_configfield(
+                full_config_class_name, field_name, self.lineno
+            )
             all_nodes.append(
-                format_field_nodes(
-                    field_name, field, field_id, self.state, self.lineno
+                render_field_section(
+                    format_field_nodes,
+                    full_config_class_name,
+                    field_name,
+                    field,
+                    field_id,
+                    self.state,
+                    self.lineno,
                 )
             )
 
@@ -271,6 +314,262 @@ class StandaloneConfigFieldsDirective(Directive):
         return all_nodes
 
 
+def render_field_section(
+    formatter, config_class_name, field_name, field, field_id, state, lineno
+):
+    """Render the section that documents a configuration field, reusing a
+    cached rendering of the same field if possible.
+
+    Parameters
+    ----------
+    formatter : callable
+        The field's formatter, from `get_field_formatter`.
+    config_class_name : `str`
+        Importable name of the config class that the field belongs to.
+    field_name : `str`
+        Name of the configuration field (the attribute name of on the config
+        class).
+    field : ``lsst.pex.config.Field``
+        A configuration field.
+    field_id : `str`
+        Unique identifier for this field (see `get_field_formatter`).
+    state : ``docutils.statemachine.State``
+        Usually the directive's ``state`` attribute.
+    lineno (`int`)
+        Usually the directive's ``lineno`` attribute.
+
+    Returns
+    -------
+    ``docutils.nodes.section``
+        Section containing documentation nodes for the field.
+
+    Notes
+    -----
+    The same config class is often documented on many pages, either directly
+    or as a subtask. Formatting a field includes parsing its docstring as
+    reStructuredText, so the first rendering of each field is cached (by
+    config class, field name, formatter, and the current ``py:module`` and
+    ``py:class`` context) and later renderings are cloned from the cache with
+    `clone_field_section`. The number of cache hits and the time saved are
+    reported at the end of the build.
+
+    Sections containing nodes that are registered with their document, such
+    as footnotes and substitutions, are not cached. The cache is disabled if
+    the ``documenteer_lssttasks_render_cache`` configuration value is
+    `False`.
+    """
+    env = state.document.settings.env
+    if not env.config.documenteer_lssttasks_render_cache:
+        return formatter(field_name, field, field_id, state, lineno)
+
+    stats = _get_render_stats(env, env.docname)
+    key = (
+        config_class_name,
+        field_name,
+        formatter.__name__,
+        env.ref_context.get("py:module", ""),
+        env.ref_context.get("py:class", ""),
+    )
+    try:
+        cached_section, cached_field_id, render_seconds = _RENDER_CACHE[key]
+    except KeyError:
+        stats["misses"] += 1
+        start = time.perf_counter()
+        section = formatter(field_name, field, field_id, state, lineno)
+        render_seconds = time.perf_counter() - start
+        if not section.traverse(
+            lambda node: isinstance(node, _UNCACHEABLE_NODES)
+        ):
+            _RENDER_CACHE[key] = (section.deepcopy(), field_id, render_seconds)
+        return section
+
+    stats["hits"] += 1
+    start = time.perf_counter()
+    section = clone_field_section(
+        cached_section, cached_field_id, field_id, state.document, env.docname
+    )
+    clone_seconds = time.perf_counter() - start
+    stats["seconds_saved"] += max(render_seconds - clone_seconds, 0.0)
+    return section
+
+
+def clone_field_section(
+    section, old_field_id, new_field_id, document, docname
+):
+    """Clone a rendered configuration field section for use in a document.
+
+    Parameters
+    ----------
+    section : ``docutils.nodes.section``
+        The rendered section. It is not modified.
+    old_field_id : `str`
+        The field ID that ``section`` was rendered with.
+    new_field_id : `str`
+        The field ID for the clone.
+    document : ``docutils.nodes.document``
+        The document that the clone is added to.
+    docname : `str`
+        Name of the document that the clone is added to.
+
+    Returns
+    -------
+    ``docutils.nodes.section``
+        The cloned section. Field IDs (and the section's ID and name) are
+        rewritten to use ``new_field_id``. Any other IDs and names, from the
+        field's docstring, are assigned afresh by ``document`` and references
+        to them are updated. ``pending_xref`` nodes refer to ``docname``.
+    """
+    return clone_field_nodes(
+        section, {old_field_id: new_field_id}, document, docname
+    )
+
+
+def clone_field_nodes(element, field_ids, document, docname):
+    """Clone rendered nodes that contain one or more configuration field
+    sections for use in a document.
+
+    Parameters
+    ----------
+    element : ``docutils.nodes.Element``
+        The rendered nodes, such as a field section (see
+        `clone_field_section`) or a branch of a configuration tree. They are
+        not modified.
+    field_ids : `dict`
+        Mapping of the field IDs that ``node`` was rendered with to the field
+        IDs for the clone.
+    document : ``docutils.nodes.document``
+        The document that the clone is added to.
+    docname : `str`
+        Name of the document that the clone is added to.
+
+    Returns
+    -------
+    ``docutils.nodes.Element``
+        The clone. Field IDs (and the IDs and names of the field sections)
+        are rewritten with ``field_ids``. Any other IDs and names, from the
+        fields' docstrings, are assigned afresh by ``document`` and
+        references to them are updated. ``pending_xref`` nodes refer to
+        ``docname``.
+    """
+    clone = element.deepcopy()
+
+    section_ids = {}
+    field_names = {}
+    for old_field_id, new_field_id in field_ids.items():
+        section_ids[old_field_id] = new_field_id
+        section_ids[nodes.make_id(old_field_id + "-section")] = nodes.make_id(
+            new_field_id + "-section"
+        )
+        field_names[old_field_id + "-section"] = new_field_id + "-section"
+
+    new_ids = dict(section_ids)
+    for node in clone.traverse(nodes.Element):
+        if not node["ids"]:
+            continue
+        if all(node_id in section_ids for node_id in node["ids"]):
+            node["ids"] = [section_ids[node_id] for node_id in node["ids"]]
+            node["names"] = [
+                field_names.get(name, name) for name in node["names"]
+            ]
+            continue
+        old_ids = node["ids"]
+        node["ids"] = []
+        if node["names"]:
+            document.note_explicit_target(node)
+        else:
+            document.set_id(node)
+        for old_id in old_ids:
+            new_ids[old_id] = node["ids"][0]
+
+    for node in clone.traverse(nodes.Element):
+        if "refid" in node:
+            node["refid"] = new_ids.get(node["refid"], node["refid"])
+        if node["backrefs"]:
+            node["backrefs"] = [
+                new_ids.get(backref, backref) for backref in node["backrefs"]
+            ]
+        if isinstance(node, addnodes.pending_xref):
+            node["refdoc"] = docname
+
+    return clone
+
+
+def _get_render_stats(env, docname):
+    """Get the render cache statistics of a document.
+
+    The statistics are kept by document so that a parallel reader process
+    only sends back the statistics of the documents it read.
+    """
+    if not hasattr(env, "lsst_configfield_render_stats"):
+        env.lsst_configfield_render_stats = {}
+    return env.lsst_configfield_render_stats.setdefault(
+        docname, {"hits": 0, "misses": 0, "seconds_saved": 0.0}
+    )
+
+
+def _clear_render_cache(app):
+    """Clear the render cache since config classes may have changed between
+    builds (``builder-inited`` event handler).
+    """
+    _RENDER_CACHE.clear()
+
+
+def _reset_render_stats(app, env, docnames):
+    """Reset the render cache statistics at the start of reading
+    (``env-before-read-docs`` event handler).
+    """
+    if hasattr(env, "lsst_configfield_render_stats"):
+        del env.lsst_configfield_render_stats
+
+
+def _merge_render_stats(app, env, docnames, other):
+    """Merge render cache statistics from a parallel reader process
+    (``env-merge-info`` event handler).
+    """
+    other_stats = getattr(other, "lsst_configfield_render_stats", {})
+    # Reader processes that are forked after earlier chunks were merged
+    # inherit those statistics, so only merge the statistics of this
+    # chunk's documents
+    for docname in docnames:
+        if docname in other_stats:
+            _get_render_stats(env, docname).update(other_stats[docname])
+
+
+def _report_render_stats(app, exception):
+    """Log the render cache statistics (``build-finished`` event handler)."""
+    if exception is not None:
+        return
+    stats = {"hits": 0, "misses": 0, "seconds_saved": 0.0}
+    for doc_stats in getattr(
+        app.env, "lsst_configfield_render_stats", {}
+    ).values():
+        for key, value in doc_stats.items():
+            stats[key] += value
+    total = stats["hits"] + stats["misses"]
+    if total == 0:
+        return
+    logger = getLogger(__name__)
+    logger.info(
+        "lssttasks config field render cache: %d hits, %d misses "
+        "(%.0f%% hit rate), %.3f s saved",
+        stats["hits"],
+        stats["misses"],
+        100.0 * stats["hits"] / total,
+        stats["seconds_saved"],
+    )
+
+
+def setup_render_cache(app):
+    """Add the config field render cache's configuration value and event
+    handlers to the Sphinx application.
+    """
+    app.add_config_value("documenteer_lssttasks_render_cache", True, "env")
+    app.connect("builder-inited", _clear_render_cache)
+    app.connect("env-before-read-docs", _reset_render_stats)
+    app.connect("env-merge-info", _merge_render_stats)
+    app.connect("build-finished", _report_render_stats)
+
+
 def get_field_formatter(field):
     """Get the config docutils node formatter function for document a config
     field.
@@ -440,7 +739,8 @@ def format_configurablefield_nodes(field_name, field, field_id, state, lineno):
     default_item_content = nodes.definition()
     para = nodes.paragraph()
     name = ".".join((field.target.__module__, field.target.__name__))
-    para += pending_task_xref(rawsource=name)
+    env = state.document.settings.env
+    para += make_pending_xref("task", name, env.docname)
     default_item_content += para
     default_item += default_item_content
 
@@ -533,8 +833,7 @@ def format_listfield_nodes(field_name, field, field_id, state, lineno):
     field_type_item += field_type_item_content
 
     # Reference target
-    env = state.document.settings.env
-    ref_target = create_configfield_ref_target_node(field_id, env, lineno)
+    ref_target = create_configfield_ref_target_node(field_id)
 
     # Title is the field's attribute name
     title = nodes.title(text=field_name)
@@ -776,7 +1075,8 @@ def format_configfield_nodes(field_name, field, field_id, state, lineno):
     dtype_def = nodes.definition()
     dtype_def_para = nodes.paragraph()
     name = ".".join((field.dtype.__module__, field.dtype.__name__))
-    dtype_def_para += pending_config_xref(rawsource=name)
+    env = state.document.settings.env
+    dtype_def_para += make_pending_xref("config", name, env.docname)
     dtype_def += dtype_def_para
     dtype_node += dtype_def
 
@@ -818,6 +1118,8 @@ def format_configchoicefield_nodes(field_name, field, field_id, state, lineno):
     ``docutils.nodes.section``
         Section containing documentation nodes for the ConfigChoiceField.
     """
+    env = state.document.settings.env
+
     # Create a definition list for the choices
     choice_dl = nodes.definition_list()
     for choice_value, choice_class in field.typemap.items():
@@ -828,7 +1130,7 @@ def format_configchoicefield_nodes(field_name, field, field_id, state, lineno):
         item_definition = nodes.definition()
         def_para = nodes.paragraph()
         name = ".".join((choice_class.__module__, choice_class.__name__))
-        def_para += pending_config_xref(rawsource=name)
+        def_para += make_pending_xref("config", name, env.docname)
         item_definition += def_para
         item += item_definition
         choice_dl.append(item)
@@ -901,7 +1203,8 @@ def format_configdictfield_nodes(field_name, field, field_id, state, lineno):
     value_item_def = nodes.definition()
     value_item_def_para = nodes.paragraph()
     name = ".".join((field.itemtype.__module__, field.itemtype.__name__))
-    value_item_def_para += pending_config_xref(rawsource=name)
+    env = state.document.settings.env
+    value_item_def_para += make_pending_xref("config", name, env.docname)
     value_item_def += value_item_def_para
     value_item += value_item_def
 
@@ -944,35 +1247,14 @@ def format_registryfield_nodes(field_name, field, field_id, state, lineno):
     ``docutils.nodes.section``
         Section containing documentation nodes for the RegistryField.
     """
-    from lsst.pex.config.registry import ConfigurableWrapper
+    env = state.document.settings.env
 
     # Create a definition list for the choices
     # This iteration is over field.registry.items(), not field.items(), so
     # that the directive shows the configurables, not their ConfigClasses.
     choice_dl = nodes.definition_list()
     for choice_value, choice_class in field.registry.items():
-        # Introspect the class name from item in the registry. This is harder
-        # than it should be. Most registry items seem to fall in the first
-        # category. Some are ConfigurableWrapper types that expose the
-        # underlying task class through the _target attribute.
-        if hasattr(choice_class, "__module__") and hasattr(
-            choice_class, "__name__"
-        ):
-            name = ".".join((choice_class.__module__, choice_class.__name__))
-        elif isinstance(choice_class, ConfigurableWrapper):
-            name = ".".join(
-                (
-                    choice_class._target.__class__.__module__,
-                    choice_class._target.__class__.__name__,
-                )
-            )
-        else:
-            name = ".".join(
-                (
-                    choice_class.__class__.__module__,
-                    choice_class.__class__.__name__,
-                )
-            )
+        name = get_registry_target_name(choice_class)
 
         item = nodes.definition_list_item()
         item_term = nodes.term()
@@ -980,7 +1262,7 @@ def format_registryfield_nodes(field_name, field, field_id, state, lineno):
         item += item_term
         item_definition = nodes.definition()
         def_para = nodes.paragraph()
-        def_para += pending_task_xref(rawsource=name)
+        def_para += make_pending_xref("task", name, env.docname)
         item_definition += def_para
         item += item_definition
         choice_dl.append(item)
@@ -1143,8 +1425,7 @@ def create_title_node(field_name, field, field_id, state, lineno):
         target.
     """
     # Reference target
-    env = state.document.settings.env
-    ref_target = create_configfield_ref_target_node(field_id, env, lineno)
+    ref_target = create_configfield_ref_target_node(field_id)
 
     # Title is the field's attribute name
     title = nodes.title(text=field_name)
@@ -1153,27 +1434,11 @@ def create_title_node(field_name, field, field_id, state, lineno):
     return title
 
 
-def create_configfield_ref_target_node(target_id, env, lineno):
+def create_configfield_ref_target_node(target_id):
     """Create a ``target`` node that marks a configuration field.
 
-    Internally, this also adds to the ``lsst_configfields`` attribute of the
-    environment that is consumed by `documenteer.sphinxext.lssttasks.
-    crossrefs.process_pending_configfield_xref_nodes`.
-
-    See also
-    --------
-    `documenteer.sphinxext.lssttasks.crossrefs.process_pending_configfield_xref_nodes`
+    The directives that document configuration fields add the field to the
+    ``lsst`` domain (see `documenteer.sphinxext.lssttasks.domain.LsstDomain.
+    note_configfield`) so that it can be cross-referenced.
     """
-    target_node = nodes.target("", "", ids=[target_id])
-
-    # Store these task/configurable topic nodes in the environment for later
-    # cross referencing.
-    if not hasattr(env, "lsst_configfields"):
-        env.lsst_configfields = {}
-    env.lsst_configfields[target_id] = {
-        "docname": env.docname,
-        "lineno": lineno,
-        "target": target_node,
-    }
-
-    return target_node
+    return nodes.target("", "", ids=[target_id])
@@ -0,0 +1,488 @@
+"""The ``lsst-task-config-tree`` directive that renders a task's complete
+configuration hierarchy as a collapsible tree.
+"""
+
+__all__ = (
+    "ConfigTreeDirective",
+    "ConfigTreeField",
+    "ConfigTreeChild",
+    "get_config_tree_fields",
+    "config_tree_details",
+    "config_tree_summary",
+    "setup_config_tree",
+)
+
+import functools
+from typing import Any, Dict, NamedTuple, Tuple
+
+from docutils import nodes
+from docutils.parsers.rst import Directive, directives
+from sphinx.errors import SphinxError
+from sphinx.util.logging import getLogger
+
+from .configfieldlists import (
+    _UNCACHEABLE_NODES,
+    clone_field_nodes,
+    get_field_formatter,
+    render_field_section,
+)
+from .crossrefs import make_pending_xref
+from .taskutils import (
+    get_registry_target_name,
+    get_task_config_class,
+    get_task_config_fields,
+)
+
+
+class ConfigTreeChild(NamedTuple):
+    """A configuration class nested below a configuration field."""
+
+    label: str
+    """Label for the child, such as the registry choice name, or an empty
+    string if the field has a single target.
+    """
+
+    target_name: str
+    """Importable name of the child's configurable (task) or config class."""
+
+    reftype: str
+    """Role type for cross-referencing ``target_name`` (``'task'`` or
+    ``'config'``).
+    """
+
+    config_class: type
+    """The child's configuration class."""
+
+    key: str = ""
+    """The registry choice name, used in the IDs of the child's fields, or
+    an empty string if the field has a single target.
+    """
+
+
+class ConfigTreeField(NamedTuple):
+    """A configuration field in the configuration tree."""
+
+    name: str
+    """Name of the configuration field attribute."""
+
+    field: object
+    """The ``lsst.pex.config.Field`` instance."""
+
+    children: tuple
+    """The `ConfigTreeChild` items nested below the field (empty for fields
+    that are not ``ConfigurableField``, ``RegistryField``, or
+    ``ConfigField`` types).
+    """
+
+
+@functools.lru_cache(maxsize=None)
+def get_config_tree_fields(config_class):
+    """Introspect the fields of a configuration class, and the configuration
+    classes nested below them.
+
+    Parameters
+    ----------
+    config_class : ``lsst.pex.config.Config``-type
+        The configuration class (not an instance).
+
+    Returns
+    -------
+    fields : `tuple` of `ConfigTreeField`
+        The configuration fields, ordered alphabetically.
+
+    Notes
+    -----
+    Results are memoized by configuration class so that subtasks shared by
+    several tasks (and several pages) are only introspected once per build.
+    The cache is cleared when the builder is initialized.
+    """
+    from lsst.pex.config import ConfigField, ConfigurableField, RegistryField
+
+    tree_fields = []
+    for field_name, field in get_task_config_fields(config_class).items():
+        if isinstance(field, ConfigurableField):
+            children = (
+                ConfigTreeChild(
+                    label="",
+                    target_name=_get_full_name(field.target),
+                    reftype="task",
+                    config_class=field.ConfigClass,
+                ),
+            )
+        elif isinstance(field, RegistryField):
+            children = tuple(
+                ConfigTreeChild(
+                    label=repr(choice_value),
+                    target_name=get_registry_target_name(choice_class),
+                    reftype="task",
+                    config_class=choice_class.ConfigClass,
+                    key=str(choice_value),
+                )
+                for choice_value, choice_class in sorted(
+                    field.registry.items(), key=lambda item: item[0]
+                )
+            )
+        elif isinstance(field, ConfigField):
+            children = (
+                ConfigTreeChild(
+                    label="",
+                    target_name=_get_full_name(field.dtype),
+                    reftype="config",
+                    config_class=field.dtype,
+                ),
+            )
+        else:
+            children = ()
+        tree_fields.append(ConfigTreeField(field_name, field, children))
+    return tuple(tree_fields)
+
+
+def _get_full_name(obj):
+    return ".".join((obj.__module__, obj.__name__))
+
+
+class _CachedBranch(NamedTuple):
+    """A rendered configuration tree branch in `_BRANCH_CACHE`."""
+
+    tree_nodes: Tuple[Any, ...]
+    """Pristine copies of the branch's nodes."""
+
+    path: Tuple[str, ...]
+    """Path of the branch in the tree it was rendered for."""
+
+    field_ids: Tuple[Tuple[Tuple[str, ...], str], ...]
+    """The ``(path, field ID)`` of each field in the branch."""
+
+    reached: frozenset
+    """Configuration classes of the fields nested in the branch, including
+    the ones that weren't expanded.
+    """
+
+    cut: frozenset
+    """The classes in ``reached`` that were ancestors of the branch, and so
+    weren't expanded.
+    """
+
+
+class _BranchRecord(NamedTuple):
+    """The fields and configuration classes of a branch that is being
+    rendered.
+    """
+
+    field_ids: list
+    """The ``(path, field ID)`` of each field rendered so far."""
+
+    reached: set
+    """Configuration classes of the fields nested in the branch so far."""
+
+
+_BRANCH_CACHE: Dict[Tuple[Any, ...], _CachedBranch] = {}
+"""Internal cache of rendered configuration tree branches.
+
+Keys are ``(config class, remaining depth, py:module, py:class)`` tuples.
+Access this through `ConfigTreeDirective`.
+"""
+
+
+class config_tree_details(nodes.General, nodes.Element):
+    """A collapsible branch of a configuration tree.
+
+    HTML builders render this node as a ``<details>`` element. Other builders
+    render its contents directly.
+    """
+
+
+class config_tree_summary(nodes.General, nodes.TextElement):
+    """The always-visible summary of a `config_tree_details` branch.
+
+    HTML builders render this node as a ``<summary>`` element.
+    """
+
+
+class ConfigTreeDirective(Directive):
+    """``lsst-task-config-tree`` directive that renders documentation for
+    the complete configuration hierarchy of an ``lsst.pipe.base.Task``.
+
+    ``ConfigurableField``, ``RegistryField``, and ``ConfigField`` fields are
+    expanded into collapsible branches that contain the fields of their
+    target configuration classes, recursively.
+
+    Examples
+    --------
+    Use the directive like this:
+
+    .. code-block:: rst
+
+       .. lsst-task-config-tree:: lsst.pipe.tasks.processCcd.ProcessCcdTask
+          :maxdepth: 2
+
+    The ``maxdepth`` option limits the number of configuration levels that
+    are shown (the task's own configuration is the first level).
+    """
+
+    directive_name = "lsst-task-config-tree"
+    """Default name of this directive.
+    """
+
+    has_content = False
+
+    required_arguments = 1
+
+    option_spec = {"maxdepth": directives.positive_int}
+
+    def run(self):
+        """Main entrypoint method.
+
+        Returns
+        -------
+        new_nodes : `list`
+            Nodes to add to the doctree.
+        """
+        logger = getLogger(__name__)
+
+        try:
+            task_class_name = self.arguments[0]
+        except IndexError:
+            raise SphinxError(
+                "{} directive requires a Task class name as an "
+                "argument".format(self.directive_name)
+            )
+        logger.debug(
+            "%s using Task class %s", self.directive_name, task_class_name
+        )
+
+        self.maxdepth = self.options.get("maxdepth")
+        self.id_prefix = "lsst-config-tree-" + task_class_name
+        self._records = []
+
+        task_config_class = get_task_config_class(task_class_name)
+        tree_nodes = self._make_config_nodes(
+            task_config_class, path=(), ancestors=(task_config_class,)
+        )
+
+        # Fallback if no configuration items are present
+        if len(tree_nodes) == 0:
+            message = "No configuration fields."
+            return [nodes.paragraph(text=message)]
+
+        container = nodes.container(classes=["lsst-config-tree"])
+        container.extend(tree_nodes)
+        return [container]
+
+    def _make_config_nodes(self, config_class, path, ancestors):
+        """Make the nodes for the fields of a configuration class and,
+        recursively, the configuration classes nested below them.
+        """
+        logger = getLogger(__name__)
+        env = self.state.document.settings.env
+
+        tree_nodes = []
+        for tree_field in get_config_tree_fields(config_class):
+            field_path = path + (tree_field.name,)
+            try:
+                format_field_nodes = get_field_formatter(tree_field.field)
+            except ValueError:
+                logger.debug(
+                    "Skipping unknown config field type, "
+                    "{0!r}".format(tree_field.field)
+                )
+                continue
+
+            # Field IDs are based on the path through the tree since the
+            # same config class can appear in several branches. These fields
+            # are not added to the lsst domain; references to fields go to
+            # the lsst-task-config-fields listings.
+            field_id = self._make_id(field_path)
+            self._note_field(field_path, field_id)
+            section = render_field_section(
+                format_field_nodes,
+                _get_full_name(config_class),
+                tree_field.name,
+                tree_field.field,
+                field_id,
+                self.state,
+                self.lineno,
+            )
+            if not tree_field.children:
+                tree_nodes.append(section)
+                continue
+
+            details = config_tree_details()
+            summary = config_tree_summary()
+            summary += nodes.literal(text=tree_field.name)
+            details += summary
+            details += section
+            if len(tree_field.children) == 1 and not (
+                tree_field.children[0].label
+            ):
+                child = tree_field.children[0]
+                summary += nodes.Text(" ")
+                summary += make_pending_xref(
+                    child.reftype, child.target_name, env.docname
+                )
+                details.extend(
+                    self._make_child_nodes(child, field_path, ancestors)
+                )
+            else:
+                for child in tree_field.children:
+                    child_details = config_tree_details()
+                    child_summary = config_tree_summary()
+                    child_summary += nodes.literal(text=child.label)
+                    child_summary += nodes.Text(" ")
+                    child_summary += make_pending_xref(
+                        child.reftype, child.target_name, env.docname
+                    )
+                    child_details += child_summary
+                    child_details.extend(
+                        self._make_child_nodes(
+                            child, field_path + (child.key,), ancestors
+                        )
+                    )
+                    details += child_details
+            tree_nodes.append(details)
+
+        return tree_nodes
+
+    def _make_child_nodes(self, child, path, ancestors):
+        """Make the nodes for a configuration class nested below a field.
+
+        Subtasks such as source detection appear below many tasks, and
+        several times in the same tree, so the rendered branch of each
+        configuration class is cached and cloned (with its field IDs
+        rewritten for its new path) wherever the class appears again.
+        """
+        for record in self._records:
+            record.reached.add(child.config_class)
+        if child.config_class in ancestors:
+            message = "Recursive configuration; see above."
+            return [nodes.paragraph(text=message)]
+        if self.maxdepth is not None and len(ancestors) >= self.maxdepth:
+            return []
+        ancestors = ancestors + (child.config_class,)
+
+        env = self.state.document.settings.env
+        if not env.config.documenteer_lssttasks_render_cache:
+            return self._make_config_nodes(
+                child.config_class, path=path, ancestors=ancestors
+            )
+
+        key = (
+            child.config_class,
+            None if self.maxdepth is None else self.maxdepth - len(ancestors),
+            env.ref_context.get("py:module", ""),
+            env.ref_context.get("py:class", ""),
+        )
+        # A branch only depends on its ancestors through the classes that
+        # aren't expanded because they're ancestors
+        ancestor_classes = frozenset(ancestors)
+        cached = _BRANCH_CACHE.get(key)
+        if cached is not None and (
+            ancestor_classes & cached.reached == cached.cut
+        ):
+            return self._clone_branch(cached, path)
+
+        record = _BranchRecord(field_ids=[], reached=set())
+        self._records.append(record)
+        try:
+            tree_nodes = self._make_config_nodes(
+                child.config_class, path=path, ancestors=ancestors
+            )
+        finally:
+            self._records.pop()
+        if not any(
+            node.traverse(lambda n: isinstance(n, _UNCACHEABLE_NODES))
+            for node in tree_nodes
+        ):
+            reached = frozenset(record.reached)
+            _BRANCH_CACHE[key] = _CachedBranch(
+                tree_nodes=tuple(node.deepcopy() for node in tree_nodes),
+                path=path,
+                field_ids=tuple(record.field_ids),
+                reached=reached,
+                cut=ancestor_classes & reached,
+            )
+        return tree_nodes
+
+    def _clone_branch(self, cached, path):
+        """Clone a cached branch for a new path in the tree."""
+        env = self.state.document.settings.env
+        field_ids = {}
+        for cached_field_path, cached_field_id in cached.field_ids:
+            field_path = path + cached_field_path[len(cached.path) :]
+            field_ids[cached_field_id] = self._make_id(field_path)
+            self._note_field(field_path, field_ids[cached_field_id])
+        for record in self._records:
+            record.reached.update(cached.reached)
+        return [
+            clone_field_nodes(
+                node, field_ids, self.state.document, env.docname
+            )
+            for node in cached.tree_nodes
+        ]
+
+    def _note_field(self, field_path, field_id):
+        """Record a field in the branches that are being rendered."""
+        for record in self._records:
+            record.field_ids.append((field_path, field_id))
+
+    def _make_id(self, path):
+        return nodes.make_id("-".join((self.id_prefix,) + path))
+
+
+def visit_config_tree_details_html(self, node):
+    self.body.append(self.starttag(node, "details", CLASS="lsst-config-tree"))
+
+
+def depart_config_tree_details_html(self, node):
+    self.body.append("</details>\n")
+
+
+def visit_config_tree_summary_html(self, node):
+    self.body.append(self.starttag(node, "summary", ""))
+
+
+def depart_config_tree_summary_html(self, node):
+    self.body.append("</summary>\n")
+
+
+def visit_config_tree_node(self, node):
+    pass
+
+
+def depart_config_tree_node(self, node):
+    pass
+
+
+def clear_config_tree_cache(app):
+    """Clear the memoized configuration class introspection and the cache
+    of rendered branches (``builder-inited`` event handler).
+    """
+    get_config_tree_fields.cache_clear()
+    _BRANCH_CACHE.clear()
+
+
+def setup_config_tree(app):
+    """Add the ``lsst-task-config-tree`` directive, its nodes, and event
+    handlers to the Sphinx application.
+    """
+    app.add_directive(ConfigTreeDirective.directive_name, ConfigTreeDirective)
+    passthrough = (visit_config_tree_node, depart_config_tree_node)
+    for node_class, html_visitors in (
+        (
+            config_tree_details,
+            (visit_config_tree_details_html, depart_config_tree_details_html),
+        ),
+        (
+            config_tree_summary,
+            (visit_config_tree_summary_html, depart_config_tree_summary_html),
+        ),
+    ):
+        app.add_node(
+            node_class,
+            html=html_visitors,
+            latex=passthrough,
+            text=passthrough,
+            man=passthrough,
+            texinfo=passthrough,
+        )
+    app.connect("builder-inited", clear_config_tree_cache)
@@ -0,0 +1,250 @@
+"""The ``lsst`` Sphinx domain that stores task, config, and config field
+topics and resolves cross-references to them.
+"""
+
+__all__ = ("LsstDomain", "TaskTopic", "ConfigFieldTarget")
+
+from typing import NamedTuple
+
+from sphinx.domains import Domain, ObjType
+from sphinx.util.logging import getLogger
+from sphinx.util.nodes import make_refnode
+
+from .crossrefs import (
+    config_ref_role,
+    configfield_ref_role,
+    format_config_id,
+    format_configfield_id,
+    format_task_id,
+    task_ref_role,
+)
+
+
+class TaskTopic(NamedTuple):
+    """Record of a task, configurable, or config topic, stored in the
+    ``lsst`` domain's ``topics`` data.
+
+    Only plain data is stored (rather than docutils nodes) so that the record
+    is cheap to pickle with the build environment.
+    """
+
+    docname: str
+    """Name of the document containing the topic directive."""
+
+    lineno: int
+    """Line number of the topic directive."""
+
+    target_id: str
+    """ID of the topic's target node (the anchor for references)."""
+
+    summary: str
+    """Plain-text summary of the topic, used by topic listings."""
+
+    fully_qualified_name: str
+    """Importable name of the topic's class."""
+
+    type: str
+    """Topic type, such as ``'Task'``, ``'PipelineTask'``, or ``'Config'``.
+    """
+
+
+class ConfigFieldTarget(NamedTuple):
+    """Record of a documented configuration field, stored in the ``lsst``
+    domain's ``configfields`` data.
+    """
+
+    docname: str
+    """Name of the document containing the configuration field."""
+
+    lineno: int
+    """Line number of the directive that documented the field."""
+
+    target_id: str
+    """ID of the field's target node (the anchor for references)."""
+
+    fully_qualified_name: str
+    """Importable name of the config class, followed by the field name."""
+
+
+class LsstDomain(Domain):
+    """Sphinx domain for LSST Science Pipelines task framework topics.
+
+    The domain's data has two mappings, both keyed by target ID:
+
+    ``topics``
+        `TaskTopic` records created by the ``lsst-task-topic``,
+        ``lsst-configurable-topic``, and ``lsst-config-topic`` directives.
+    ``configfields``
+        `ConfigFieldTarget` records created by the configuration field
+        listing directives.
+
+    References made with the ``lsst-task``, ``lsst-config``, and
+    ``lsst-config-field`` roles (or their ``lsst:task``, ``lsst:config``, and
+    ``lsst:config-field`` domain equivalents) are resolved by
+    `resolve_xref` during Sphinx's standard reference resolution pass. Since
+    the domain implements `clear_doc` and `merge_domaindata`, this works with
+    parallel reads, and the objects are included in ``objects.inv`` for
+    intersphinx.
+    """
+
+    name = "lsst"
+    label = "LSST Science Pipelines"
+
+    object_types = {
+        "task": ObjType("task", "task"),
+        "config": ObjType("config", "config"),
+        "configfield": ObjType("config field", "config-field"),
+    }
+
+    roles = {
+        "task": task_ref_role,
+        "config": config_ref_role,
+        "config-field": configfield_ref_role,
+    }
+
+    initial_data = {"topics": {}, "configfields": {}}
+
+    dangling_warnings = {
+        "task": "lsst-task could not find a reference to %(target)s",
+        "config": "lsst-config could not find a reference to %(target)s",
+        "config-field": (
+            "lsst-config-field could not find a reference to %(target)s"
+        ),
+    }
+
+    @property
+    def topics(self):
+        """Mapping of target IDs to `TaskTopic` records."""
+        return self.data.setdefault("topics", {})
+
+    @property
+    def configfields(self):
+        """Mapping of target IDs to `ConfigFieldTarget` records."""
+        return self.data.setdefault("configfields", {})
+
+    def note_topic(self, topic):
+        """Add a topic to the domain.
+
+        Parameters
+        ----------
+        topic : `TaskTopic`
+            The topic record.
+        """
+        if topic.target_id in self.topics:
+            other = self.topics[topic.target_id]
+            if other.docname != topic.docname:
+                logger = getLogger(__name__)
+                logger.warning(
+                    "Duplicate topic for %s, other instance in %s",
+                    topic.fully_qualified_name,
+                    other.docname,
+                    location=(topic.docname, topic.lineno),
+                )
+        self.topics[topic.target_id] = topic
+
+    def note_configfield(self, config_class_name, field_name, lineno):
+        """Add a configuration field, documented in the current document, to
+        the domain.
+
+        Parameters
+        ----------
+        config_class_name : `str`
+            Importable name of the config class.
+        field_name : `str`
+            Name of the configuration field attribute.
+        lineno : `int`
+            Line number of the directive that documents the field.
+
+        Returns
+        -------
+        target_id : `str`
+            ID of the field's target node.
+        """
+        target_id = format_configfield_id(config_class_name, field_name)
+        self.configfields[target_id] = ConfigFieldTarget(
+            docname=self.env.docname,
+            lineno=lineno,
+            target_id=target_id,
+            fully_qualified_name=".".join((config_class_name, field_name)),
+        )
+        return target_id
+
+    def clear_doc(self, docname):
+        for key, topic in list(self.topics.items()):
+            if topic.docname == docname:
+                del self.topics[key]
+        for key, configfield in list(self.configfields.items()):
+            if configfield.docname == docname:
+                del self.configfields[key]
+
+    def merge_domaindata(self, docnames, otherdata):
+        for key, topic in otherdata["topics"].items():
+            if topic.docname in docnames:
+                self.topics[key] = topic
+        for key, configfield in otherdata["configfields"].items():
+            if configfield.docname in docnames:
+                self.configfields[key] = configfield
+
+    def resolve_xref(
+        self, env, fromdocname, builder, typ, target, node, contnode
+    ):
+        record = self._find_record(typ, target)
+        if record is None:
+            return None
+        return make_refnode(
+            builder,
+            fromdocname,
+            record.docname,
+            record.target_id,
+            contnode,
+            record.fully_qualified_name,
+        )
+
+    def resolve_any_xref(
+        self, env, fromdocname, builder, target, node, contnode
+    ):
+        results = []
+        for typ in self.roles:
+            refnode = self.resolve_xref(
+                env, fromdocname, builder, typ, target, node, contnode
+            )
+            if refnode is not None:
+                results.append(("lsst:" + typ, refnode))
+        return results
+
+    def get_objects(self):
+        for topic in self.topics.values():
+            if topic.type == "Config":
+                objtype = "config"
+            else:
+                objtype = "task"
+            yield (
+                topic.fully_qualified_name,
+                topic.fully_qualified_name,
+                objtype,
+                topic.docname,
+                topic.target_id,
+                1,
+            )
+        for configfield in self.configfields.values():
+            yield (
+                configfield.fully_qualified_name,
+                configfield.fully_qualified_name,
+                "configfield",
+                configfield.docname,
+                configfield.target_id,
+                1,
+            )
+
+    def _find_record(self, typ, target):
+        """Find the topic or config field record for a reference target."""
+        if typ == "task":
+            return self.topics.get(format_task_id(target))
+        elif typ == "config":
+            return self.topics.get(format_config_id(target))
+        elif typ == "config-field":
+            config_class_name, _, field_name = target.rpartition(".")
+            return self.configfields.get(
+                format_configfield_id(config_class_name, field_name)
+            )
+        return None
@@ -0,0 +1,243 @@
+"""Opt-in profiling of the Python module imports triggered by the lssttasks
+directives.
+
+Enable profiling by setting ``documenteer_lssttasks_import_profile = True``
+in :file:`conf.py`. A ranked report of the modules imported through
+`~documenteer.sphinxext.lssttasks.taskutils.get_type` (and therefore
+`~documenteer.sphinxext.lssttasks.taskutils.get_task_config_class`) is
+logged when the build finishes. Set
+``documenteer_lssttasks_import_profile_json`` to a path (relative to the
+configuration directory) to also write the full report as JSON.
+"""
+
+__all__ = (
+    "ImportProfiler",
+    "aggregate_import_profile",
+    "format_import_profile",
+    "setup_import_profile",
+)
+
+import json
+import os
+import sys
+import time
+from importlib import import_module
+
+from sphinx.util.logging import getLogger
+
+from . import taskutils
+
+REPORT_LENGTH = 20
+"""Number of modules included in the logged import profile report."""
+
+
+class ImportProfiler:
+    """Import hook for `~documenteer.sphinxext.lssttasks.taskutils.get_type`
+    that records the time spent importing each module, and the document that
+    triggered the import.
+
+    Parameters
+    ----------
+    env : ``sphinx.environment.BuildEnvironment``
+        The build environment. Records are stored in the environment's
+        ``lsst_import_profile`` attribute, by document, so that they can be
+        merged from parallel reader processes.
+    """
+
+    def __init__(self, env):
+        self.env = env
+
+    @property
+    def records(self):
+        """Mapping of document names to the import records of each document
+        (`dict`).
+
+        The import records of a document are a `dict`, keyed by module name,
+        of `dict` records with keys:
+
+        ``seconds``
+            Cumulative time, in seconds, spent in the import of the module.
+        ``calls``
+            Number of times the module was requested.
+        ``new_modules``
+            Number of modules that were newly loaded by the import (including
+            the module itself and its dependencies).
+
+        Use `aggregate_import_profile` to combine the records of all
+        documents.
+        """
+        if not hasattr(self.env, "lsst_import_profile"):
+            self.env.lsst_import_profile = {}
+        return self.env.lsst_import_profile
+
+    def import_module(self, module_name):
+        """Import a module, recording the time spent.
+
+        Parameters
+        ----------
+        module_name : `str`
+            Importable name of the module.
+
+        Returns
+        -------
+        module : `types.ModuleType`
+            The imported module.
+        """
+        modules_before = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            return import_module(module_name)
+        finally:
+            elapsed = time.perf_counter() - start
+            docname = self.env.temp_data.get("docname", "")
+            record = self.records.setdefault(docname, {}).setdefault(
+                module_name, {"seconds": 0.0, "calls": 0, "new_modules": 0}
+            )
+            record["seconds"] += elapsed
+            record["calls"] += 1
+            record["new_modules"] += max(len(sys.modules) - modules_before, 0)
+
+
+def aggregate_import_profile(records):
+    """Combine the import records of each document into a record for each
+    module.
+
+    Parameters
+    ----------
+    records : `dict`
+        Import records, keyed by document name and then by module name (see
+        `ImportProfiler.records`).
+
+    Returns
+    -------
+    module_records : `dict`
+        Import records, keyed by module name. Each record has the summed
+        ``seconds``, ``calls``, and ``new_modules`` of the module, and the
+        ``docname`` of the alphabetically first document that imported it.
+        Unlike the order that Sphinx reads documents in, this doesn't depend
+        on how a parallel build divides the documents between processes.
+    """
+    module_records = {}
+    for docname in sorted(records):
+        for module_name, record in records[docname].items():
+            if module_name not in module_records:
+                module_records[module_name] = dict(record, docname=docname)
+                continue
+            module_record = module_records[module_name]
+            module_record["seconds"] += record["seconds"]
+            module_record["calls"] += record["calls"]
+            module_record["new_modules"] += record["new_modules"]
+    return module_records
+
+
+def format_import_profile(records, limit=REPORT_LENGTH):
+    """Format import profile records as a ranked, plain-text report.
+
+    Parameters
+    ----------
+    records : `dict`
+        Import records, keyed by module name (see
+        `aggregate_import_profile`).
+    limit : `int`, optional
+        Maximum number of modules to include in the report.
+
+    Returns
+    -------
+    report : `str`
+        The report, with modules ranked by their cumulative import time.
+    """
+    ranked = sorted(
+        records.items(), key=lambda item: item[1]["seconds"], reverse=True
+    )
+    total = sum(record["seconds"] for record in records.values())
+    lines = [
+        "lssttasks import profile: {0} modules, {1:.3f} s total".format(
+            len(records), total
+        )
+    ]
+    for module_name, record in ranked[:limit]:
+        lines.append(
+            "  {0:8.3f} s  {1} ({2} new modules, first used in {3})".format(
+                record["seconds"],
+                module_name,
+                record["new_modules"],
+                record["docname"],
+            )
+        )
+    return "\n".join(lines)
+
+
+def _install_profiler(app):
+    """Install the import profiler as the ``taskutils`` import hook, if
+    enabled (``builder-inited`` event handler).
+    """
+    if app.config.documenteer_lssttasks_import_profile:
+        taskutils.set_import_hook(ImportProfiler(app.env).import_module)
+
+
+def _reset_profile(app, env, docnames):
+    """Reset the import records at the start of reading
+    (``env-before-read-docs`` event handler).
+    """
+    if app.config.documenteer_lssttasks_import_profile:
+        env.lsst_import_profile = {}
+
+
+def _merge_profile(app, env, docnames, other):
+    """Merge import records from a parallel reader process
+    (``env-merge-info`` event handler).
+    """
+    if not app.config.documenteer_lssttasks_import_profile:
+        return
+    records = getattr(env, "lsst_import_profile", {})
+    other_records = getattr(other, "lsst_import_profile", {})
+    # Reader processes that are forked after earlier chunks were merged
+    # inherit those records, so only merge the records of this chunk's
+    # documents
+    for docname in docnames:
+        if docname in other_records:
+            records[docname] = other_records[docname]
+    env.lsst_import_profile = records
+
+
+def _report_profile(app, exception):
+    """Log the import profile, and write it as JSON if configured
+    (``build-finished`` event handler).
+    """
+    if not app.config.documenteer_lssttasks_import_profile:
+        return
+    taskutils.set_import_hook(None)
+    if exception is not None:
+        return
+
+    logger = getLogger(__name__)
+    records = aggregate_import_profile(
+        getattr(app.env, "lsst_import_profile", {})
+    )
+    logger.info(format_import_profile(records))
+
+    json_path = app.config.documenteer_lssttasks_import_profile_json
+    if json_path:
+        json_path = os.path.join(app.confdir, json_path)
+        ranked = sorted(
+            records.items(), key=lambda item: item[1]["seconds"], reverse=True
+        )
+        data = [
+            dict(module=module_name, **record)
+            for module_name, record in ranked
+        ]
+        with open(json_path, "w") as f:
+            json.dump(data, f, indent=2)
+        logger.info("Wrote lssttasks import profile to %s", json_path)
+
+
+def setup_import_profile(app):
+    """Add the import profiler's configuration values and event handlers to
+    the Sphinx application.
+    """
+    app.add_config_value("documenteer_lssttasks_import_profile", False, "")
+    app.add_config_value("documenteer_lssttasks_import_profile_json", None, "")
+    app.connect("builder-inited", _install_profiler)
+    app.connect("env-before-read-docs", _reset_profile)
+    app.connect("env-merge-info", _merge_profile)
+    app.connect("build-finished", _report_profile)
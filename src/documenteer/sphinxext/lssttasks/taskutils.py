@@ -5,10 +5,12 @@ __all__ = (
     "get_task_config_class",
     "get_task_config_fields",
     "get_subtask_fields",
+    "get_registry_target_name",
     "typestring",
     "get_type",
     "get_docstring",
     "extract_docstring_summary",
+    "set_import_hook",
 )
 
 import inspect
@@ -19,6 +21,12 @@ from sphinx.util.docstrings import prepare_docstring
 from sphinx.util.inspect import getdoc
 from sphinx.util.logging import getLogger
 
+_import_hook = None
+"""Callable used by `get_type` in place of `importlib.import_module`, if set.
+
+Use `set_import_hook` to set this hook.
+"""
+
 
 def get_task_config_class(task_name):
     """Get the Config class for a task given its fully-qualified name.
@@ -59,7 +67,26 @@ def get_type(type_name):
         )
     module_name = ".".join(parts[0:-1])
     name = parts[-1]
-    return getattr(import_module(module_name), name)
+    if _import_hook is not None:
+        module = _import_hook(module_name)
+    else:
+        module = import_module(module_name)
+    return getattr(module, name)
+
+
+def set_import_hook(hook):
+    """Set the function that `get_type` (and therefore
+    `get_task_config_class`) uses to import modules.
+
+    Parameters
+    ----------
+    hook : callable or `None`
+        A callable with the same signature as `importlib.import_module`, such
+        as `documenteer.sphinxext.lssttasks.importprofile.ImportProfiler.
+        import_module`. Set to `None` to use `importlib.import_module`.
+    """
+    global _import_hook
+    _import_hook = hook
 
 
 def get_task_config_fields(config_class):
@@ -109,6 +136,47 @@ def get_subtask_fields(config_class):
     return _get_alphabetical_members(config_class, is_subtask_field)
 
 
+def get_registry_target_name(registry_item):
+    """Get the importable name of the configurable (usually a task) in an
+    ``lsst.pex.config.Registry``.
+
+    Parameters
+    ----------
+    registry_item
+        A value of a registry's items, such as from
+        ``RegistryField.registry.items()``.
+
+    Returns
+    -------
+    name : `str`
+        Importable name of the configurable.
+    """
+    from lsst.pex.config.registry import ConfigurableWrapper
+
+    # Introspect the class name from item in the registry. This is harder
+    # than it should be. Most registry items seem to fall in the first
+    # category. Some are ConfigurableWrapper types that expose the
+    # underlying task class through the _target attribute.
+    if hasattr(registry_item, "__module__") and hasattr(
+        registry_item, "__name__"
+    ):
+        return ".".join((registry_item.__module__, registry_item.__name__))
+    elif isinstance(registry_item, ConfigurableWrapper):
+        return ".".join(
+            (
+                registry_item._target.__class__.__module__,
+                registry_item._target.__class__.__name__,
+            )
+        )
+    else:
+        return ".".join(
+            (
+                registry_item.__class__.__module__,
+                registry_item.__class__.__name__,
+            )
+        )
+
+
 def _get_alphabetical_members(obj, predicate):
     """Get members of an object, sorted alphabetically.
 
@@ -18,6 +18,8 @@ from docutils import nodes
 from docutils.parsers.rst import Directive, directives
 from sphinx.util.logging import getLogger
 
+from ..docnameindex import get_docname_index
+
 
 class BaseTopicListDirective(Directive):
     """Base class for directives that lists task topics."""
@@ -44,8 +46,9 @@ class BaseTopicListDirective(Directive):
         - ``'Configurable'``
         - ``'Config'``
 
-        These names correspond to the ``'types'`` key of the
-        ``lsst_task_topics`` environment attribute set by the
+        These names correspond to the ``type`` attribute of the
+        `~documenteer.sphinxext.lssttasks.domain.TaskTopic` records in the
+        ``lsst`` domain, which are set by the
         topic marker directives (such as
         `documenteer.sphinxext.lssttasks.topics.TaskTopicDirective`).
         """
@@ -84,27 +87,23 @@ class BaseTopicListDirective(Directive):
         dirname = posixpath.dirname(self._env.docname)
         tree_prefix = self.options["toctree"].strip()
         root = posixpath.normpath(posixpath.join(dirname, tree_prefix))
-        docnames = [
-            docname
-            for docname in self._env.found_docs
-            if docname.startswith(root)
-        ]
+        docnames = get_docname_index(self._env).prefixed(root)
 
-        # Sort docnames alphabetically based on **class** name.
+        # Sort docnames alphabetically based on **class** name, and then by
+        # docname so that the order doesn't depend on the order that the
+        # documents were found or read in.
         # The standard we assume is that task doc pages are named after
         # their Python namespace.
         # NOTE: this ordering only applies to the toctree; the visual ordering
         # is set by `process_task_topic_list`.
         # NOTE: docnames are **always** POSIX-like paths
-        class_names = [
-            docname.split("/")[-1].split(".")[-1] for docname in docnames
-        ]
-        docnames = [
-            docname
-            for docname, _ in sorted(
-                zip(docnames, class_names), key=lambda pair: pair[1]
-            )
-        ]
+        docnames = sorted(
+            docnames,
+            key=lambda docname: (
+                docname.split("/")[-1].split(".")[-1],
+                docname,
+            ),
+        )
 
         tocnode = sphinx.addnodes.toctree()
         tocnode["includefiles"] = docnames
@@ -190,48 +189,35 @@ def process_task_topic_list(app, doctree, fromdocname):
     Task, Configurable, or Config topics (as determined by the types
     key of the ``task_topic_list`` node).
 
-    This is called during the "doctree-resolved" phase so that the
-    ``lsst_task_topcs`` environment attribute is fully set.
+    This is called during the "doctree-resolved" phase so that the topics
+    in the ``lsst`` domain are fully set.
     """
     logger = getLogger(__name__)
     logger.debug("Started process_task_list")
 
-    env = app.builder.env
+    topics = app.builder.env.get_domain("lsst").topics
 
     for node in doctree.traverse(task_topic_list):
-        try:
-            topics = env.lsst_task_topics
-        except AttributeError:
-            message = (
-                "Environment does not have 'lsst_task_topics', "
-                "can't process the listing."
-            )
-            logger.warning(message)
-            node.replace_self(nodes.paragraph(text=message))
-            continue
-
         root = node["root_namespace"]
 
-        # Sort tasks by the topic's class name.
+        # Sort tasks by the topic's class name, and then by the fully
+        # qualified name so that the order doesn't depend on the order that
+        # parallel reader processes merged their topics into the domain.
         # NOTE: if the presentation of the link is changed to the fully
-        # qualified name, with full Python namespace, then the topic_names
+        # qualified name, with full Python namespace, then the sort key
         # should be changed to match that.
-        topic_keys = [
-            k
-            for k, topic in topics.items()
-            if topic["type"] in node["types"]
-            if topic["fully_qualified_name"].startswith(root)
-        ]
-        topic_names = [
-            topics[k]["fully_qualified_name"].split(".")[-1]
-            for k in topic_keys
-        ]
-        topic_keys = [
-            k
-            for k, _ in sorted(
-                zip(topic_keys, topic_names), key=lambda pair: pair[1]
-            )
-        ]
+        topic_keys = sorted(
+            (
+                k
+                for k, topic in topics.items()
+                if topic.type in node["types"]
+                if topic.fully_qualified_name.startswith(root)
+            ),
+            key=lambda k: (
+                topics[k].fully_qualified_name.split(".")[-1],
+                topics[k].fully_qualified_name,
+            ),
+        )
 
         if len(topic_keys) == 0:
             # Fallback if no topics are found
@@ -242,8 +228,8 @@ def process_task_topic_list(app, doctree, fromdocname):
         dl = nodes.definition_list()
         for key in topic_keys:
             topic = topics[key]
-            class_name = topic["fully_qualified_name"].split(".")[-1]
-            summary_text = topic["summary_node"][0].astext()
+            class_name = topic.fully_qualified_name.split(".")[-1]
+            summary_text = topic.summary
 
             # Each topic in the listing is a definition list item. The term is
             # the linked class name and the description is the summary
@@ -253,9 +239,9 @@ def process_task_topic_list(app, doctree, fromdocname):
 
             # Can insert an actual reference since the doctree is resolved.
             ref_node = nodes.reference("", "")
-            ref_node["refdocname"] = topic["docname"]
+            ref_node["refdocname"] = topic.docname
             ref_node["refuri"] = app.builder.get_relative_uri(
-                fromdocname, topic["docname"]
+                fromdocname, topic.docname
             )
             # NOTE: Not appending an anchor to the URI because task topics
             # are designed to occupy an entire page.
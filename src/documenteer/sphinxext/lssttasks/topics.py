@@ -16,6 +16,7 @@ from sphinx.util.logging import getLogger
 
 from ..utils import parse_rst_content
 from .crossrefs import format_config_id, format_task_id
+from .domain import TaskTopic
 from .taskutils import extract_docstring_summary, get_docstring, get_type
 
 
@@ -61,23 +62,24 @@ class BaseTopicDirective(Directive):
         )
 
         summary_node = self._create_summary_node(class_name)
+        # Topic listings only show the plain text of the first summary node
+        summary_text = summary_node[0].astext() if len(summary_node) else ""
 
-        # target_id = format_task_id(class_name)
         target_id = self.get_target_id(class_name)
         target_node = nodes.target("", "", ids=[target_id])
 
-        # Store these task/configurable topic nodes in the environment for
-        # later cross referencing.
-        if not hasattr(env, "lsst_task_topics"):
-            env.lsst_task_topics = {}
-        env.lsst_task_topics[target_id] = {
-            "docname": env.docname,
-            "lineno": self.lineno,
-            "target": target_node,
-            "summary_node": summary_node,
-            "fully_qualified_name": class_name,
-            "type": self.get_type(class_name),
-        }
+        # Store these task/configurable topics in the lsst domain for
+        # cross referencing and topic listings.
+        env.get_domain("lsst").note_topic(
+            TaskTopic(
+                docname=env.docname,
+                lineno=self.lineno,
+                target_id=target_id,
+                summary=summary_text,
+                fully_qualified_name=class_name,
+                type=self.get_type(class_name),
+            )
+        )
 
         return [target_node]
 
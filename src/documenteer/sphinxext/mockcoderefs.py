@@ -8,6 +8,8 @@ import logging
 
 from docutils import nodes
 
+from ..version import __version__
+
 log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
@@ -39,3 +41,9 @@ def setup(app):
     for rolename in original_roles:
         mock_name = "l" + rolename
         app.add_role(mock_name, mock_code_ref_role)
+
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -11,6 +11,7 @@ from sphinx.util.logging import getLogger
 from sphinx.util.nodes import set_source_info
 
 from ..version import __version__
+from .docnameindex import DocnameIndex, get_docname_index
 
 
 class ModuleTocTree(Directive):
@@ -56,7 +57,7 @@ class ModuleTocTree(Directive):
         module_index_files = []
 
         # Collect paths with the form `modules/<module-name>/index`
-        for docname in _filter_index_pages(env.found_docs, "modules"):
+        for docname in get_docname_index(env).index_pages("modules"):
             logger.debug("module-toctree found %s", docname)
             if self._parse_module_name(docname) in skipped_modules:
                 logger.debug("module-toctree skipped %s", docname)
@@ -146,7 +147,7 @@ class PackageTocTree(Directive):
         package_index_files = []
 
         # Collect paths with the form `modules/<module-name>/index`
-        for docname in _filter_index_pages(env.found_docs, "packages"):
+        for docname in get_docname_index(env).index_pages("packages"):
             logger.debug("package-toctree found %s", docname)
             if self._parse_package_name(docname) in skipped_packages:
                 logger.debug("package-toctree skipped %s", docname)
@@ -210,10 +211,7 @@ def _filter_index_pages(docnames, base_dir):
     docname : `str`
         Document name that meets the pattern.
     """
-    for docname in docnames:
-        parts = docname.split("/")
-        if len(parts) == 3 and parts[0] == base_dir and parts[2] == "index":
-            yield docname
+    yield from DocnameIndex(docnames).index_pages(base_dir)
 
 
 def _build_toctree_node(
@@ -239,7 +237,12 @@ def _build_toctree_node(
 
 
 def setup(app):
+    app.setup_extension("documenteer.sphinxext.docnameindex")
     app.add_directive("module-toctree", ModuleTocTree)
     app.add_directive("package-toctree", PackageTocTree)
 
-    return {"version": __version__}
+    return {
+        "version": __version__,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -4,17 +4,51 @@ supports getting content over https.
 
 __all__ = ["setup"]
 
+import os
+import re
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
 from docutils import nodes
 from docutils.parsers.rst import Directive, directives
 from sphinx.directives.code import LiteralIncludeReader, container_wrapper
 from sphinx.util import logging, parselinenos
 from sphinx.util.nodes import set_source_info
 
-from ..requestsutils import requests_retry_session
+from ..httpcache import HttpCache
+from ..remotesnapshot import RemoteSnapshot
+from ..requestsutils import (
+    configure_pooled_session,
+    get_pooled_session,
+    get_pooled_session_stats,
+)
 from ..version import __version__
 
 logger = logging.getLogger(__name__)
 
+_CACHES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+"""Response caches, keyed by Sphinx application (see `setup_cache`)."""
+
+_SNAPSHOTS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+"""Frozen remote content snapshots, keyed by Sphinx application (see
+`load_snapshot`).
+"""
+
+_PREFETCHED: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+"""Prefetched content, keyed by Sphinx application and then by URL (see
+`prefetch_urls`).
+"""
+
+REMOTE_CODE_BLOCK_PATTERN = re.compile(
+    r"^[ \t]*(?:\.\.[ \t]+|[`:]{3,}\{)remote-code-block(?:::|\})"
+    r"[ \t]*(?P<url>\S+)[ \t]*$",
+    re.MULTILINE,
+)
+"""Pattern that matches ``remote-code-block`` directives in reStructuredText
+(``.. remote-code-block:: url``) and MyST Markdown
+(```` ```{remote-code-block} url ````) sources.
+"""
+
 
 class RemoteCodeBlock(Directive):
     """Directive that works like ``literalinclude`` to show a code block, but
@@ -84,7 +118,14 @@ class RemoteCodeBlock(Directive):
 
             # Customized for RemoteCodeBlock
             url = self.arguments[0]
-            reader = RemoteCodeBlockReader(url, self.options, self.config)
+            reader = RemoteCodeBlockReader(
+                url,
+                self.options,
+                self.config,
+                cache=_CACHES.get(self.env.app),
+                prefetched=_PREFETCHED.get(self.env.app),
+                snapshot=_SNAPSHOTS.get(self.env.app),
+            )
             text, lines = reader.read(location=location)
 
             retnode = nodes.literal_block(text, text)
@@ -122,28 +163,299 @@ class RemoteCodeBlock(Directive):
 
             return [retnode]
 
+        except KeyError as exc:
+            # Raised for URLs that aren't in the snapshot. str() of a
+            # KeyError is the repr of its message, in quotes.
+            message = str(exc.args[0]) if exc.args else repr(exc)
+            return [document.reporter.warning(message, line=self.lineno)]
         except Exception as exc:
             return [document.reporter.warning(str(exc), line=self.lineno)]
 
 
 class RemoteCodeBlockReader(LiteralIncludeReader):
-    """Reader for content used by `RemoteCodeBlock`."""
+    """Reader for content used by `RemoteCodeBlock`.
+
+    Parameters
+    ----------
+    filename : `str`
+        URL of the content.
+    options : `dict`
+        Directive options.
+    config : ``sphinx.config.Config``
+        Sphinx configuration.
+    cache : `documenteer.httpcache.HttpCache`, optional
+        Persistent response cache. If `None`, content is always downloaded.
+    prefetched : `dict`, optional
+        Content that was already downloaded by `prefetch_urls`, keyed by URL.
+    snapshot : `documenteer.remotesnapshot.RemoteSnapshot`, optional
+        Frozen snapshot of remote content. If set, content is only read from
+        the snapshot, and never downloaded.
+    """
+
+    def __init__(
+        self,
+        filename,
+        options,
+        config,
+        cache=None,
+        prefetched=None,
+        snapshot=None,
+    ):
+        super().__init__(filename, options, config)
+        self.cache = cache
+        self.prefetched = prefetched
+        self.snapshot = snapshot
 
     def read_file(self, url, location=None):
         """Read content from the web by overriding
         `LiteralIncludeReader.read_file`.
         """
-        response = requests_retry_session().get(url, timeout=10.0)
-        response.raise_for_status()
-        text = response.text
+        if self.snapshot is not None:
+            text = self.snapshot.get_text(url)
+        elif self.prefetched is not None and url in self.prefetched:
+            text = self.prefetched[url]
+        else:
+            text = fetch_text(url, cache=self.cache)
         if "tab-width" in self.options:
             text = text.expandtabs(self.options["tab-width"])
 
         return text.splitlines(True)
 
 
+def fetch_text(url, cache=None):
+    """Download the text content of a URL.
+
+    Parameters
+    ----------
+    url : `str`
+        The URL.
+    cache : `documenteer.httpcache.HttpCache`, optional
+        Persistent response cache. If `None`, the content is always
+        downloaded.
+
+    Returns
+    -------
+    text : `str`
+        The content.
+
+    Raises
+    ------
+    requests.HTTPError
+        Raised if the server responds with an error status.
+    """
+    session = get_pooled_session()
+    if cache is not None:
+        return cache.get_text(url, session, timeout=10.0)
+    response = session.get(url, timeout=10.0)
+    response.raise_for_status()
+    return response.text
+
+
+def find_remote_urls(env, docnames):
+    """Find the URLs of the ``remote-code-block`` directives in documents.
+
+    Parameters
+    ----------
+    env : ``sphinx.environment.BuildEnvironment``
+        The build environment.
+    docnames : iterable of `str`
+        Names of the documents to scan.
+
+    Returns
+    -------
+    urls : `list` of `str`
+        The unique URLs, in the order they were found.
+    """
+    paths = [env.doc2path(docname) for docname in sorted(docnames)]
+    return find_remote_urls_in_files(paths, env.config.source_encoding)
+
+
+def find_remote_urls_in_files(paths, encoding="utf-8-sig"):
+    """Find the URLs of the ``remote-code-block`` directives in source
+    files.
+
+    Parameters
+    ----------
+    paths : iterable of `str`
+        Paths of the source files.
+    encoding : `str`, optional
+        Encoding of the source files.
+
+    Returns
+    -------
+    urls : `list` of `str`
+        The unique URLs, in the order they were found.
+    """
+    urls = {}
+    for path in paths:
+        try:
+            with open(path, encoding=encoding, errors="replace") as f:
+                source = f.read()
+        except OSError:
+            continue
+        if "remote-code-block" not in source:
+            continue
+        for match in REMOTE_CODE_BLOCK_PATTERN.finditer(source):
+            urls.setdefault(match.group("url"), None)
+    return list(urls)
+
+
+def find_remote_urls_in_dir(root_dir, suffixes=(".rst", ".md", ".txt")):
+    """Find the URLs of the ``remote-code-block`` directives in a Sphinx
+    project's source files, without running Sphinx.
+
+    Parameters
+    ----------
+    root_dir : `str`
+        Root directory of the Sphinx project.
+    suffixes : sequence of `str`, optional
+        Suffixes of the source files to scan.
+
+    Returns
+    -------
+    urls : `list` of `str`
+        The unique URLs, in the order they were found.
+
+    Notes
+    -----
+    Build directories (``_build``) and hidden directories are not scanned.
+    """
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames[:] = sorted(
+            d for d in dirnames if d != "_build" and not d.startswith(".")
+        )
+        paths.extend(
+            os.path.join(dirpath, filename)
+            for filename in sorted(filenames)
+            if filename.endswith(tuple(suffixes))
+        )
+    return find_remote_urls_in_files(paths)
+
+
+def prefetch_urls(app, env, docnames):
+    """Download the content of every ``remote-code-block`` directive in the
+    documents that are about to be read, concurrently
+    (``env-before-read-docs`` event handler).
+
+    The content is kept in memory so that the directives don't have to wait
+    on a request each. URLs that can't be downloaded are left for the
+    directive to retry and report.
+    """
+    _PREFETCHED.pop(app, None)
+    concurrency = app.config.remote_code_block_prefetch_concurrency
+    if not concurrency or app in _SNAPSHOTS:
+        return
+    urls = find_remote_urls(env, docnames)
+    if not urls:
+        return
+
+    cache = _CACHES.get(app)
+
+    def fetch(url):
+        try:
+            return url, fetch_text(url, cache=cache)
+        except Exception as exc:
+            logger.debug(
+                "remote-code-block prefetch failed for %s: %s", url, exc
+            )
+            return url, None
+
+    prefetched = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for url, text in executor.map(fetch, urls):
+            if text is not None:
+                prefetched[url] = text
+    logger.info(
+        "remote-code-block prefetched %d of %d URLs",
+        len(prefetched),
+        len(urls),
+    )
+    _PREFETCHED[app] = prefetched
+
+
+def clear_prefetched(app, env):
+    """Release the prefetched content once reading is done (``env-updated``
+    event handler).
+    """
+    _PREFETCHED.pop(app, None)
+
+
+def setup_cache(app):
+    """Create the persistent response cache, in the ``remote-code-block``
+    directory of the doctree directory, if it is enabled, and size the
+    pooled HTTP session's connection pools for the prefetch concurrency
+    (``builder-inited`` event handler).
+    """
+    configure_pooled_session(
+        pool_maxsize=max(app.config.remote_code_block_prefetch_concurrency, 10)
+    )
+    if not app.config.remote_code_block_cache:
+        _CACHES.pop(app, None)
+        return
+    _CACHES[app] = HttpCache(
+        os.path.join(app.doctreedir, "remote-code-block"),
+        max_age=app.config.remote_code_block_cache_max_age,
+        max_size=app.config.remote_code_block_cache_max_size,
+    )
+
+
+def load_snapshot(app):
+    """Load the frozen snapshot of remote content, if the
+    ``remote_code_block_snapshot`` directory is set and contains one
+    (``builder-inited`` event handler).
+    """
+    _SNAPSHOTS.pop(app, None)
+    if not app.config.remote_code_block_snapshot:
+        return
+    snapshot = RemoteSnapshot(
+        os.path.join(app.confdir, app.config.remote_code_block_snapshot)
+    )
+    if snapshot.exists():
+        _SNAPSHOTS[app] = snapshot.load()
+        logger.info(
+            "remote-code-block using the frozen snapshot in %s",
+            snapshot.directory,
+        )
+
+
+def report_cache(app, exception):
+    """Log the response cache's and pooled HTTP session's statistics
+    (``build-finished`` event handler).
+    """
+    if exception is not None:
+        return
+    session_stats = get_pooled_session_stats()
+    if session_stats["requests"]:
+        logger.info(
+            "remote-code-block HTTP session: %d requests over %d connections",
+            session_stats["requests"],
+            session_stats["connections"],
+        )
+    cache = _CACHES.get(app)
+    if cache is not None and any(cache.stats.values()):
+        logger.info(
+            "remote-code-block cache: %d hits, %d revalidated, %d downloaded",
+            cache.stats["hits"],
+            cache.stats["revalidated"],
+            cache.stats["misses"],
+        )
+
+
 def setup(app):
     app.add_directive("remote-code-block", RemoteCodeBlock)
+    app.add_config_value("remote_code_block_cache", True, "")
+    app.add_config_value("remote_code_block_cache_max_age", 86400.0, "")
+    app.add_config_value(
+        "remote_code_block_cache_max_size", 50 * 1024 * 1024, ""
+    )
+    app.add_config_value("remote_code_block_prefetch_concurrency", 8, "")
+    app.add_config_value("remote_code_block_snapshot", None, "")
+    app.connect("builder-inited", setup_cache)
+    app.connect("builder-inited", load_snapshot)
+    app.connect("env-before-read-docs", prefetch_urls)
+    app.connect("env-updated", clear_prefetched)
+    app.connect("build-finished", report_cache)
 
     return {
         "version": __version__,
@@ -2,19 +2,35 @@
 
 from __future__ import annotations
 
+import argparse
+import logging
 import os
+import sys
 from pathlib import Path
-from typing import Union
+from typing import List, Optional, Union
 
-from sphinx.cmd.build import build_main
+import sphinx.locale
+from sphinx import package_dir
+from sphinx.application import ENV_PICKLE_FILENAME, Sphinx
+from sphinx.builders.html import BuildInfo
+from sphinx.cmd.build import handle_exception
+from sphinx.environment import (
+    CONFIG_CHANGED,
+    CONFIG_EXTENSIONS_CHANGED,
+    CONFIG_NEW,
+)
+from sphinx.util.console import color_terminal, nocolor
+from sphinx.util.docutils import docutils_namespace, patch_docutils
 
-__all__ = ["run_sphinx"]
+__all__ = ["run_sphinx", "find_full_rebuild_reasons"]
 
 
 def run_sphinx(
     root_dir: Union[str, Path],
     job_count: int = 1,
     warnings_as_errors: bool = False,
+    doctree_dir: Optional[Union[str, Path]] = None,
+    fresh_env: bool = False,
 ) -> int:
     """Run the Sphinx build process.
 
@@ -26,6 +42,21 @@ def run_sphinx(
         configuration file.
     job_count
         Number of cores to run the Sphinx build with (``-j`` flag)
+    warnings_as_errors
+        Turn warnings into errors (``-W`` flag).
+    doctree_dir
+        Directory for the doctrees and the pickled build environment (``-d``
+        flag). Extensions like ``remote-code-block`` also keep their caches
+        here. Defaults to ``_build/.doctrees`` in ``root_dir``. Set this to
+        a directory outside the project to reuse the environment across
+        checkouts, such as in CI jobs. Sphinx finds changed documents by
+        their modification times, so a new checkout also needs the source
+        files' modification times restored (for example, from their Git
+        commit dates) for the build to be incremental.
+    fresh_env
+        Don't use the saved build environment, and read all documents again
+        (``-E`` flag). By default, the build is incremental: only documents
+        that changed since the previous build are read.
 
     Returns
     -------
@@ -39,24 +70,132 @@ def run_sphinx(
     command. Most configurations are hard-coded to defaults appropriate for
     building stack documentation, but flexibility can be added later as
     needs are identified.
+
+    When Sphinx can't do an incremental build, the reasons (see
+    `find_full_rebuild_reasons`) are logged.
     """
-    src_dir = str(os.path.abspath(root_dir))
-
-    argv = [
-        f"-j {job_count}",
-        "-b",
-        "html",
-        "-d",
-        os.path.join("_build", ".doctrees"),
-    ]
-    if warnings_as_errors:
-        argv.append("-W")
-    argv.extend([src_dir, os.path.join("_build", "html")])
+    logger = logging.getLogger(__name__)
+
+    src_dir = os.path.abspath(root_dir)
+    out_dir = os.path.join(src_dir, "_build", "html")
+    if doctree_dir is None:
+        doctree_dir = os.path.join(src_dir, "_build", ".doctrees")
+    else:
+        doctree_dir = os.path.abspath(doctree_dir)
+    env_path = os.path.join(doctree_dir, ENV_PICKLE_FILENAME)
+    env_existed = os.path.isfile(env_path)
+    build_info = _read_build_info(out_dir)
+
+    # Like sphinx-build, only color the output in a terminal, and translate
+    # Sphinx's console messages
+    if not color_terminal():
+        nocolor()
+    sphinx.locale.init_console(os.path.join(package_dir, "locale"), "sphinx")
 
     start_dir = os.path.abspath(".")
+    app = None
     try:
         os.chdir(src_dir)
-        status = build_main(argv=argv)
+        with patch_docutils(src_dir), docutils_namespace():
+            app = Sphinx(
+                src_dir,
+                src_dir,
+                out_dir,
+                doctree_dir,
+                "html",
+                freshenv=fresh_env,
+                warningiserror=warnings_as_errors,
+                parallel=job_count,
+            )
+            reasons = find_full_rebuild_reasons(
+                app,
+                env_existed=env_existed,
+                fresh_env=fresh_env,
+                previous_build_info=build_info,
+            )
+            for reason in reasons:
+                logger.info("Full rebuild: %s", reason)
+            if not reasons:
+                logger.debug("Incremental build with %s", env_path)
+            app.build()
+            return app.statuscode
+    except Exception as exc:
+        handle_exception(
+            app,
+            argparse.Namespace(pdb=False, verbosity=0, traceback=False),
+            exc,
+            sys.stderr,
+        )
+        return 2
     finally:
         os.chdir(start_dir)
-    return status
+
+
+def find_full_rebuild_reasons(
+    app: Sphinx,
+    env_existed: bool,
+    fresh_env: bool = False,
+    previous_build_info: Optional[BuildInfo] = None,
+) -> List[str]:
+    """Find why Sphinx will read or write every document, rather than only
+    the documents that changed.
+
+    Parameters
+    ----------
+    app
+        The Sphinx application, after it loaded or created its build
+        environment.
+    env_existed
+        Whether the pickled build environment existed before the application
+        was created.
+    fresh_env
+        Whether a fresh environment was requested.
+    previous_build_info
+        The build info (configuration hash) of the existing HTML output, if
+        any.
+
+    Returns
+    -------
+    reasons
+        Descriptions of the reasons. Empty for an incremental build.
+    """
+    reasons = []
+    env = app.env
+    if fresh_env:
+        reasons.append("a fresh environment was requested")
+    elif not env_existed:
+        reasons.append(f"there is no saved environment in {app.doctreedir}")
+    elif env.config_status == CONFIG_NEW:
+        reasons.append(
+            f"the saved environment in {app.doctreedir} could not be loaded "
+            "(for example, because the Sphinx version changed)"
+        )
+    elif env.config_status == CONFIG_EXTENSIONS_CHANGED:
+        reasons.append(f"extensions changed{env.config_status_extra}")
+    elif env.config_status == CONFIG_CHANGED:
+        reasons.append(
+            f"a configuration value changed{env.config_status_extra}"
+        )
+
+    build_info = getattr(app.builder, "build_info", None)
+    if (
+        isinstance(build_info, BuildInfo)
+        and previous_build_info is not None
+        and build_info != previous_build_info
+    ):
+        reasons.append(
+            "the HTML configuration or tags changed, so all pages are "
+            "written again"
+        )
+    return reasons
+
+
+def _read_build_info(out_dir: str) -> Optional[BuildInfo]:
+    """Read the build info (configuration hash) that the HTML builder saves
+    with its output.
+    """
+    try:
+        with open(os.path.join(out_dir, ".buildinfo"), encoding="utf-8") as f:
+            return BuildInfo.load(f)
+    except (OSError, ValueError):
+        return None
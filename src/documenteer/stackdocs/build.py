@@ -38,6 +38,8 @@ def build_stack_docs(
     enable_sphinx: bool = True,
     select_doxygen_packages: Optional[List[str]] = None,
     skip_doxygen_packages: Optional[List[str]] = None,
+    doctree_dir: Optional[Union[Path, str]] = None,
+    fresh_env: bool = False,
 ) -> int:
     """Build stack Sphinx documentation (main entrypoint).
 
@@ -77,6 +79,12 @@ def build_stack_docs(
     skip_doxygen_packages
         If set, EUPS packages named in this sequence will be removed from the
         set of packages processed by Doxygen.
+    doctree_dir
+        Directory for Sphinx's doctrees and pickled build environment. See
+        `documenteer.sphinxrunner.run_sphinx`.
+    fresh_env
+        Don't use Sphinx's saved build environment, and read all documents
+        again.
 
     Returns
     -------
@@ -236,7 +244,9 @@ def build_stack_docs(
 
     # Trigger the Sphinx build
     if enable_sphinx:
-        return run_sphinx(root_project_dir)
+        return run_sphinx(
+            root_project_dir, doctree_dir=doctree_dir, fresh_env=fresh_env
+        )
     else:
         return 0
 
@@ -7,14 +7,6 @@ import xml.etree.ElementTree as ET
 from pathlib import Path
 from typing import List, Optional, Sequence, Union
 
-try:
-    from sphinxcontrib.doxylink import doxylink
-except ImportError:
-    print(
-        "sphinxcontrib.doxylink is missing. Install documenteer with the "
-        "pipelines extra:\n\n  pip install documenteer[pipelines]"
-    )
-
 
 def get_tag_entity_names(
     tag_path: Union[str, Path], kinds: Optional[Sequence[str]] = None
@@ -45,6 +37,17 @@ def get_tag_entity_names(
     names : `list` of `str`
         List of API names.
     """
+    # doxylink (which imports requests) is imported on first use so that
+    # the stack-docs command line starts quickly
+    try:
+        from sphinxcontrib.doxylink import doxylink
+    except ImportError:
+        print(
+            "sphinxcontrib.doxylink is missing. Install documenteer with the "
+            "pipelines extra:\n\n  pip install documenteer[pipelines]"
+        )
+        raise
+
     doc = ET.parse(str(tag_path))
     symbol_map = doxylink.SymbolMap(doc)
     keys = []
@@ -4,6 +4,7 @@ in the LSST Stack.
 
 __all__ = ("main",)
 
+import functools
 import logging
 import os
 import shutil
@@ -11,9 +12,11 @@ import sys
 
 import click
 
-from ..sphinxrunner import run_sphinx
 from .rootdiscovery import discover_package_doc_dir
 
+# Commands import their implementations (and Sphinx and requests) when they
+# run, so that the command line starts quickly.
+
 # Add -h as a help shortcut option
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
@@ -60,8 +63,14 @@ def main(ctx, root_dir, verbose):
     The key commands provided by package-docs are:
 
     - ``package-docs build``: compile the package's documentation.
+    - ``package-docs serve-build``: keep a warm process that rebuilds the
+      documentation on request from ``package-docs build --server``.
     - ``package-docs clean``: removes documentation build products from a
       package.
+    - ``package-docs freeze-remote``: snapshot the content of remote code
+      blocks for offline builds.
+    - ``package-docs profile-startup``: time the configuration import and
+      extension setup that happen before Sphinx reads any documents.
     """
     root_dir = discover_package_doc_dir(root_dir)
 
@@ -94,18 +103,150 @@ def help(ctx, topic, **kw):
 
 
 @main.command()
+@click.option(
+    "--server",
+    "use_server",
+    is_flag=True,
+    help="Send the build request to the package's running build server "
+    "(see package-docs serve-build) instead of building in this process.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="After building, watch the documentation for changes, rebuild it "
+    "incrementally, and serve the HTML site with automatic browser reloads.",
+)
+@click.option(
+    "--port",
+    type=int,
+    default=8000,
+    show_default=True,
+    help="Port for the HTML site served in --watch mode.",
+)
+@click.option(
+    "--doctree-dir",
+    type=click.Path(file_okay=False, resolve_path=True),
+    default=None,
+    help="Directory for Sphinx's doctrees, build environment, and caches, "
+    "instead of doc/_build/.doctrees. Use a directory outside the package "
+    "to keep it across checkouts, such as in CI.",
+)
+@click.option(
+    "-E",
+    "--fresh-env",
+    is_flag=True,
+    help="Don't use the saved build environment, and read every document "
+    "again. By default, builds are incremental.",
+)
+@click.option(
+    "--precompress",
+    is_flag=True,
+    help="After the build, write .gz (and, if brotli is installed, .br) "
+    "copies of the site's HTML, JavaScript, CSS, and SVG files for static "
+    "file servers. Only files that changed are compressed again.",
+)
 @click.pass_context
-def build(ctx):
+def build(ctx, use_server, watch, port, doctree_dir, fresh_env, precompress):
     """Build documentation as HTML.
 
     The build HTML site is located in the ``doc/_build/html`` directory
     of the package.
+
+    Builds are incremental: Sphinx only reads the documents that changed
+    since the previous build. When it has to read every document (for
+    example, because a configuration value changed), the reason is logged.
+
+    With the ``--precompress`` option, the command writes ``.gz`` and ``.br``
+    copies of the site's text files after a successful build (see
+    `documenteer.precompress.precompress_site`), including the
+    rebuilds with the ``--watch`` option.
+
+    With the ``--watch`` option, the command keeps running after the build.
+    When files in the doc/ directory change, it runs an incremental build
+    and reloads the pages open in your browser. Install watchdog to detect
+    changes with file system events instead of polling. Press Control-C to
+    stop watching.
     """
-    return_code = run_sphinx(ctx.obj["root_dir"])
+    root_dir = ctx.obj["root_dir"]
+    if use_server:
+        if doctree_dir is not None or fresh_env:
+            raise click.UsageError(
+                "--doctree-dir and --fresh-env can't be used with --server."
+            )
+        from ..buildserver import request_project_build_status
+
+        rebuild = functools.partial(
+            request_project_build_status,
+            root_dir,
+            "package-docs serve-build",
+        )
+        return_code = rebuild()
+    else:
+        from ..sphinxrunner import run_sphinx
+
+        return_code = run_sphinx(
+            root_dir, doctree_dir=doctree_dir, fresh_env=fresh_env
+        )
+        rebuild = functools.partial(
+            run_sphinx, root_dir, doctree_dir=doctree_dir
+        )
+
+    if return_code == 0 and precompress:
+        from ..precompress import precompress_site
+
+        precompress_site(os.path.join(root_dir, "_build", "html"))
+    if watch:
+        from ..watch import find_watch_dirs, watch_and_rebuild
+
+        if precompress:
+            from ..precompress import precompress_after_build
+
+            rebuild = precompress_after_build(
+                rebuild, os.path.join(root_dir, "_build", "html")
+            )
+
+        try:
+            watch_and_rebuild(
+                rebuild,
+                find_watch_dirs(root_dir),
+                html_dir=os.path.join(root_dir, "_build", "html"),
+                port=port,
+            )
+        except KeyboardInterrupt:
+            return
     if return_code > 0:
         sys.exit(return_code)
 
 
+@main.command("serve-build")
+@click.option(
+    "--doctree-dir",
+    type=click.Path(file_okay=False, resolve_path=True),
+    default=None,
+    help="Directory for Sphinx's doctrees, build environment, and caches, "
+    "instead of doc/_build/.doctrees.",
+)
+@click.pass_context
+def serve_build(ctx, doctree_dir):
+    """Run a build server that rebuilds the documentation on request.
+
+    The server builds the documentation once, and then keeps running with
+    Sphinx, the extensions, and the modules that the documentation imports
+    already loaded. Run ``package-docs build --server`` (from another
+    terminal) to have the server rebuild the documentation, which is much
+    faster than starting a new build.
+
+    The server listens on a Unix socket in the ``doc/_build`` directory.
+    Press Control-C to stop it.
+    """
+    from ..buildserver import BuildServerError, serve_project
+
+    try:
+        serve_project(ctx.obj["root_dir"], doctree_dir=doctree_dir)
+    except BuildServerError as e:
+        raise click.ClickException(str(e))
+
+
 @main.command()
 @click.pass_context
 def clean(ctx):
@@ -132,3 +273,111 @@ def clean(ctx):
             logger.debug("Cleaned up %r", dirname)
         else:
             logger.debug("Did not clean up %r (missing)", dirname)
+
+
+@main.command("freeze-remote")
+@click.option(
+    "--snapshot-dir",
+    default="remote-snapshot",
+    show_default=True,
+    help="Snapshot directory, relative to the doc/ directory. Set the "
+    "remote_code_block_snapshot configuration value to this directory to "
+    "build from the snapshot.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "concurrency",
+    type=int,
+    default=8,
+    show_default=True,
+    help="Maximum number of concurrent downloads.",
+)
+@click.pass_context
+def freeze_remote(ctx, snapshot_dir, concurrency):
+    """Download the content of every remote-code-block directive into an
+    offline snapshot.
+
+    The snapshot directory contains a lockfile (``lock.json``) that maps each
+    URL to the SHA-256 hash of its content, and an ``objects`` directory with
+    the content files named by their hashes. To build from the snapshot,
+    set ``remote_code_block_snapshot`` in ``conf.py`` to the snapshot
+    directory; builds then read remote code blocks from it and don't use the
+    network. Run this command again to update the snapshot, or unset
+    ``remote_code_block_snapshot`` to go back to downloading content during
+    builds.
+    """
+    from ..remotesnapshot import freeze_urls
+    from ..sphinxext.remotecodeblock import find_remote_urls_in_dir
+
+    logger = logging.getLogger(__name__)
+
+    root_dir = ctx.obj["root_dir"]
+    urls = find_remote_urls_in_dir(root_dir)
+    logger.info("Found %d remote-code-block URLs", len(urls))
+
+    snapshot, errors = freeze_urls(
+        urls, os.path.join(root_dir, snapshot_dir), concurrency=concurrency
+    )
+    for url, exc in errors:
+        logger.error("Could not download %s: %s", url, exc)
+    logger.info(
+        "Wrote %d URLs to %s", len(snapshot.entries), snapshot.lockfile_path
+    )
+    logger.info(
+        "To build from the snapshot, set this in conf.py: "
+        "remote_code_block_snapshot = %r",
+        snapshot_dir,
+    )
+    if errors:
+        sys.exit(1)
+
+
+@main.command("profile-startup")
+@click.option(
+    "-n",
+    "--limit",
+    type=int,
+    default=25,
+    show_default=True,
+    help="Number of steps to show in the table.",
+)
+@click.option(
+    "--cprofile",
+    "cprofile_path",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Also profile the startup with cProfile and write the statistics "
+    "to this file.",
+)
+@click.option(
+    "--speedscope",
+    "speedscope_path",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Write the timed steps to this file as a speedscope profile "
+    "(https://www.speedscope.app).",
+)
+@click.pass_context
+def profile_startup(ctx, limit, cprofile_path, speedscope_path):
+    """Profile the startup of a documentation build.
+
+    This command starts Sphinx for the package's documentation, without
+    reading or writing any documents, and times each startup step:
+
+    - importing conf.py,
+    - importing and setting up each extension,
+    - running each config-inited and builder-inited event handler, and
+    - loading the build environment.
+
+    The steps are printed as a table, ranked by the time they took
+    (excluding the time of steps that ran within them, such as extensions
+    set up by another extension).
+    """
+    from ..startupprofile import StartupProfiler
+
+    profiler = StartupProfiler(ctx.obj["root_dir"])
+    profiler.run(cprofile_path=cprofile_path)
+    click.echo(profiler.format_table(limit=limit))
+    if speedscope_path:
+        profiler.write_speedscope(speedscope_path)
@@ -17,8 +17,6 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
-import yaml
-
 
 def discover_setup_packages(
     scope: Optional[List[str]] = None,
@@ -245,6 +243,8 @@ def find_package_docs(
     if not modules_yaml_path.is_file():
         raise NoPackageDocs(r"Manifest YAML not found: {modules_yaml_path}")
 
+    import yaml
+
     with open(modules_yaml_path) as f:
         manifest_data = yaml.safe_load(f)
 
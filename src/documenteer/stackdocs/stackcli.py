@@ -3,6 +3,7 @@
 
 __all__ = ("main",)
 
+import functools
 import logging
 import os
 import re
@@ -13,10 +14,11 @@ from typing import Any, Optional, Sequence
 
 import click
 
-from .build import build_stack_docs
-from .doxygentag import get_tag_entity_names
 from .rootdiscovery import discover_conf_py_directory
 
+# Commands import their implementations (and Sphinx, requests, and doxylink)
+# when they run, so that the command line starts quickly.
+
 # Add -h as a help shortcut option
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
@@ -62,6 +64,12 @@ def main(ctx, root_project_dir, verbose):
     - ``stack-docs clean``: removes build products. Use this command to
       clear the build cache.
 
+    - ``stack-docs serve-build``: keep a warm process that runs the Sphinx
+      build on request from ``stack-docs build --server``.
+
+    - ``stack-docs manifest``: hash the built site and list the files that
+      changed since a previous manifest.
+
     See also: package-docs, a tool for building previews of package
     documentation.
 
@@ -162,6 +170,60 @@ def help(ctx, topic, **kw):
     multiple=True,
     help=("Skip running Doxygen on these packages."),
 )
+@click.option(
+    "--server",
+    "use_server",
+    is_flag=True,
+    help=(
+        "Send the Sphinx build request to the project's running build server "
+        "(see stack-docs serve-build) instead of running Sphinx in this "
+        "process."
+    ),
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help=(
+        "After building, watch the project and the linked package doc/ "
+        "directories for changes, rebuild the Sphinx site incrementally, and "
+        "serve it with automatic browser reloads."
+    ),
+)
+@click.option(
+    "--port",
+    type=int,
+    default=8000,
+    show_default=True,
+    help="Port for the HTML site served in --watch mode.",
+)
+@click.option(
+    "--doctree-dir",
+    type=click.Path(file_okay=False, resolve_path=True),
+    default=None,
+    help=(
+        "Directory for Sphinx's doctrees, build environment, and caches, "
+        "instead of _build/.doctrees. Use a directory outside the project to "
+        "keep it across checkouts, such as in CI."
+    ),
+)
+@click.option(
+    "-E",
+    "--fresh-env",
+    is_flag=True,
+    help=(
+        "Don't use Sphinx's saved build environment, and read every "
+        "document again. By default, Sphinx builds are incremental."
+    ),
+)
+@click.option(
+    "--precompress",
+    is_flag=True,
+    help=(
+        "After the build, write .gz (and, if brotli is installed, .br) "
+        "copies of the site's HTML, JavaScript, CSS, and SVG files for "
+        "static file servers. Only files that changed are compressed again."
+    ),
+)
 @click.pass_context
 def build(
     ctx,
@@ -174,6 +236,12 @@ def build(
     doxygen_conf_defaults_path,
     dox,
     skip_dox,
+    use_server,
+    watch,
+    port,
+    doctree_dir,
+    fresh_env,
+    precompress,
 ):
     """Build documentation as HTML.
 
@@ -194,9 +262,33 @@ def build(
     By default, the build site is located in the ``_build/html`` directory
     of the ``pipelines_lsst_io`` repository.
 
+    The Sphinx build is incremental: Sphinx only reads the documents that
+    changed since the previous build. When it has to read every document
+    (for example, because a configuration value changed), the reason is
+    logged.
+
+    With the ``--precompress`` option, the command writes ``.gz`` and ``.br``
+    copies of the site's text files after a successful build (see
+    `documenteer.precompress.precompress_site`), including the
+    rebuilds with the ``--watch`` option.
+
+    With the ``--watch`` option, the command keeps running after the build.
+    When files in the project or the linked package doc/ directories change,
+    it runs an incremental Sphinx build (without relinking packages or
+    running Doxygen again) and reloads the pages open in your browser.
+    Install watchdog to detect changes with file system events instead of
+    polling. Press Control-C to stop watching.
+
     To peek inside the build process, see the ``documenteer.stackdocs.build``
     APIs.
     """
+    from .build import build_stack_docs
+
+    if use_server and (doctree_dir is not None or fresh_env):
+        raise click.UsageError(
+            "--doctree-dir and --fresh-env can't be used with --server."
+        )
+
     if doxygen_conf_defaults_path is not None:
         _doxygen_conf_defaults_path = Path(doxygen_conf_defaults_path)
     else:
@@ -210,14 +302,91 @@ def build(
         enable_doxygen_conf=enable_doxygen_conf,
         enable_doxygen=enable_doxygen,
         enable_package_links=enable_symlinks,
-        enable_sphinx=enable_sphinx,
+        enable_sphinx=enable_sphinx and not use_server,
         select_doxygen_packages=dox,
         skip_doxygen_packages=skip_dox,
+        doctree_dir=doctree_dir,
+        fresh_env=fresh_env,
     )
+    root_project_dir = ctx.obj["root_project_dir"]
+    if use_server:
+        from ..buildserver import request_project_build_status
+
+        build_sphinx = functools.partial(
+            request_project_build_status,
+            root_project_dir,
+            "stack-docs serve-build",
+        )
+    else:
+        from ..sphinxrunner import run_sphinx
+
+        build_sphinx = functools.partial(
+            run_sphinx, root_project_dir, doctree_dir=doctree_dir
+        )
+
+    if return_code == 0 and enable_sphinx and use_server:
+        return_code = build_sphinx()
+    if return_code == 0 and enable_sphinx and precompress:
+        from ..precompress import precompress_site
+
+        precompress_site(os.path.join(root_project_dir, "_build", "html"))
+    if watch:
+        from ..watch import find_watch_dirs, watch_and_rebuild
+
+        if precompress:
+            from ..precompress import precompress_after_build
+
+            build_sphinx = precompress_after_build(
+                build_sphinx, os.path.join(root_project_dir, "_build", "html")
+            )
+
+        # Rebuilds only run Sphinx; the package links and Doxygen output
+        # from the first build are reused
+        try:
+            watch_and_rebuild(
+                build_sphinx,
+                find_watch_dirs(root_project_dir),
+                html_dir=os.path.join(root_project_dir, "_build", "html"),
+                port=port,
+            )
+        except KeyboardInterrupt:
+            return
     if return_code > 0:
         sys.exit(return_code)
 
 
+@main.command("serve-build")
+@click.option(
+    "--doctree-dir",
+    type=click.Path(file_okay=False, resolve_path=True),
+    default=None,
+    help=(
+        "Directory for Sphinx's doctrees, build environment, and caches, "
+        "instead of _build/.doctrees."
+    ),
+)
+@click.pass_context
+def serve_build(ctx, doctree_dir):
+    """Run a build server that runs the Sphinx build on request.
+
+    The server runs the Sphinx build once, and then keeps running with
+    Sphinx, the extensions, and the modules that the documentation imports
+    already loaded. Run ``stack-docs build --server`` (from another terminal)
+    to link the packages and run Doxygen as usual, and then have the server
+    run the Sphinx build, which is much faster than starting a new build.
+
+    Run ``stack-docs build`` before starting the server so that the package
+    documentation is linked into the project. The server listens on a Unix
+    socket in the ``_build`` directory. Press Control-C to stop it.
+    """
+    from ..buildserver import BuildServerError, serve_project
+
+    try:
+        serve_project(ctx.obj["root_project_dir"], doctree_dir=doctree_dir)
+    except BuildServerError as e:
+        raise click.ClickException(str(e))
+
+
 @main.command()
 @click.pass_context
 def clean(ctx):
@@ -250,6 +419,87 @@ def clean(ctx):
             logger.debug("Did not clean up %r (missing)", dirname)
 
 
+@main.command()
+@click.option(
+    "-o",
+    "--output",
+    "output_path",
+    type=click.Path(dir_okay=False, resolve_path=True),
+    default=None,
+    help="Path of the manifest to write. Defaults to _build/manifest.json.",
+)
+@click.option(
+    "--previous",
+    "previous_path",
+    type=click.Path(exists=True, dir_okay=False, resolve_path=True),
+    default=None,
+    help=(
+        "Manifest to compare the site with, such as the manifest of the "
+        "published site. Defaults to the manifest from the previous run."
+    ),
+)
+@click.pass_context
+def manifest(ctx, output_path, previous_path):
+    """Write a content-hash manifest of the built site and list the files
+    that changed.
+
+    This command hashes every file in ``_build/html`` (in parallel) and
+    writes a JSON manifest with each file's size, modification time, and
+    SHA-256 hash. Files whose size and modification time are the same as in
+    the existing manifest aren't hashed again.
+
+    It then compares the manifest with a previous manifest and prints the
+    files that were added (``A``), modified (``M``), and removed (``D``), so
+    that an uploader can only transfer the changes. Upload the manifest with
+    the site, and pass it with ``--previous`` to the next run.
+    """
+    from ..sitemanifest import (
+        build_manifest,
+        diff_manifests,
+        read_manifest,
+        write_manifest,
+    )
+
+    logger = logging.getLogger(__name__)
+    root_project_dir = ctx.obj["root_project_dir"]
+    site_dir = os.path.join(root_project_dir, "_build", "html")
+    if not os.path.isdir(site_dir):
+        raise click.ClickException(
+            f"{site_dir} doesn't exist. Run stack-docs build first."
+        )
+    if output_path is None:
+        output_path = os.path.join(root_project_dir, "_build", "manifest.json")
+
+    # Only the manifest made on this machine has reliable modification times
+    cached = read_manifest(output_path)
+    if previous_path is not None:
+        previous = read_manifest(previous_path)
+        if previous is None:
+            raise click.ClickException(f"Can't read manifest {previous_path}")
+    else:
+        previous = cached or {}
+
+    current = build_manifest(site_dir, previous=cached)
+    write_manifest(output_path, current)
+
+    diff = diff_manifests(previous, current)
+    for status, paths in (
+        ("A", diff.added),
+        ("M", diff.modified),
+        ("D", diff.removed),
+    ):
+        for path in paths:
+            click.echo(f"{status}\t{path}")
+    logger.info(
+        "%d added, %d modified, %d removed, %d unchanged (manifest: %s)",
+        len(diff.added),
+        len(diff.modified),
+        len(diff.removed),
+        diff.unchanged,
+        output_path,
+    )
+
+
 @main.command()
 @click.option(
     "-t",
@@ -322,6 +572,8 @@ def listcc(
             "enumeration",
             "function",
         ]
+    from .doxygentag import get_tag_entity_names
+
     entities = get_tag_entity_names(tag_path=tag_path, kinds=api_types)
     for name in entities:
         if pattern:
@@ -0,0 +1,318 @@
+"""Profiling of the Sphinx startup phase: importing :file:`conf.py`, setting
+up extensions, and running the ``config-inited`` and ``builder-inited``
+event handlers, before any documents are read.
+
+This module powers the ``package-docs profile-startup`` command.
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "PROFILED_EVENTS",
+    "StartupProfiler",
+    "StartupTiming",
+)
+
+import cProfile
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+PROFILED_EVENTS = ("config-inited", "builder-inited")
+"""Sphinx events whose handlers are timed."""
+
+
+@dataclass
+class StartupTiming:
+    """Timing of a step of the Sphinx startup phase."""
+
+    kind: str
+    """Kind of step: ``"conf"`` (importing :file:`conf.py`),
+    ``"extension"`` (importing an extension and running its ``setup``
+    function), ``"env"`` (loading the build environment), or the name of an
+    event for event handlers.
+    """
+
+    name: str
+    """Name of the step, such as the extension or handler name."""
+
+    start: float
+    """Start time, in seconds, relative to the start of profiling."""
+
+    end: float = 0.0
+    """End time, in seconds, relative to the start of profiling."""
+
+    children: List[StartupTiming] = field(default_factory=list)
+    """Steps that ran during this step (such as extensions set up by this
+    extension).
+    """
+
+    @property
+    def seconds(self) -> float:
+        """Duration of the step, including its children (`float`)."""
+        return self.end - self.start
+
+    @property
+    def self_seconds(self) -> float:
+        """Duration of the step, excluding its children (`float`)."""
+        return self.seconds - sum(c.seconds for c in self.children)
+
+
+class StartupProfiler:
+    """Profiler for the startup phase of a Sphinx project.
+
+    Parameters
+    ----------
+    src_dir : `str`
+        Directory containing the project's :file:`conf.py` and root
+        document.
+    builder : `str`, optional
+        Name of the Sphinx builder.
+    build_dir : `str`, optional
+        Build directory, relative to ``src_dir``. The builder's output
+        directory and doctree directory are in this directory, as for
+        ``package-docs build``.
+    """
+
+    def __init__(
+        self, src_dir: str, builder: str = "html", build_dir: str = "_build"
+    ) -> None:
+        self.src_dir = os.path.abspath(src_dir)
+        self.builder = builder
+        self.build_dir = os.path.join(self.src_dir, build_dir)
+        self.timings: List[StartupTiming] = []
+        self.total_seconds = 0.0
+        self._stack: List[StartupTiming] = []
+        self._t0 = 0.0
+
+    def run(self, cprofile_path: Optional[str] = None) -> List[StartupTiming]:
+        """Start a Sphinx application for the project and time its startup
+        steps.
+
+        Parameters
+        ----------
+        cprofile_path : `str`, optional
+            If set, also profile the startup with `cProfile` and write the
+            statistics (readable with `pstats` or tools like snakeviz) to
+            this path.
+
+        Returns
+        -------
+        timings : `list` of `StartupTiming`
+            The top-level startup steps, in the order they ran.
+        """
+        from sphinx.application import Sphinx
+
+        profile = cProfile.Profile() if cprofile_path else None
+        self.timings = []
+        self._t0 = time.perf_counter()
+        with self._instrument():
+            if profile:
+                profile.enable()
+            try:
+                Sphinx(
+                    self.src_dir,
+                    self.src_dir,
+                    os.path.join(self.build_dir, self.builder),
+                    os.path.join(self.build_dir, ".doctrees"),
+                    self.builder,
+                    status=io.StringIO(),
+                    warning=io.StringIO(),
+                )
+            finally:
+                if profile:
+                    profile.disable()
+        self.total_seconds = time.perf_counter() - self._t0
+        if profile and cprofile_path:
+            profile.dump_stats(cprofile_path)
+        return self.timings
+
+    def ranked(self) -> List[StartupTiming]:
+        """Get all timed steps, ranked by their own duration (excluding
+        their children), longest first.
+        """
+        steps = []
+        pending = list(self.timings)
+        while pending:
+            timing = pending.pop()
+            steps.append(timing)
+            pending.extend(timing.children)
+        return sorted(steps, key=lambda t: t.self_seconds, reverse=True)
+
+    def format_table(self, limit: Optional[int] = None) -> str:
+        """Format the ranked steps as a plain text table.
+
+        Parameters
+        ----------
+        limit : `int`, optional
+            Maximum number of steps to show.
+
+        Returns
+        -------
+        table : `str`
+            The table, with columns for the step's own duration, its
+            duration including children, its kind, and its name.
+        """
+        rows = self.ranked()[:limit]
+        kind_width = max([len("kind")] + [len(t.kind) for t in rows])
+        lines = [
+            "{:>9}  {:>9}  {:<{w}}  {}".format(
+                "self (s)", "total (s)", "kind", "name", w=kind_width
+            )
+        ]
+        for t in rows:
+            lines.append(
+                "{:9.3f}  {:9.3f}  {:<{w}}  {}".format(
+                    t.self_seconds, t.seconds, t.kind, t.name, w=kind_width
+                )
+            )
+        lines.append("Total startup time: {:.3f} s".format(self.total_seconds))
+        return "\n".join(lines)
+
+    def write_speedscope(self, path: str) -> None:
+        """Write the timed steps as a speedscope_ evented profile.
+
+        .. _speedscope: https://www.speedscope.app
+
+        Parameters
+        ----------
+        path : `str`
+            Path of the JSON file to write.
+        """
+        frames: List[dict] = []
+        frame_ids: dict = {}
+        events: List[dict] = []
+
+        def add(timing: StartupTiming) -> None:
+            label = "{} ({})".format(timing.name, timing.kind)
+            if label not in frame_ids:
+                frame_ids[label] = len(frames)
+                frames.append({"name": label})
+            frame = frame_ids[label]
+            events.append({"type": "O", "frame": frame, "at": timing.start})
+            for child in timing.children:
+                add(child)
+            events.append({"type": "C", "frame": frame, "at": timing.end})
+
+        for timing in self.timings:
+            add(timing)
+
+        data = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "evented",
+                    "name": "Sphinx startup: {}".format(self.src_dir),
+                    "unit": "seconds",
+                    "startValue": 0.0,
+                    "endValue": self.total_seconds,
+                    "events": events,
+                }
+            ],
+            "name": "Sphinx startup",
+            "exporter": "documenteer",
+        }
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+    @contextmanager
+    def _time(self, kind: str, name: str) -> Iterator[None]:
+        timing = StartupTiming(kind, name, time.perf_counter() - self._t0)
+        if self._stack:
+            self._stack[-1].children.append(timing)
+        else:
+            self.timings.append(timing)
+        self._stack.append(timing)
+        try:
+            yield
+        finally:
+            timing.end = time.perf_counter() - self._t0
+            self._stack.pop()
+
+    def _wrap_handler(self, event: str, callback: Callable) -> Callable:
+        name = "{}.{}".format(
+            getattr(callback, "__module__", "?"),
+            getattr(callback, "__qualname__", repr(callback)),
+        )
+
+        def timed_callback(*args: Any, **kwargs: Any) -> Any:
+            with self._time(event, name):
+                return callback(*args, **kwargs)
+
+        return timed_callback
+
+    @contextmanager
+    def _instrument(self) -> Iterator[None]:
+        """Temporarily wrap the Sphinx internals that run the startup
+        steps with timers.
+        """
+        import sphinx.config
+        from sphinx.application import Sphinx
+        from sphinx.events import EventManager
+        from sphinx.registry import SphinxComponentRegistry
+
+        profiler = self
+        originals: List[Tuple[Any, str, Any]] = [
+            (
+                sphinx.config,
+                "eval_config_file",
+                sphinx.config.eval_config_file,
+            ),
+            (
+                SphinxComponentRegistry,
+                "load_extension",
+                SphinxComponentRegistry.load_extension,
+            ),
+            (EventManager, "connect", EventManager.connect),
+            (Sphinx, "_init_env", Sphinx._init_env),
+        ]
+        eval_config_file = sphinx.config.eval_config_file
+        load_extension = SphinxComponentRegistry.load_extension
+        connect = EventManager.connect
+        init_env = Sphinx._init_env
+
+        def timed_eval_config_file(filename: str, tags: Any) -> Any:
+            with profiler._time("conf", filename):
+                return eval_config_file(filename, tags)
+
+        def timed_load_extension(
+            registry: Any, app: Any, extname: str
+        ) -> None:
+            if extname in app.extensions:
+                return load_extension(registry, app, extname)
+            with profiler._time("extension", extname):
+                return load_extension(registry, app, extname)
+
+        def timed_connect(
+            events: Any,
+            name: str,
+            callback: Callable,
+            *args: Any,
+            **kwargs: Any,
+        ) -> int:
+            # Sphinx 3.0 added the priority argument, so pass it through
+            # only if it's given
+            if name in PROFILED_EVENTS:
+                callback = profiler._wrap_handler(name, callback)
+            return connect(events, name, callback, *args, **kwargs)
+
+        def timed_init_env(app: Any, freshenv: bool) -> Any:
+            with profiler._time("env", "load build environment"):
+                return init_env(app, freshenv)
+
+        sphinx.config.eval_config_file = timed_eval_config_file
+        setattr(
+            SphinxComponentRegistry, "load_extension", timed_load_extension
+        )
+        setattr(EventManager, "connect", timed_connect)
+        setattr(Sphinx, "_init_env", timed_init_env)
+        try:
+            yield
+        finally:
+            for owner, attr, original in originals:
+                setattr(owner, attr, original)
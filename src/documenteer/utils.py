@@ -1,12 +1,14 @@
 """Utilities used internally be Documenteer.
 """
 
-__all__ = "working_directory"
+__all__ = ["atomic_write", "working_directory"]
 
 import contextlib
 import os
+import secrets
+import stat
 from pathlib import Path
-from typing import Generator, Union
+from typing import Generator, Optional, Union
 
 
 @contextlib.contextmanager
@@ -38,3 +40,42 @@ def working_directory(path: Union[Path, str]) -> Generator:
         yield
     finally:
         os.chdir(original_cwd)
+
+
+def atomic_write(
+    path: Union[Path, str], data: bytes, mode: Optional[int] = None
+) -> None:
+    """Write a file by renaming a temporary file in the same directory into
+    place, so that readers never see a partially written file.
+
+    Parameters
+    ----------
+    path
+        Path of the file.
+    data
+        Content of the file.
+    mode
+        Permission bits of the file. Defaults to the permissions of the
+        existing file, or for a new file, to the permissions that `open`
+        would give it (``0o666`` minus the umask).
+    """
+    path = os.fspath(path)
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            pass
+    directory, name = os.path.split(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{name}.{secrets.token_hex(4)}.tmp")
+    # Unlike tempfile.mkstemp, which creates files that only the owner can
+    # read, os.open applies the umask like open does
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
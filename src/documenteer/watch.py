@@ -0,0 +1,492 @@
+"""Watch mode for documentation builds: rebuild when source files change,
+and serve the HTML site with automatic browser reloads.
+
+This module powers the ``--watch`` option of ``package-docs build`` and
+``stack-docs build``. File changes are detected with watchdog_ (which uses
+inotify on Linux) if it's installed, and by polling file modification times
+otherwise.
+
+.. _watchdog: https://github.com/gorakhargosh/watchdog
+"""
+
+from __future__ import annotations
+
+__all__ = (
+    "IGNORED_DIRNAMES",
+    "RELOAD_PATH",
+    "LiveReloadServer",
+    "PollingWatcher",
+    "WatchdogWatcher",
+    "find_watch_dirs",
+    "make_watcher",
+    "watch_and_rebuild",
+)
+
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+IGNORED_DIRNAMES = frozenset(
+    ["_build", "_doxygen", "py-api", "__pycache__", "node_modules"]
+)
+"""Names of directories whose changes don't trigger rebuilds.
+
+These contain build products, including ``py-api`` directories that
+automodapi writes during the build. Hidden directories are also ignored.
+"""
+
+RELOAD_PATH = "/_documenteer/build"
+"""URL path where the live reload server reports the current build
+number.
+"""
+
+_RELOAD_SCRIPT = """<script>
+(function () {
+  var build = null;
+  function poll() {
+    fetch("%s", {cache: "no-store"})
+      .then(function (r) { return r.json(); })
+      .then(function (data) {
+        if (build !== null && data.build !== build) {
+          window.location.reload();
+        }
+        build = data.build;
+      })
+      .catch(function () {})
+      .then(function () { setTimeout(poll, 1000); });
+  }
+  poll();
+})();
+</script>
+""" % (
+    RELOAD_PATH,
+)
+"""Script injected into served HTML pages that reloads the page when the
+build number changes.
+"""
+
+
+def _is_ignored_dirname(dirname: str) -> bool:
+    return dirname.startswith(".") or dirname in IGNORED_DIRNAMES
+
+
+def _is_ignored_filename(filename: str) -> bool:
+    # Editor swap, backup, and lock files
+    return (
+        filename.startswith((".", "#"))
+        or filename.endswith(("~", ".swp", ".swx", ".tmp"))
+        or filename.endswith((".pyc", ".pyo"))
+    )
+
+
+def _is_ignored_path(path: str, roots: List[str]) -> bool:
+    for root in roots:
+        if path == root or path.startswith(root + os.sep):
+            relpath = os.path.relpath(path, root)
+            parts = relpath.split(os.sep)
+            return any(_is_ignored_dirname(p) for p in parts[:-1]) or (
+                _is_ignored_filename(parts[-1])
+            )
+    return False
+
+
+def find_watch_dirs(root_dir: str) -> List[str]:
+    """Find the directories to watch for a documentation project.
+
+    Parameters
+    ----------
+    root_dir : `str`
+        Root directory of the Sphinx project.
+
+    Returns
+    -------
+    watch_dirs : `list` of `str`
+        The real path of ``root_dir``, followed by the real paths of
+        directories that are linked into the project with symlinks (such as
+        the package ``doc/`` directories that ``stack-docs build`` links
+        into the ``modules`` and ``packages`` directories), sorted. Nested
+        directories are omitted.
+    """
+    root = os.path.realpath(root_dir)
+    linked = set()
+    for dirpath, dirnames, _ in os.walk(root):
+        kept = []
+        for dirname in dirnames:
+            if _is_ignored_dirname(dirname):
+                continue
+            path = os.path.join(dirpath, dirname)
+            if os.path.islink(path):
+                linked.add(os.path.realpath(path))
+            else:
+                kept.append(dirname)
+        dirnames[:] = kept
+
+    watch_dirs = [root]
+    for path in sorted(linked):
+        if not any(
+            path == d or path.startswith(d + os.sep) for d in watch_dirs
+        ):
+            watch_dirs.append(path)
+    return watch_dirs
+
+
+class PollingWatcher:
+    """A watcher that detects changed files by polling their modification
+    times and sizes.
+
+    Parameters
+    ----------
+    watch_dirs : `list` of `str`
+        Directories to watch, recursively.
+    interval : `float`, optional
+        Time between polls, in seconds.
+    """
+
+    def __init__(self, watch_dirs: List[str], interval: float = 1.0) -> None:
+        self.watch_dirs = [os.path.realpath(d) for d in watch_dirs]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for watch_dir in self.watch_dirs:
+            for dirpath, dirnames, filenames in os.walk(watch_dir):
+                dirnames[:] = [
+                    d for d in dirnames if not _is_ignored_dirname(d)
+                ]
+                for filename in filenames:
+                    if _is_ignored_filename(filename):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def get_changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait for files to change.
+
+        Parameters
+        ----------
+        timeout : `float`, optional
+            Maximum time to wait, in seconds. By default, waits until a file
+            changes.
+
+        Returns
+        -------
+        paths : `set` of `str`
+            Paths of the files that were added, modified, or removed. Empty
+            if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+    def close(self) -> None:
+        """Stop watching."""
+
+
+class WatchdogWatcher:
+    """A watcher that uses watchdog to receive file system events (with
+    inotify on Linux).
+
+    Parameters
+    ----------
+    watch_dirs : `list` of `str`
+        Directories to watch, recursively.
+
+    Raises
+    ------
+    ImportError
+        Raised if watchdog isn't installed.
+    """
+
+    def __init__(self, watch_dirs: List[str]) -> None:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        self.watch_dirs = [os.path.realpath(d) for d in watch_dirs]
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event: Any) -> None:
+                # Skip events like "opened" and "closed" that Sphinx
+                # causes by reading the source files
+                if event.is_directory or event.event_type not in (
+                    "created",
+                    "modified",
+                    "deleted",
+                    "moved",
+                ):
+                    return
+                for path in (
+                    event.src_path,
+                    getattr(event, "dest_path", None),
+                ):
+                    if path and not _is_ignored_path(
+                        os.fsdecode(path), watcher.watch_dirs
+                    ):
+                        watcher._queue.put(os.fsdecode(path))
+
+        self._observer = Observer()
+        handler = Handler()
+        for watch_dir in self.watch_dirs:
+            self._observer.schedule(handler, watch_dir, recursive=True)
+        self._observer.start()
+
+    def get_changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait for files to change.
+
+        Parameters
+        ----------
+        timeout : `float`, optional
+            Maximum time to wait, in seconds. By default, waits until a file
+            changes.
+
+        Returns
+        -------
+        paths : `set` of `str`
+            Paths of the files that were added, modified, or removed. Empty
+            if the timeout expired first.
+        """
+        try:
+            changed = {self._queue.get(timeout=timeout)}
+        except queue.Empty:
+            return set()
+        while True:
+            try:
+                changed.add(self._queue.get_nowait())
+            except queue.Empty:
+                return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+        self._observer.stop()
+        self._observer.join()
+
+
+Watcher = Union[PollingWatcher, WatchdogWatcher]
+
+
+def make_watcher(watch_dirs: List[str], polling: bool = False) -> Watcher:
+    """Make a watcher for directories, using watchdog if it's installed.
+
+    Parameters
+    ----------
+    watch_dirs : `list` of `str`
+        Directories to watch, recursively.
+    polling : `bool`, optional
+        Poll for changes even if watchdog is installed.
+
+    Returns
+    -------
+    watcher : `WatchdogWatcher` or `PollingWatcher`
+        The watcher.
+    """
+    if not polling:
+        try:
+            return WatchdogWatcher(watch_dirs)
+        except ImportError:
+            logging.getLogger(__name__).debug(
+                "watchdog is not installed; polling for changes"
+            )
+    return PollingWatcher(watch_dirs)
+
+
+class _LiveReloadHandler(SimpleHTTPRequestHandler):
+    """Request handler that serves the HTML site, injects the reload script
+    into HTML pages, and reports the build number.
+    """
+
+    def __init__(
+        self, *args: Any, live_server: LiveReloadServer, **kwargs: Any
+    ) -> None:
+        self.live_server = live_server
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        url_path = self.path.split("?", 1)[0].split("#", 1)[0]
+        if url_path == RELOAD_PATH:
+            body = json.dumps({"build": self.live_server.build_number})
+            self._send_body(body.encode("utf-8"), "application/json")
+            return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and url_path.endswith("/"):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            with open(path, "rb") as f:
+                content = f.read()
+            script = _RELOAD_SCRIPT.encode("utf-8")
+            index = content.rfind(b"</body>")
+            if index == -1:
+                content += script
+            else:
+                content = content[:index] + script + content[index:]
+            self._send_body(content, "text/html; charset=utf-8")
+            return
+
+        super().do_GET()
+
+    def _send_body(self, body: bytes, content_type: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.getLogger(__name__).debug(format, *args)
+
+
+class LiveReloadServer:
+    """An HTTP server for a built HTML site that reloads pages in the browser
+    after each build.
+
+    Parameters
+    ----------
+    html_dir : `str`
+        Directory of the built HTML site.
+    host : `str`, optional
+        Host name or address to listen on.
+    port : `int`, optional
+        Port to listen on. ``0`` picks a free port.
+    """
+
+    def __init__(
+        self, html_dir: str, host: str = "127.0.0.1", port: int = 8000
+    ) -> None:
+        self.html_dir = html_dir
+        self.build_number = 0
+        handler = functools.partial(
+            _LiveReloadHandler, live_server=self, directory=html_dir
+        )
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """URL of the site (`str`)."""
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode("utf-8")
+        return f"http://{host}:{port}/"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+
+    def notify_build(self) -> None:
+        """Reload pages open in browsers, after a build."""
+        self.build_number += 1
+
+    def close(self) -> None:
+        """Stop serving."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+def watch_and_rebuild(
+    build: Callable[[], int],
+    watch_dirs: List[str],
+    html_dir: Optional[str] = None,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    debounce: float = 0.5,
+    polling: bool = False,
+) -> None:
+    """Rebuild documentation whenever its source files change, until
+    interrupted.
+
+    Parameters
+    ----------
+    build : callable
+        Function, with no arguments, that runs an incremental build and
+        returns its status code. The build runs in this process, so
+        modules imported by the first build stay loaded.
+    watch_dirs : `list` of `str`
+        Directories to watch (see `find_watch_dirs`).
+    html_dir : `str`, optional
+        Directory of the built HTML site. If set, the site is served with
+        `LiveReloadServer`.
+    host : `str`, optional
+        Host name or address for the HTTP server.
+    port : `int`, optional
+        Port for the HTTP server.
+    debounce : `float`, optional
+        Time, in seconds, to wait for further changes after a change before
+        rebuilding, so that saving several files triggers one build.
+    polling : `bool`, optional
+        Poll for changes even if watchdog is installed.
+    """
+    logger = logging.getLogger(__name__)
+    watcher = make_watcher(watch_dirs, polling=polling)
+    server = None
+    try:
+        if html_dir is not None:
+            os.makedirs(html_dir, exist_ok=True)
+            server = LiveReloadServer(html_dir, host=host, port=port)
+            server.start()
+            logger.info("Serving %s at %s", html_dir, server.url)
+        logger.info("Watching for changes in %s", ", ".join(watch_dirs))
+        while True:
+            changed = watcher.get_changes()
+            # Wait for the changes to settle
+            while True:
+                more = watcher.get_changes(timeout=debounce)
+                if not more:
+                    break
+                changed |= more
+            for path in sorted(changed)[:10]:
+                logger.info("Changed: %s", path)
+            if len(changed) > 10:
+                logger.info("... and %d more files", len(changed) - 10)
+            start = time.perf_counter()
+            try:
+                status = build()
+            except Exception:
+                logger.exception("Build failed")
+                status = 1
+            logger.info(
+                "Rebuilt with status %d in %.1f s",
+                status,
+                time.perf_counter() - start,
+            )
+            if server is not None:
+                server.notify_build()
+    finally:
+        watcher.close()
+        if server is not None:
+            server.close()
@@ -1,8 +1,14 @@
+import hashlib
+import http.server
+import sys
+import threading
 from typing import List
 
 import pytest
 from sphinx.testing.path import path
 
+from documenteer.sphinxext.lssttasks.configtree import get_config_tree_fields
+
 pytest_plugins = ("sphinx.testing.fixtures",)
 
 # Exclude 'roots' dirs for pytest test collector
@@ -19,3 +25,63 @@ def pytest_configure(config):
 def rootdir() -> path:
     """Directory containing Sphinx projects for testing (`str`)."""
     return path(__file__).parent.abspath() / "roots"
+
+
+@pytest.fixture()
+def stub_pex_config(rootdir, monkeypatch):
+    """Install stand-ins for the ``lsst.pex.config`` modules from the
+    lssttasks-configtree test root.
+    """
+    monkeypatch.syspath_prepend(str(rootdir / "test-lssttasks-configtree"))
+    monkeypatch.delitem(sys.modules, "configtreestubs", raising=False)
+    import configtreestubs
+
+    for name, module in configtreestubs.stub_pex_config_modules().items():
+        monkeypatch.setitem(sys.modules, name, module)
+    yield
+    get_config_tree_fields.cache_clear()
+    sys.modules.pop("configtreestubs", None)
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Serves ``server.content`` with ETag revalidation."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.path not in self.server.content:
+            self.send_error(404)
+            return
+        body = self.server.content[self.path].encode("utf-8")
+        etag = '"{}"'.format(hashlib.sha256(body).hexdigest())
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """A local HTTP server that serves the text in its ``content`` mapping
+    (keyed by path) and records its requests.
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.content = {}
+    server.requests = []
+    server.url = "http://127.0.0.1:{}".format(server.server_address[1])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1 @@
+var searchData = [];
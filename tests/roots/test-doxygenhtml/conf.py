@@ -0,0 +1,5 @@
+extensions = ["documenteer.ext.doxygenhtml"]
+
+exclude_patterns = ["_build", "_doxygen"]
+
+documenteer_doxygen_html_dir = "_doxygen/html"
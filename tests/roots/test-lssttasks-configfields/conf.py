@@ -0,0 +1,4 @@
+extensions = ["documenteer.sphinxext.lssttasks"]
+
+project = "lssttasks config fields test"
+master_doc = "index"
@@ -0,0 +1,4 @@
+extensions = ["documenteer.sphinxext.lssttasks"]
+
+project = "lssttasks config tree test"
+master_doc = "index"
@@ -0,0 +1,129 @@
+"""Stand-ins for the ``lsst.pex.config`` types, and a task that uses them,
+for testing the ``lsst-task-config-tree`` directive without the LSST
+Science Pipelines.
+
+The test installs these types as the ``lsst.pex.config`` modules (see
+``stub_pex_config_modules``).
+"""
+
+
+class Config:
+    __module__ = "lsst.pex.config.config"
+
+
+class Field:
+    __module__ = "lsst.pex.config.config"
+
+    def __init__(self, doc, dtype, default=None, optional=False):
+        self.doc = doc
+        self.dtype = dtype
+        self.default = default
+        self.optional = optional
+
+
+class ConfigurableField(Field):
+    __module__ = "lsst.pex.config.configurableField"
+
+    def __init__(self, doc, target):
+        super().__init__(doc, dtype=target.ConfigClass)
+        self.target = target
+        self.ConfigClass = target.ConfigClass
+
+
+class ConfigField(Field):
+    __module__ = "lsst.pex.config.configField"
+
+    def __init__(self, doc, dtype):
+        super().__init__(doc, dtype=dtype)
+
+
+class RegistryField(Field):
+    __module__ = "lsst.pex.config.registry"
+
+    def __init__(self, doc, registry, default=None):
+        super().__init__(doc, dtype=None, default=default)
+        self.registry = registry
+        self.multi = False
+
+
+class ConfigurableWrapper:
+    __module__ = "lsst.pex.config.registry"
+
+
+def stub_pex_config_modules():
+    """Make the ``lsst.pex.config`` modules that contain the stand-in types.
+
+    Returns
+    -------
+    modules : `dict`
+        Mapping of module names to module objects, for `sys.modules`.
+    """
+    from types import ModuleType
+
+    modules = {
+        name: ModuleType(name)
+        for name in (
+            "lsst",
+            "lsst.pex",
+            "lsst.pex.config",
+            "lsst.pex.config.config",
+            "lsst.pex.config.configurableField",
+            "lsst.pex.config.configField",
+            "lsst.pex.config.registry",
+        )
+    }
+    for cls in (
+        Config,
+        Field,
+        ConfigurableField,
+        ConfigField,
+        RegistryField,
+        ConfigurableWrapper,
+    ):
+        setattr(modules["lsst.pex.config"], cls.__name__, cls)
+        setattr(modules[cls.__module__], cls.__name__, cls)
+    return modules
+
+
+class DetectionConfig(Config):
+    threshold = Field("Detection threshold.", float, default=5.0)
+
+
+class DetectionTask:
+    ConfigClass = DetectionConfig
+
+
+class OutputConfig(Config):
+    compress = Field("Whether to compress outputs.", bool, default=True)
+
+
+class MeasurementConfig(Config):
+    radius = Field("Aperture radius.", float, default=3.0)
+
+
+class MeasurementTask:
+    ConfigClass = MeasurementConfig
+
+
+class TopConfig(Config):
+    backgroundDetection = ConfigurableField(
+        "Background source detection.", target=DetectionTask
+    )
+    detection = ConfigurableField("Source detection.", target=DetectionTask)
+    measurement = RegistryField(
+        "Measurement algorithm.",
+        registry={"detect": DetectionTask, "it's": MeasurementTask},
+        default="it's",
+    )
+    output = ConfigField("Output settings.", dtype=OutputConfig)
+    doWrite = Field("Whether to write outputs.", bool, default=True)
+
+
+class TopTask:
+    ConfigClass = TopConfig
+
+
+ExportedOutputConfig = OutputConfig
+"""OutputConfig under another name, like a config class that a package
+re-exports.
+"""
@@ -0,0 +1,4 @@
+extensions = ["documenteer.sphinxext.lssttasks"]
+
+project = "lssttasks domain test"
+master_doc = "index"
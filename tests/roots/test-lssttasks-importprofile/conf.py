@@ -0,0 +1,5 @@
+extensions = ["documenteer.sphinxext.lssttasks"]
+
+project = "lssttasks import profile test"
+master_doc = "index"
+documenteer_lssttasks_import_profile = True
@@ -0,0 +1,7 @@
+extensions = ["sphinxcontrib.bibtex", "documenteer.sphinxext.bibtex"]
+
+project = "documenteer.sphinxext.bibtex test"
+master_doc = "index"
+
+bibtex_bibfiles = ["strings.bib", "refs.bib"]
+bibtex_default_style = "lsst_aa"
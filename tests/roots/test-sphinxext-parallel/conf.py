@@ -0,0 +1,4 @@
+extensions = ["documenteer.sphinxext"]
+
+project = "documenteer.sphinxext parallel build test"
+master_doc = "index"
@@ -0,0 +1,119 @@
+"""Tests for the documenteer.bibsubset module."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from pybtex.database import parse_file
+
+from documenteer.bibsubset import (
+    find_cited_keys,
+    find_cited_keys_in_dir,
+    find_keys_missing_from_bib,
+    write_bib_subset,
+)
+
+BIB = """@string{aj = "Astronomical Journal"}
+
+@article{Smith2020,
+  author = {Smith, Jane},
+  title = {A paper},
+  journal = aj,
+  year = {2020}
+}
+
+@inproceedings{Jones2021,
+  author = {Jones, Sam},
+  title = {A talk},
+  crossref = {Conf2021}
+}
+
+@proceedings{Conf2021,
+  title = {Proceedings of a conference},
+  year = {2021}
+}
+
+@docushare{LDM-151,
+  author = {Juric, M.},
+  title = {Data Management Science Pipelines Design},
+  year = {2017},
+  handle = {LDM-151}
+}
+"""
+
+
+def test_find_cited_keys(tmp_path: Path) -> None:
+    rst = tmp_path / "index.rst"
+    rst.write_text(
+        "See :cite:`Smith2020` and :cite:p:`{see}Jones2021, LDM-151{p. 2}`.\n"
+        "Also :footcite:t:`Foot2019`, but not ``:cite:`` alone.\n"
+    )
+    md = tmp_path / "page.md"
+    md.write_text("As in {cite:p}`Md2018`.\n")
+    assert find_cited_keys([rst, md]) == {
+        "Smith2020",
+        "Jones2021",
+        "LDM-151",
+        "Foot2019",
+        "Md2018",
+    }
+
+
+def test_find_cited_keys_in_dir(tmp_path: Path) -> None:
+    (tmp_path / "index.rst").write_text(":cite:`A`\n")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "page.rst").write_text(":cite:`B`\n")
+    (tmp_path / "_build").mkdir()
+    (tmp_path / "_build" / "index.rst").write_text(":cite:`C`\n")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "notes.rst").write_text(":cite:`D`\n")
+    assert find_cited_keys_in_dir(tmp_path) == {"A", "B"}
+
+
+def test_find_keys_missing_from_bib(tmp_path: Path) -> None:
+    bibfile = tmp_path / "refs.bib"
+    bibfile.write_text(BIB)
+    local = tmp_path / "local.bib"
+    local.write_text("@misc{ Local2022 ,\n  title = {Local}\n}\n")
+    missing = find_keys_missing_from_bib(
+        {"smith2020", "Local2022", "LDM-151", "aj", "New2023"},
+        [bibfile, local],
+    )
+    # @string macros aren't entries
+    assert missing == ["New2023", "aj"]
+
+
+def test_write_bib_subset(tmp_path: Path) -> None:
+    bibfile = tmp_path / "refs.bib"
+    bibfile.write_text(BIB)
+    output = tmp_path / "cited.bib"
+
+    written, missing = write_bib_subset(
+        [bibfile], {"jones2021", "LDM-151", "Missing2000"}, output
+    )
+    # Crossreferenced entries come after the entries that cite them
+    assert written == ["Jones2021", "LDM-151", "Conf2021"]
+    assert missing == ["Missing2000"]
+
+    data = parse_file(str(output))
+    assert list(data.entries) == written
+    assert data.entries["LDM-151"].type == "docushare"
+    assert "Smith2020" not in data.entries
+
+    # The file isn't rewritten if the subset didn't change
+    mtime = output.stat().st_mtime_ns
+    write_bib_subset([bibfile], {"Jones2021", "LDM-151"}, output)
+    assert output.stat().st_mtime_ns == mtime
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_write_bib_subset_macros(tmp_path: Path) -> None:
+    """Test that macros are expanded in the subset."""
+    bibfile = tmp_path / "refs.bib"
+    bibfile.write_text(BIB)
+    output = tmp_path / "cited.bib"
+    write_bib_subset([bibfile], {"Smith2020"}, output)
+    data = parse_file(str(output))
+    assert data.entries["Smith2020"].fields["journal"] == (
+        "Astronomical Journal"
+    )
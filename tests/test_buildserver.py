@@ -0,0 +1,229 @@
+"""Tests for the documenteer.buildserver module."""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+from click.testing import CliRunner
+
+from documenteer.buildserver import (
+    SOCKET_FILENAME,
+    BuildServer,
+    BuildServerError,
+    default_socket_path,
+    is_server_running,
+    request_build,
+    request_project_build,
+    request_project_build_status,
+    serve_project,
+    stop_server,
+)
+from documenteer.stackdocs.packagecli import main as package_docs
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Requires Unix domain sockets"
+)
+
+
+class FakeBuild:
+    """A build function that returns queued status codes."""
+
+    def __init__(self) -> None:
+        self.statuses: List[int] = []
+        self.calls = 0
+
+    def __call__(self) -> int:
+        self.calls += 1
+        if self.statuses:
+            return self.statuses.pop(0)
+        return 0
+
+
+@pytest.fixture()
+def fake_build() -> FakeBuild:
+    return FakeBuild()
+
+
+@pytest.fixture()
+def socket_path(tmp_path: Path) -> str:
+    return str(tmp_path / "build.sock")
+
+
+@pytest.fixture()
+def server(fake_build: FakeBuild, socket_path: str) -> Iterator[BuildServer]:
+    server = BuildServer(fake_build, socket_path)
+    server.bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    if thread.is_alive():
+        stop_server(socket_path, timeout=10.0)
+    thread.join(timeout=10.0)
+
+
+def test_request_build(
+    server: BuildServer, fake_build: FakeBuild, socket_path: str
+) -> None:
+    assert is_server_running(socket_path)
+
+    fake_build.statuses = [0, 2]
+    first = request_build(socket_path, timeout=10.0)
+    second = request_build(socket_path, timeout=10.0)
+    assert (first.status, first.build_number) == (0, 1)
+    assert (second.status, second.build_number) == (2, 2)
+    assert second.seconds >= 0.0
+    assert fake_build.calls == 2
+
+
+def test_build_exception(
+    server: BuildServer, fake_build: FakeBuild, socket_path: str
+) -> None:
+    def failing_build() -> int:
+        raise RuntimeError("Build failed")
+
+    server.build = failing_build
+    assert request_build(socket_path, timeout=10.0).status == 1
+
+    # The server is still running
+    server.build = fake_build
+    assert request_build(socket_path, timeout=10.0).status == 0
+
+
+def test_stop_server(server: BuildServer, socket_path: str) -> None:
+    stop_server(socket_path, timeout=10.0)
+    for _ in range(100):
+        if not os.path.exists(socket_path):
+            break
+        threading.Event().wait(0.05)
+    assert not os.path.exists(socket_path)
+    assert not is_server_running(socket_path)
+    with pytest.raises(BuildServerError):
+        request_build(socket_path, timeout=10.0)
+
+
+def test_idle_client(
+    server: BuildServer, fake_build: FakeBuild, socket_path: str
+) -> None:
+    """Test that a client that connects and never sends a request doesn't
+    block the server.
+    """
+    server.request_timeout = 0.2
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+        idle.connect(socket_path)
+        result = request_build(socket_path, timeout=10.0)
+        assert result.status == 0
+        assert fake_build.calls == 1
+        stop_server(socket_path, timeout=10.0)
+
+
+def test_bind_running_server(server: BuildServer, socket_path: str) -> None:
+    with pytest.raises(BuildServerError):
+        BuildServer(FakeBuild(), socket_path).bind()
+
+
+def test_bind_busy_server(socket_path: str) -> None:
+    """Test that a server that is running a build, and can't answer a ping,
+    keeps its socket.
+    """
+    started = threading.Event()
+    finish = threading.Event()
+
+    def slow_build() -> int:
+        started.set()
+        finish.wait(timeout=30.0)
+        return 0
+
+    server = BuildServer(slow_build, socket_path)
+    server.bind()
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    client_thread = threading.Thread(
+        target=request_build, args=(socket_path, 30.0), daemon=True
+    )
+    client_thread.start()
+    try:
+        assert started.wait(timeout=10.0)
+        assert not is_server_running(socket_path, timeout=0.2)
+        with pytest.raises(BuildServerError):
+            BuildServer(FakeBuild(), socket_path).bind()
+        assert os.path.exists(socket_path)
+    finally:
+        finish.set()
+        client_thread.join(timeout=10.0)
+        stop_server(socket_path, timeout=10.0)
+        server_thread.join(timeout=10.0)
+
+
+def test_bind_stale_socket(socket_path: str) -> None:
+    stale = BuildServer(FakeBuild(), socket_path)
+    stale.bind()
+    # Simulate a server that exited without removing its socket file
+    assert stale._socket is not None
+    stale._socket.close()
+    assert os.path.exists(socket_path)
+
+    server = BuildServer(FakeBuild(), socket_path)
+    server.bind()
+    server.close()
+    assert not os.path.exists(socket_path)
+
+
+def test_default_socket_path(tmp_path: Path) -> None:
+    assert default_socket_path(str(tmp_path)) == str(
+        tmp_path / "_build" / SOCKET_FILENAME
+    )
+
+    long_dir = str(tmp_path / ("x" * 120))
+    socket_path = default_socket_path(long_dir)
+    assert len(socket_path) <= 100
+    assert socket_path == default_socket_path(long_dir)
+
+
+def test_serve_project(tmp_path: Path) -> None:
+    doc_dir = tmp_path / "doc"
+    doc_dir.mkdir()
+    (doc_dir / "conf.py").write_text('project = "Example"\n')
+    (doc_dir / "index.rst").write_text("Example\n=======\n")
+    socket_path = default_socket_path(str(doc_dir))
+
+    thread = threading.Thread(
+        target=serve_project, args=(str(doc_dir),), daemon=True
+    )
+    thread.start()
+    try:
+        for _ in range(200):
+            if is_server_running(socket_path, timeout=30.0):
+                break
+            threading.Event().wait(0.05)
+        result = request_project_build(
+            str(doc_dir), "package-docs serve-build"
+        )
+        assert (result.status, result.build_number) == (0, 2)
+        assert (doc_dir / "_build" / "html" / "index.html").exists()
+        assert (
+            request_project_build_status(
+                str(doc_dir), "package-docs serve-build"
+            )
+            == 0
+        )
+    finally:
+        stop_server(socket_path, timeout=30.0)
+        thread.join(timeout=30.0)
+    assert not os.path.exists(socket_path)
+
+
+def test_package_docs_build_without_server(tmp_path: Path) -> None:
+    doc_dir = tmp_path / "doc"
+    doc_dir.mkdir()
+    (doc_dir / "conf.py").write_text("")
+    runner = CliRunner()
+    result = runner.invoke(
+        package_docs, ["-d", str(doc_dir), "build", "--server"]
+    )
+    assert result.exit_code != 0
+    assert "package-docs serve-build" in result.output
@@ -0,0 +1,83 @@
+"""Tests for documenteer.ext.doxygenhtml."""
+
+from __future__ import annotations
+
+import errno
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from documenteer.ext.doxygenhtml import sync_tree
+
+
+@pytest.fixture()
+def src_dir(tmp_path: Path) -> Path:
+    src_dir = tmp_path / "html"
+    (src_dir / "cpp-api" / "search").mkdir(parents=True)
+    (src_dir / "cpp-api" / "index.html").write_text("<p>Index</p>")
+    (src_dir / "cpp-api" / "search" / "search.js").write_text("var x;")
+    return src_dir
+
+
+def test_sync_tree_link(src_dir: Path, tmp_path: Path) -> None:
+    dest_dir = tmp_path / "out"
+    stats = sync_tree(str(src_dir), str(dest_dir))
+    assert stats.total == 2
+    assert stats.copied + stats.unchanged == 0
+    dest = dest_dir / "cpp-api" / "index.html"
+    assert dest.read_text() == "<p>Index</p>"
+    if stats.hardlinked:
+        assert os.path.samefile(dest, src_dir / "cpp-api" / "index.html")
+
+    stats = sync_tree(str(src_dir), str(dest_dir))
+    assert stats.unchanged == 2
+
+
+def test_sync_tree_link_fallback(
+    src_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def cross_device_link(src: str, dest: str) -> None:
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device_link)
+    stats = sync_tree(str(src_dir), str(tmp_path / "out"))
+    assert stats.hardlinked == 0
+    assert stats.reflinked + stats.copied == 2
+    dest = tmp_path / "out" / "cpp-api" / "search" / "search.js"
+    assert dest.read_text() == "var x;"
+
+
+def test_sync_tree_copy(src_dir: Path, tmp_path: Path) -> None:
+    dest_dir = tmp_path / "out"
+    stats = sync_tree(str(src_dir), str(dest_dir), method="copy")
+    assert stats.copied == 2
+    dest = dest_dir / "cpp-api" / "index.html"
+    assert not os.path.samefile(dest, src_dir / "cpp-api" / "index.html")
+
+    assert sync_tree(str(src_dir), str(dest_dir), method="copy").unchanged == 2
+
+    # Doxygen writes a new file, which replaces the copy
+    src = src_dir / "cpp-api" / "index.html"
+    src.unlink()
+    src.write_text("<p>New index</p>")
+    stats = sync_tree(str(src_dir), str(dest_dir), method="copy")
+    assert (stats.copied, stats.unchanged) == (1, 1)
+    assert dest.read_text() == "<p>New index</p>"
+    assert not list(dest_dir.glob("**/.*.tmp"))
+
+
+def test_sync_tree_unknown_method(src_dir: Path, tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        sync_tree(str(src_dir), str(tmp_path / "out"), method="symlink")
+
+
+@pytest.mark.sphinx("html", testroot="doxygenhtml")
+def test_doxygenhtml_build(app: Any, status: Any, warning: Any) -> None:
+    app.build()
+
+    dest = Path(app.outdir) / "cpp-api" / "index.html"
+    assert dest.read_text() == "<html><body>C++ API</body></html>\n"
+    assert (Path(app.outdir) / "cpp-api" / "search" / "search.js").exists()
+    assert "doxygen html: 2 files" in status.getvalue()
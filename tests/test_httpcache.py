@@ -0,0 +1,85 @@
+"""Tests for the documenteer.httpcache module, using a local HTTP server."""
+
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from documenteer.httpcache import HttpCache
+from documenteer.sphinxext.remotecodeblock import RemoteCodeBlockReader
+
+
+def test_cache_hit(tmp_path, http_server):
+    http_server.content["/a.py"] = "print('a')\n"
+    url = http_server.url + "/a.py"
+    cache = HttpCache(str(tmp_path))
+    session = requests.Session()
+
+    assert cache.get_text(url, session) == "print('a')\n"
+    assert cache.get_text(url, session) == "print('a')\n"
+    assert len(http_server.requests) == 1
+
+    # A new cache instance (a rebuild) reads the persisted response
+    cache = HttpCache(str(tmp_path))
+    assert cache.get_text(url, session) == "print('a')\n"
+    assert len(http_server.requests) == 1
+    assert cache.stats == {"hits": 1, "revalidated": 0, "misses": 0}
+
+
+def test_cache_revalidation(tmp_path, http_server):
+    http_server.content["/a.py"] = "print('a')\n"
+    url = http_server.url + "/a.py"
+    cache = HttpCache(str(tmp_path), max_age=0)
+    session = requests.Session()
+
+    assert cache.get_text(url, session) == "print('a')\n"
+    assert cache.get_text(url, session) == "print('a')\n"
+    assert len(http_server.requests) == 2
+    assert "If-None-Match" in http_server.requests[1][1]
+    assert cache.stats["revalidated"] == 1
+
+    # Changed content is downloaded again
+    http_server.content["/a.py"] = "print('b')\n"
+    assert cache.get_text(url, session) == "print('b')\n"
+    assert cache.stats["misses"] == 2
+
+
+def test_cache_error(tmp_path, http_server):
+    cache = HttpCache(str(tmp_path))
+    with pytest.raises(requests.HTTPError):
+        cache.get_text(http_server.url + "/missing.py", requests.Session())
+    assert os.listdir(tmp_path) == []
+
+
+def test_cache_eviction(tmp_path, http_server):
+    session = requests.Session()
+    cache = HttpCache(str(tmp_path), max_size=25)
+    for name in ("a", "b", "c"):
+        http_server.content["/" + name] = name * 10
+        cache.get_text(http_server.url + "/" + name, session)
+        # Ensure distinct modification times for LRU ordering
+        time.sleep(0.01)
+
+    bodies = [p for p in os.listdir(tmp_path) if p.endswith(".body")]
+    assert len(bodies) == 2
+
+    # The oldest response, "a", was evicted and has to be downloaded again
+    cache.get_text(http_server.url + "/c", session)
+    assert len(http_server.requests) == 3
+    cache.get_text(http_server.url + "/a", session)
+    assert len(http_server.requests) == 4
+
+
+def test_remote_code_block_reader(tmp_path, http_server):
+    http_server.content["/example.py"] = "a = 1\n\tb = 2\n"
+    url = http_server.url + "/example.py"
+    cache = HttpCache(str(tmp_path))
+    config = SimpleNamespace(source_encoding="utf-8-sig")
+    for _ in range(2):
+        reader = RemoteCodeBlockReader(
+            url, {"tab-width": 4}, config, cache=cache
+        )
+        assert reader.read_file(url) == ["a = 1\n", "    b = 2\n"]
+    assert len(http_server.requests) == 1
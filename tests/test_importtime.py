@@ -0,0 +1,67 @@
+"""Tests that importing documenteer and starting its command-line tools
+doesn't import heavy dependencies, using ``python -X importtime``.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("requests", "git", "yaml", "sphinxcontrib.doxylink")
+"""Modules that should only be imported when they're used."""
+
+IMPORT_BUDGET_US = 2_000_000
+"""Budget for the cumulative import time, in microseconds.
+
+This is deliberately generous so that the test isn't flaky on slow CI
+runners; the heavy module checks are what catch regressions.
+"""
+
+
+def _import_profile(module_name):
+    """Import a module in a new interpreter with ``-X importtime``.
+
+    Returns
+    -------
+    cumulative_us : `int`
+        Cumulative import time of the module, in microseconds.
+    imported : `set` of `str`
+        Names of all modules imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    cumulative_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].strip()
+        imported.add(name)
+        if name == module_name:
+            cumulative_us = int(fields[1])
+    assert cumulative_us is not None, result.stderr
+    return cumulative_us, imported
+
+
+@pytest.mark.parametrize(
+    "module_name",
+    [
+        "documenteer",
+        "documenteer.sphinxext",
+        "documenteer.stackdocs.packagecli",
+        "documenteer.stackdocs.stackcli",
+        "documenteer.bin.refreshlsstbib",
+        "documenteer.sphinxconfig.utils",
+    ],
+)
+def test_import_is_lazy(module_name):
+    cumulative_us, imported = _import_profile(module_name)
+    assert cumulative_us < IMPORT_BUDGET_US
+    assert imported.isdisjoint(HEAVY_MODULES)
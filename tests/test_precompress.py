@@ -0,0 +1,143 @@
+"""Tests for the documenteer.precompress module."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from documenteer.precompress import precompress_after_build, precompress_site
+
+HTML = "<html><body>" + "<p>Hello, world.</p>" * 200 + "</body></html>"
+
+
+@pytest.fixture()
+def html_dir(tmp_path: Path) -> Path:
+    html_dir = tmp_path / "_build" / "html"
+    (html_dir / "_static").mkdir(parents=True)
+    (html_dir / "index.html").write_text(HTML)
+    (html_dir / "searchindex.js").write_text("Search.setIndex({})" * 100)
+    (html_dir / "_static" / "basic.css").write_text("p { margin: 0; }" * 100)
+    (html_dir / "_static" / "tiny.svg").write_text("<svg/>")
+    (html_dir / "_static" / "logo.png").write_bytes(b"\x89PNG" * 100)
+    return html_dir
+
+
+def test_precompress_site(html_dir: Path) -> None:
+    stats = precompress_site(str(html_dir), formats=["gz"], max_workers=1)
+    assert (stats.compressed, stats.unchanged, stats.removed) == (4, 0, 0)
+
+    gz_path = html_dir / "index.html.gz"
+    assert gzip.decompress(gz_path.read_bytes()).decode() == HTML
+    assert (html_dir / "searchindex.js.gz").exists()
+    assert (html_dir / "_static" / "basic.css.gz").exists()
+    # Compressing doesn't make this file smaller
+    assert not (html_dir / "_static" / "tiny.svg.gz").exists()
+    assert not (html_dir / "_static" / "logo.png.gz").exists()
+
+    # The manifest is next to the site, not in it
+    manifest = json.loads((html_dir.parent / "precompress.json").read_text())
+    assert manifest["files"]["index.html"]["written"] == ["gz"]
+    assert manifest["files"]["_static/tiny.svg"]["written"] == []
+
+    stats = precompress_site(str(html_dir), formats=["gz"], max_workers=1)
+    assert (stats.compressed, stats.unchanged) == (0, 4)
+
+
+def test_precompress_site_incremental(html_dir: Path) -> None:
+    precompress_site(str(html_dir), formats=["gz"], max_workers=1)
+    gz_path = html_dir / "index.html.gz"
+    gz_mtime = gz_path.stat().st_mtime_ns
+
+    # Sphinx writes the page again with the same content
+    (html_dir / "index.html").write_text(HTML)
+    os.utime(html_dir / "index.html", ns=(1, 1))
+    stats = precompress_site(str(html_dir), formats=["gz"], max_workers=1)
+    assert (stats.compressed, stats.unchanged) == (0, 4)
+    assert gz_path.stat().st_mtime_ns == gz_mtime
+
+    (html_dir / "index.html").write_text(HTML + "<!-- changed -->")
+    stats = precompress_site(str(html_dir), formats=["gz"], max_workers=1)
+    assert (stats.compressed, stats.unchanged) == (1, 3)
+    assert gzip.decompress(gz_path.read_bytes()).decode().endswith("-->")
+
+    (html_dir / "index.html").unlink()
+    stats = precompress_site(str(html_dir), formats=["gz"], max_workers=1)
+    assert (stats.compressed, stats.unchanged, stats.removed) == (0, 3, 1)
+    assert not gz_path.exists()
+
+
+def test_precompress_site_removes_other_formats(html_dir: Path) -> None:
+    """Test that siblings in formats that are no longer written (such as
+    .br files after brotli was uninstalled) are removed.
+    """
+    br_path = html_dir / "index.html.br"
+    br_path.write_bytes(b"stale")
+    precompress_site(str(html_dir), formats=["gz"], max_workers=1)
+    assert not br_path.exists()
+
+    # Also for files whose content didn't change
+    br_path.write_bytes(b"stale")
+    os.utime(html_dir / "index.html", ns=(1, 1))
+    stats = precompress_site(str(html_dir), formats=["gz"], max_workers=1)
+    assert stats.compressed == 0
+    assert not br_path.exists()
+    assert (html_dir / "index.html.gz").exists()
+
+
+def test_precompress_site_parallel(html_dir: Path, tmp_path: Path) -> None:
+    manifest_path = tmp_path / "manifest.json"
+    stats = precompress_site(
+        str(html_dir),
+        formats=["gz"],
+        manifest_path=str(manifest_path),
+        max_workers=2,
+    )
+    assert stats.compressed == 4
+    assert manifest_path.exists()
+    assert (html_dir / "index.html.gz").exists()
+
+
+def test_precompress_site_without_brotli(
+    html_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setitem(sys.modules, "brotli", None)
+    precompress_site(str(html_dir), max_workers=1)
+    assert (html_dir / "index.html.gz").exists()
+    assert not (html_dir / "index.html.br").exists()
+
+
+def test_precompress_site_brotli(html_dir: Path) -> None:
+    brotli = pytest.importorskip("brotli")
+    precompress_site(str(html_dir), max_workers=1)
+    br_path = html_dir / "index.html.br"
+    assert brotli.decompress(br_path.read_bytes()).decode() == HTML
+
+
+def test_precompress_site_unknown_format(html_dir: Path) -> None:
+    with pytest.raises(ValueError):
+        precompress_site(str(html_dir), formats=["zstd"])
+
+
+def test_precompress_after_build(html_dir: Path) -> None:
+    """Test that a wrapped (watch mode) rebuild precompresses the site after
+    each successful build.
+    """
+    statuses = [0, 1]
+
+    def build() -> int:
+        (html_dir / "index.html").write_text(HTML + str(len(statuses)))
+        return statuses.pop(0)
+
+    rebuild = precompress_after_build(build, str(html_dir))
+    assert rebuild() == 0
+    gz_path = html_dir / "index.html.gz"
+    assert gzip.decompress(gz_path.read_bytes()).decode() == HTML + "2"
+
+    # A failed build leaves the site as it is
+    assert rebuild() == 1
+    assert gzip.decompress(gz_path.read_bytes()).decode() == HTML + "2"
@@ -3,7 +3,12 @@
 
 import os
 
-from documenteer.bin.refreshlsstbib import process_bib_files
+from documenteer.bin.refreshlsstbib import (
+    BIB_FILENAMES,
+    ETAG_SUFFIX,
+    process_bib_files,
+    prune_bib_files,
+)
 
 
 def test_process_bib_files(tmpdir):
@@ -18,3 +23,105 @@ def test_process_bib_files(tmpdir):
     assert os.path.exists(os.path.join(dirname, "lsst.bib"))
     assert os.path.exists(os.path.join(dirname, "refs.bib"))
     assert os.path.exists(os.path.join(dirname, "refs_ads.bib"))
+
+
+def _serve_bib_files(http_server):
+    for filename in BIB_FILENAMES:
+        http_server.content["/bib/" + filename] = "@misc{{{}}}\n".format(
+            filename
+        )
+    return http_server.url + "/bib/"
+
+
+def test_process_bib_files_conditional(tmp_path, http_server):
+    """Test that unchanged bib files are revalidated with conditional
+    requests and are not rewritten.
+    """
+    root_url = _serve_bib_files(http_server)
+
+    assert process_bib_files(str(tmp_path), root_url=root_url) == 0
+    for filename in BIB_FILENAMES:
+        path = tmp_path / filename
+        assert path.read_text() == "@misc{{{}}}\n".format(filename)
+        assert (tmp_path / (filename + ETAG_SUFFIX)).read_text()
+    mtimes = {
+        filename: (tmp_path / filename).stat().st_mtime_ns
+        for filename in BIB_FILENAMES
+    }
+
+    # Change one file on the server
+    http_server.content["/bib/refs.bib"] = "@misc{changed}\n"
+    http_server.requests.clear()
+    assert process_bib_files(str(tmp_path), root_url=root_url) == 0
+
+    assert len(http_server.requests) == len(BIB_FILENAMES)
+    assert all("If-None-Match" in h for _, h in http_server.requests)
+    assert (tmp_path / "refs.bib").read_text() == "@misc{changed}\n"
+    for filename in BIB_FILENAMES:
+        if filename != "refs.bib":
+            assert (tmp_path / filename).stat().st_mtime_ns == mtimes[filename]
+    # No temporary files are left behind
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_process_bib_files_unchanged_content(tmp_path, http_server):
+    """Test that an existing bib file with the same content is not rewritten
+    even without an ETag sidecar file.
+    """
+    root_url = _serve_bib_files(http_server)
+    path = tmp_path / "books.bib"
+    path.write_text("@misc{books.bib}\n")
+    os.utime(path, ns=(0, 0))
+
+    assert process_bib_files(str(tmp_path), root_url=root_url) == 0
+    assert path.stat().st_mtime_ns == 0
+    assert (tmp_path / ("books.bib" + ETAG_SUFFIX)).exists()
+
+
+def test_process_bib_files_error(tmp_path, http_server):
+    """Test that a failed download is counted and keeps the existing file."""
+    root_url = _serve_bib_files(http_server)
+    del http_server.content["/bib/lsst.bib"]
+    (tmp_path / "lsst.bib").write_text("@misc{old}\n")
+
+    assert process_bib_files(str(tmp_path), root_url=root_url) == 1
+    assert (tmp_path / "lsst.bib").read_text() == "@misc{old}\n"
+    assert (tmp_path / "books.bib").exists()
+
+
+def test_prune_bib_files(tmp_path, http_server):
+    """Test writing the cited subset of downloaded bib files."""
+    root_url = _serve_bib_files(http_server)
+    bib_dir = tmp_path / "lsstbib"
+    bib_dir.mkdir()
+    assert process_bib_files(str(bib_dir), root_url=root_url) == 0
+    (tmp_path / "index.rst").write_text(
+        ":cite:`refs.bib` and :cite:p:`lsst.bib,local2020`\n"
+    )
+    subset_file = tmp_path / "lsstbib-cited.bib"
+
+    missing = prune_bib_files(str(bib_dir), str(tmp_path), str(subset_file))
+
+    assert missing == ["local2020"]
+    content = subset_file.read_text()
+    assert "@misc{refs.bib" in content
+    assert "@misc{lsst.bib" in content
+    assert "books.bib" not in content
+
+
+def test_prune_bib_files_same_dir(tmp_path, http_server):
+    """Test that running the command twice in a directory, with the default
+    options, writes the same subset (and doesn't read the subset file from
+    the first run).
+    """
+    root_url = _serve_bib_files(http_server)
+    assert process_bib_files(str(tmp_path), root_url=root_url) == 0
+    (tmp_path / "index.rst").write_text(":cite:`refs.bib,lsst.bib`\n")
+    subset_file = tmp_path / "lsstbib-cited.bib"
+
+    prune_bib_files(str(tmp_path), str(tmp_path), str(subset_file))
+    first = subset_file.read_text()
+    prune_bib_files(str(tmp_path), str(tmp_path), str(subset_file))
+
+    assert subset_file.read_text() == first
+    assert first.count("@misc{refs.bib") == 1
@@ -0,0 +1,125 @@
+"""Tests for the documenteer.remotesnapshot module and the
+``package-docs freeze-remote`` command, using a local HTTP server.
+"""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+from sphinx.testing.path import path
+
+from documenteer.remotesnapshot import RemoteSnapshot, freeze_urls
+from documenteer.stackdocs.packagecli import main
+
+
+def test_freeze_urls(tmp_path, http_server):
+    http_server.content["/a.py"] = "a = 1\n"
+    http_server.content["/b.py"] = "a = 1\n"
+    urls = [http_server.url + "/a.py", http_server.url + "/b.py"]
+    missing_url = http_server.url + "/missing.py"
+
+    snapshot_dir = tmp_path / "snapshot"
+    snapshot, errors = freeze_urls(urls + [missing_url], str(snapshot_dir))
+    assert [url for url, _ in errors] == [missing_url]
+
+    lock = json.loads((snapshot_dir / "lock.json").read_text())
+    assert sorted(lock["urls"]) == urls
+    # Identical content is stored once
+    assert len(list((snapshot_dir / "objects").iterdir())) == 1
+
+    loaded = RemoteSnapshot(str(snapshot_dir)).load()
+    assert loaded.get_text(urls[0]) == "a = 1\n"
+    with pytest.raises(KeyError):
+        loaded.get_text(missing_url)
+
+    # Refreezing removes content that is no longer referenced
+    http_server.content["/a.py"] = "a = 2\n"
+    freeze_urls(urls[:1], str(snapshot_dir))
+    assert len(list((snapshot_dir / "objects").iterdir())) == 1
+    loaded = RemoteSnapshot(str(snapshot_dir)).load()
+    assert loaded.get_text(urls[0]) == "a = 2\n"
+
+
+def test_snapshot_integrity(tmp_path, http_server):
+    http_server.content["/a.py"] = "a = 1\n"
+    url = http_server.url + "/a.py"
+    snapshot, _ = freeze_urls([url], str(tmp_path))
+    entry = snapshot.entries[url]
+    (tmp_path / "objects" / entry.sha256).write_text("tampered")
+    with pytest.raises(ValueError):
+        RemoteSnapshot(str(tmp_path)).load().get_text(url)
+
+
+def test_freeze_remote_cli_and_frozen_build(tmp_path, http_server, make_app):
+    http_server.content["/a.py"] = "frozen = 1\n"
+    doc_dir = tmp_path / "doc"
+    doc_dir.mkdir()
+    (doc_dir / "conf.py").write_text(
+        'extensions = ["documenteer.sphinxext.remotecodeblock"]\n'
+        "remote_code_block_cache = False\n"
+        'remote_code_block_snapshot = "remote-snapshot"\n'
+    )
+    (doc_dir / "index.rst").write_text(
+        "Frozen\n"
+        "======\n"
+        "\n"
+        ".. remote-code-block:: {}/a.py\n".format(http_server.url)
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["-d", str(doc_dir), "freeze-remote"])
+    assert result.exit_code == 0, result.output
+    assert (doc_dir / "remote-snapshot" / "lock.json").exists()
+    assert len(http_server.requests) == 1
+
+    # The build reads from the snapshot, even once the content changes
+    http_server.content["/a.py"] = "thawed = 1\n"
+    app = make_app("html", srcdir=path(str(doc_dir)))
+    app.build()
+    assert len(http_server.requests) == 1
+    html = (app.outdir / "index.html").read_text()
+    assert "frozen" in html
+    assert "thawed" not in html
+
+    # A URL that isn't in the snapshot is a warning (without the quotes
+    # of the KeyError's message)
+    (doc_dir / "index.rst").write_text(
+        "Frozen\n"
+        "======\n"
+        "\n"
+        ".. remote-code-block:: {}/b.py\n".format(http_server.url)
+    )
+    app = make_app("html", srcdir=path(str(doc_dir)), freshenv=True)
+    app.build()
+    assert len(http_server.requests) == 1
+    assert (
+        "WARNING: {}/b.py is not in the remote content snapshot".format(
+            http_server.url
+        )
+        in app._warning.getvalue()
+    )
+
+
+def test_build_ignores_unconfigured_snapshot(tmp_path, http_server, make_app):
+    """Test that a snapshot directory is only used if the
+    remote_code_block_snapshot configuration value is set.
+    """
+    url = http_server.url + "/a.py"
+    http_server.content["/a.py"] = "thawed = 1\n"
+    doc_dir = tmp_path / "doc"
+    doc_dir.mkdir()
+    freeze_urls([url], str(doc_dir / "remote-snapshot"))
+    http_server.content["/a.py"] = "current = 1\n"
+    (doc_dir / "conf.py").write_text(
+        'extensions = ["documenteer.sphinxext.remotecodeblock"]\n'
+        "remote_code_block_cache = False\n"
+    )
+    (doc_dir / "index.rst").write_text(
+        "Live\n====\n\n.. remote-code-block:: {}\n".format(url)
+    )
+
+    app = make_app("html", srcdir=path(str(doc_dir)))
+    app.build()
+    html = (app.outdir / "index.html").read_text()
+    assert "current" in html
+    assert "thawed" not in html
@@ -0,0 +1,75 @@
+"""Tests for the documenteer.requestsutils module."""
+
+import multiprocessing
+import os
+
+import pytest
+
+from documenteer import requestsutils
+from documenteer.requestsutils import (
+    close_pooled_session,
+    configure_pooled_session,
+    get_pooled_session,
+    get_pooled_session_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def pooled_session():
+    close_pooled_session()
+    yield
+    close_pooled_session()
+    configure_pooled_session()
+
+
+def test_pooled_session_reused():
+    session = get_pooled_session()
+    assert get_pooled_session() is session
+
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == 10
+    assert adapter.max_retries.total == 3
+
+    configure_pooled_session(pool_maxsize=16)
+    new_session = get_pooled_session()
+    assert new_session is not session
+    assert new_session.get_adapter("https://example.com")._pool_maxsize == 16
+
+
+def test_pooled_session_stats(http_server):
+    http_server.content["/a.txt"] = "a"
+    http_server.content["/b.txt"] = "b"
+    assert get_pooled_session_stats()["requests"] == 0
+
+    session = get_pooled_session()
+    for name in ("a", "b", "a"):
+        response = session.get(http_server.url + "/{}.txt".format(name))
+        assert response.text == name
+
+    stats = get_pooled_session_stats()
+    assert stats == {"pools": 1, "connections": 1, "requests": 3, "reused": 2}
+
+
+def test_pooled_session_pid_change(monkeypatch):
+    session = get_pooled_session()
+    monkeypatch.setattr(requestsutils.os, "getpid", lambda: -1)
+    assert get_pooled_session() is not session
+
+
+def _put_child_session_state(queue):
+    queue.put(requestsutils._pooled_session is None)
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "register_at_fork"), reason="Requires os.register_at_fork"
+)
+def test_pooled_session_after_fork():
+    """A forked process doesn't inherit the parent's session."""
+    get_pooled_session()
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=_put_child_session_state, args=(queue,))
+    process.start()
+    child_has_no_session = queue.get(timeout=10)
+    process.join()
+    assert child_has_no_session
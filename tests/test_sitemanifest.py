@@ -0,0 +1,111 @@
+"""Tests for the documenteer.sitemanifest module."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+from click.testing import CliRunner
+
+from documenteer.sitemanifest import (
+    build_manifest,
+    diff_manifests,
+    read_manifest,
+    write_manifest,
+)
+from documenteer.stackdocs.stackcli import main as stack_docs
+
+
+@pytest.fixture()
+def site_dir(tmp_path: Path) -> Path:
+    site_dir = tmp_path / "_build" / "html"
+    (site_dir / "_static").mkdir(parents=True)
+    (site_dir / "index.html").write_text("<p>Index</p>")
+    (site_dir / "searchindex.js").write_text("Search.setIndex({})")
+    (site_dir / "_static" / "basic.css").write_text("p { margin: 0; }")
+    return site_dir
+
+
+def test_build_manifest(site_dir: Path) -> None:
+    manifest = build_manifest(str(site_dir), max_workers=2)
+    assert list(manifest["files"]) == [
+        "_static/basic.css",
+        "index.html",
+        "searchindex.js",
+    ]
+    entry = manifest["files"]["index.html"]
+    assert entry["size"] == len("<p>Index</p>")
+    assert entry["sha256"] == hashlib.sha256(b"<p>Index</p>").hexdigest()
+
+
+def test_build_manifest_reuses_hashes(
+    site_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    previous = build_manifest(str(site_dir))
+
+    hashed = []
+
+    def record_open(path: Any, *args: Any, **kwargs: Any) -> Any:
+        hashed.append(os.path.basename(path))
+        return open(path, *args, **kwargs)
+
+    monkeypatch.setattr(
+        "documenteer.sitemanifest.open", record_open, raising=False
+    )
+    (site_dir / "index.html").write_text("<p>New index</p>")
+    manifest = build_manifest(str(site_dir), previous=previous)
+    assert hashed == ["index.html"]
+    assert manifest["files"]["searchindex.js"] == (
+        previous["files"]["searchindex.js"]
+    )
+
+
+def test_diff_manifests(site_dir: Path) -> None:
+    previous = build_manifest(str(site_dir))
+
+    (site_dir / "index.html").write_text("<p>New index</p>")
+    # Same content, new modification time
+    (site_dir / "searchindex.js").write_text("Search.setIndex({})")
+    os.utime(site_dir / "searchindex.js", ns=(1, 1))
+    (site_dir / "_static" / "basic.css").unlink()
+    (site_dir / "genindex.html").write_text("<p>Index</p>")
+
+    diff = diff_manifests(previous, build_manifest(str(site_dir)))
+    assert diff.added == ["genindex.html"]
+    assert diff.modified == ["index.html"]
+    assert diff.removed == ["_static/basic.css"]
+    assert diff.unchanged == 1
+    assert diff.changed
+
+
+def test_read_write_manifest(site_dir: Path, tmp_path: Path) -> None:
+    path = tmp_path / "out" / "manifest.json"
+    assert read_manifest(str(path)) is None
+    manifest = build_manifest(str(site_dir))
+    write_manifest(str(path), manifest)
+    assert read_manifest(str(path)) == manifest
+
+
+def test_stack_docs_manifest(site_dir: Path, tmp_path: Path) -> None:
+    (tmp_path / "conf.py").write_text("")
+    runner = CliRunner()
+    args = ["-d", str(tmp_path), "manifest"]
+
+    result = runner.invoke(stack_docs, args)
+    assert result.exit_code == 0, result.output
+    assert "A\tindex.html" in result.output.splitlines()
+    manifest_path = tmp_path / "_build" / "manifest.json"
+    published = tmp_path / "published.json"
+    published.write_bytes(manifest_path.read_bytes())
+
+    result = runner.invoke(stack_docs, args)
+    assert result.exit_code == 0, result.output
+    assert "\t" not in result.output
+
+    (site_dir / "index.html").write_text("<p>New index</p>")
+    result = runner.invoke(stack_docs, args + ["--previous", str(published)])
+    assert result.exit_code == 0, result.output
+    assert "M\tindex.html" in result.output.splitlines()
@@ -0,0 +1,157 @@
+"""Tests for the documenteer.sphinxconfig.gitcache module."""
+
+import datetime
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from documenteer.sphinxconfig.gitcache import (
+    CACHE_FILENAME,
+    GitMetadataCache,
+    find_git_dir,
+    read_git_state_key,
+)
+
+
+def _git(repo_dir, *args):
+    subprocess.run(
+        ["git", *args],
+        cwd=str(repo_dir),
+        check=True,
+        capture_output=True,
+        env=dict(
+            os.environ,
+            GIT_AUTHOR_NAME="Test",
+            GIT_AUTHOR_EMAIL="test@example.com",
+            GIT_COMMITTER_NAME="Test",
+            GIT_COMMITTER_EMAIL="test@example.com",
+        ),
+    )
+
+
+@pytest.fixture()
+def repo_dir(tmp_path):
+    repo_dir = tmp_path / "repo"
+    repo_dir.mkdir()
+    _git(repo_dir, "init", "-q", "-b", "main")
+    (repo_dir / "index.rst").write_text("Hello\n")
+    _git(repo_dir, "add", "index.rst")
+    _git(repo_dir, "commit", "-q", "-m", "Initial commit")
+    (repo_dir / "_build").mkdir()
+    return repo_dir
+
+
+def test_find_git_dir(repo_dir, tmp_path):
+    (repo_dir / "doc").mkdir()
+    assert find_git_dir(str(repo_dir / "doc")) == str(repo_dir / ".git")
+    assert find_git_dir(str(tmp_path)) is None
+
+
+def test_read_git_state_key(repo_dir, tmp_path):
+    key = read_git_state_key(str(repo_dir))
+    assert key is not None
+    assert read_git_state_key(str(tmp_path)) is None
+
+    # Packing refs doesn't change the key
+    _git(repo_dir, "pack-refs", "--all")
+    assert read_git_state_key(str(repo_dir)) == key
+
+    # A new branch at the same commit changes the key
+    _git(repo_dir, "checkout", "-q", "-b", "tickets/DM-1")
+    branch_key = read_git_state_key(str(repo_dir))
+    assert branch_key != key
+
+    # Staging a change changes the key
+    (repo_dir / "index.rst").write_text("Changed\n")
+    _git(repo_dir, "add", "index.rst")
+    staged_key = read_git_state_key(str(repo_dir))
+    assert staged_key != branch_key
+
+    # Committing changes the key
+    _git(repo_dir, "commit", "-q", "-m", "Change")
+    assert read_git_state_key(str(repo_dir)) not in (staged_key, branch_key)
+
+
+def test_read_git_state_key_worktree(repo_dir, tmp_path):
+    worktree_dir = tmp_path / "worktree"
+    _git(repo_dir, "worktree", "add", "-q", "-b", "other", str(worktree_dir))
+    key = read_git_state_key(str(worktree_dir))
+    assert key is not None
+    assert key != read_git_state_key(str(repo_dir))
+
+
+def test_git_metadata_cache(repo_dir):
+    calls = []
+
+    def compute():
+        calls.append(None)
+        return datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    build_dir = str(repo_dir / "_build")
+    cache = GitMetadataCache(build_dir, repo_path=str(repo_dir))
+    assert cache.enabled
+    first = cache.get("date", compute)
+    assert (repo_dir / "_build" / CACHE_FILENAME).is_file()
+
+    cache = GitMetadataCache(build_dir, repo_path=str(repo_dir))
+    assert cache.get("date", compute) == first
+    assert cache.get("branch", lambda: "main") == "main"
+    assert len(calls) == 1
+
+    # A new commit invalidates the cache
+    (repo_dir / "index.rst").write_text("Changed\n")
+    _git(repo_dir, "commit", "-q", "-am", "Change")
+    cache = GitMetadataCache(build_dir, repo_path=str(repo_dir))
+    cache.get("date", compute)
+    assert len(calls) == 2
+
+
+def test_git_metadata_cache_without_build_dir(repo_dir):
+    cache = GitMetadataCache(
+        str(repo_dir / "missing"), repo_path=str(repo_dir)
+    )
+    assert not cache.enabled
+    assert cache.get("branch", lambda: "main") == "main"
+    assert not (repo_dir / "missing").exists()
+
+
+def test_cache_hit_skips_gitpython(repo_dir):
+    """Test that reading cached metadata doesn't import GitPython."""
+    script = textwrap.dedent(
+        """
+        import sys
+
+        from documenteer.sphinxconfig.gitcache import GitMetadataCache
+        from documenteer.sphinxconfig.utils import (
+            get_project_content_commit_date,
+            read_git_branch,
+        )
+
+        cache = GitMetadataCache("_build")
+        print(read_git_branch(cache=cache))
+        print(get_project_content_commit_date(cache=cache).isoformat())
+        print("git" in sys.modules)
+        """
+    )
+    env = dict(os.environ)
+    env.pop("TRAVIS", None)
+
+    def run():
+        return subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=str(repo_dir),
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        ).stdout.splitlines()
+
+    first = run()
+    assert first[0] == "main"
+    assert first[2] == "True"
+    second = run()
+    assert second[:2] == first[:2]
+    assert second[2] == "False"
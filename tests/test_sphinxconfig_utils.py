@@ -13,9 +13,11 @@ import pytest
 from documenteer.sphinxconfig.utils import (
     form_ltd_edition_name,
     get_filepaths_with_extension,
+    get_filepaths_with_extensions,
     get_project_content_commit_date,
     read_git_commit_timestamp,
     read_git_commit_timestamp_for_file,
+    read_git_commit_timestamps_for_files,
 )
 
 
@@ -72,3 +74,121 @@ def test_get_project_content_commit_date():
     print("repo_dir", repo_dir)
     commit_date = get_project_content_commit_date(root_dir=repo_dir)
     assert isinstance(commit_date, datetime)
+
+
+@pytest.fixture()
+def content_repo(tmp_path):
+    """A Git repository with content files committed at known dates."""
+    git = pytest.importorskip("git")
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+
+    def commit(paths, iso_date):
+        # Git's internal date format (seconds since the epoch and offset)
+        date = datetime.fromisoformat(iso_date)
+        date = "{} {}".format(int(date.timestamp()), date.strftime("%z"))
+        for path, text in paths.items():
+            full_path = tmp_path / path
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            full_path.write_text(text)
+        repo.index.add(list(paths))
+        repo.index.commit(
+            "Update {}".format(", ".join(paths)),
+            author_date=date,
+            commit_date=date,
+        )
+
+    commit(
+        {"index.rst": "a", "doc/page.rst": "a", "figures/plot.png": "a"},
+        "2020-01-01T00:00:00+00:00",
+    )
+    commit({"doc/page.rst": "b"}, "2020-02-01T00:00:00+00:00")
+    commit(
+        {"conf.py": "b", "doc/other page.rst": "b"},
+        "2020-03-01T00:00:00+00:00",
+    )
+    commit({"index.rst": "c"}, "2020-04-01T12:00:00+02:00")
+    return tmp_path
+
+
+def test_read_git_commit_timestamps_for_files(content_repo):
+    """Test that the single-pass reader matches the per-file reader."""
+    filepaths = [
+        "index.rst",
+        os.path.join("doc", "page.rst"),
+        os.path.join("doc", "other page.rst"),
+        os.path.join("figures", "plot.png"),
+    ]
+    timestamps = read_git_commit_timestamps_for_files(
+        filepaths + ["untracked.rst"], root_dir=str(content_repo)
+    )
+    assert sorted(timestamps) == sorted(filepaths)
+    for filepath in filepaths:
+        assert timestamps[filepath] == read_git_commit_timestamp_for_file(
+            filepath, repo_path=str(content_repo)
+        )
+    # The latest commit to a file is found even if it's the HEAD commit
+    assert timestamps["index.rst"].isoformat() == "2020-04-01T12:00:00+02:00"
+    assert timestamps[os.path.join("doc", "page.rst")].month == 2
+
+
+def test_read_git_commit_timestamps_for_files_subdir(content_repo):
+    """Test file paths relative to a sub-directory of the repository."""
+    timestamps = read_git_commit_timestamps_for_files(
+        ["page.rst"], root_dir=str(content_repo / "doc")
+    )
+    assert timestamps["page.rst"].month == 2
+
+
+def test_get_project_content_commit_date_repo(content_repo):
+    """Test that configuration files don't affect the content date."""
+    (content_repo / "README.rst").write_text("untracked")
+    commit_date = get_project_content_commit_date(
+        root_dir=str(content_repo), exclusions=["index.rst"]
+    )
+    assert commit_date.isoformat() == "2020-03-01T00:00:00+00:00"
+
+
+def test_get_filepaths_with_extensions(tmp_path):
+    """Test that the single-pass enumerator matches the per-extension
+    enumerator, less pruned directories.
+    """
+    for path in (
+        "index.rst",
+        "README.rst",
+        "figures/plot.PNG",
+        "figures/diagram.svg",
+        "notebooks/demo.ipynb",
+        "notebooks/nested/_build/page.rst",
+        "drafts/draft.rst",
+        "conf.py",
+        "_build/html/_images/plot.png",
+        ".git/description.rst",
+        "node_modules/pkg/README.rst",
+        "venv/lib/site.rst",
+    ):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    (tmp_path / "venv" / "pyvenv.cfg").write_text("")
+
+    extensions = ("rst", "png", "svg", "ipynb")
+    exclusions = ["README.rst", "drafts"]
+    filepaths = get_filepaths_with_extensions(
+        extensions, root_dir=str(tmp_path), exclusions=exclusions
+    )
+
+    expected = []
+    for extname in extensions:
+        expected += get_filepaths_with_extension(
+            extname, root_dir=str(tmp_path)
+        )
+    pruned = {"_build", ".git", "node_modules", "venv", "drafts"}
+    expected = [
+        p
+        for p in expected
+        if p != "README.rst" and not pruned.intersection(p.split(os.sep))
+    ]
+    assert sorted(filepaths) == sorted(expected)
+    assert os.path.join("figures", "plot.PNG") in filepaths
@@ -0,0 +1,159 @@
+"""Tests for the documenteer.sphinxext.bibtex module."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from sphinx.testing.path import path as SphinxPath
+from sphinxcontrib.bibtex.bibfile import parse_bibdata
+
+from documenteer.packagemetadata import Semver
+from documenteer.sphinxext.bibtex import BibCache, parse_bibdata_cached
+
+if TYPE_CHECKING:
+    from sphinx.testing.path import path
+
+ROOT = Path(__file__).parent / "roots" / "test-sphinxext-bibtex"
+BIBFILES = [ROOT / "strings.bib", ROOT / "refs.bib"]
+
+
+def test_parse_bibdata_cached(tmp_path: Path) -> None:
+    """Test that cached bib data matches bib data parsed by
+    sphinxcontrib-bibtex, including macros defined in an earlier bib file.
+    """
+    expected = parse_bibdata(BIBFILES, "utf-8-sig")
+
+    cache = BibCache(str(tmp_path / "cache"))
+    first = parse_bibdata_cached(BIBFILES, "utf-8-sig", cache)
+    assert cache.stats == {"hits": 0, "misses": 2}
+
+    cache = BibCache(str(tmp_path / "cache"))
+    second = parse_bibdata_cached(BIBFILES, "utf-8-sig", cache)
+    assert cache.stats == {"hits": 2, "misses": 0}
+
+    for bibdata in (first, second):
+        assert bibdata.bibfiles == expected.bibfiles
+        assert list(bibdata.data.entries) == list(expected.data.entries)
+        assert bibdata.data.entries["Jones2021"].fields["journal"] == (
+            "Astronomical Journal"
+        )
+
+
+def test_bib_cache_changed_macros(tmp_path: Path) -> None:
+    """Test that a bib file is re-parsed when the macros defined by an
+    earlier bib file change.
+    """
+    strings = tmp_path / "strings.bib"
+    refs = tmp_path / "refs.bib"
+    strings.write_text('@string{aj = "AJ"}\n')
+    refs.write_text((ROOT / "refs.bib").read_text())
+
+    cache = BibCache(str(tmp_path / "cache"))
+    bibdata = parse_bibdata_cached([strings, refs], "utf-8-sig", cache)
+    assert bibdata.data.entries["Jones2021"].fields["journal"] == "AJ"
+
+    strings.write_text('@string{aj = "The Astronomical Journal"}\n')
+    cache = BibCache(str(tmp_path / "cache"))
+    bibdata = parse_bibdata_cached([strings, refs], "utf-8-sig", cache)
+    assert cache.stats == {"hits": 0, "misses": 2}
+    assert bibdata.data.entries["Jones2021"].fields["journal"] == (
+        "The Astronomical Journal"
+    )
+
+    cache.prune()
+    assert len(list((tmp_path / "cache").glob("*.pickle"))) == 2
+
+
+def test_bibtex_build_uses_cache(make_app: Any, tmp_path: Path) -> None:
+    """Test that a fresh build of a project loads unchanged bib files from
+    the cache.
+    """
+    srcdir: path = SphinxPath(str(tmp_path / "src"))
+    SphinxPath(str(ROOT)).copytree(srcdir)
+
+    app = make_app("html", srcdir=srcdir, freshenv=True)
+    app.build()
+    assert "0 of 2 bib files loaded from cache" in app._status.getvalue()
+
+    app = make_app("html", srcdir=srcdir, freshenv=True)
+    app.build()
+    assert "2 of 2 bib files loaded from cache" in app._status.getvalue()
+    assert "bibliography data error" not in app._warning.getvalue()
+    html = (Path(app.outdir) / "index.html").read_text()
+    assert "Another paper" in html
+    assert "https://ls.st/LDM-151" in html
+
+
+def test_bibtex_cache_disabled(make_app: Any, tmp_path: Path) -> None:
+    """Test that the cache can be disabled."""
+    srcdir: path = SphinxPath(str(tmp_path / "src"))
+    SphinxPath(str(ROOT)).copytree(srcdir)
+    app = make_app(
+        "html",
+        srcdir=srcdir,
+        freshenv=True,
+        confoverrides={"documenteer_bibtex_cache": False},
+    )
+    app.build()
+    assert "loaded from cache" not in app._status.getvalue()
+    assert not (Path(app.doctreedir) / "bibtex-cache").exists()
+
+
+def test_bibtex_cache_old_version(
+    make_app: Any, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the stock domain is used with sphinxcontrib-bibtex versions
+    that the cache doesn't support.
+    """
+    monkeypatch.setattr(
+        "documenteer.sphinxext.bibtex.get_package_version_semver",
+        lambda name: Semver.parse("2.0.0"),
+    )
+    srcdir: path = SphinxPath(str(tmp_path / "src"))
+    SphinxPath(str(ROOT)).copytree(srcdir)
+    app = make_app("html", srcdir=srcdir, freshenv=True)
+    app.build()
+    assert "loaded from cache" not in app._status.getvalue()
+    assert "Another paper" in (Path(app.outdir) / "index.html").read_text()
+
+
+@pytest.mark.parametrize("source_modified", [False, True])
+def test_bibtex_stale_subset(
+    make_app: Any, tmp_path: Path, source_modified: bool
+) -> None:
+    """Test that the full bib files are used instead of a subset that
+    doesn't contain every cited key, but only if a source file was modified
+    after the subset.
+    """
+    srcdir: path = SphinxPath(str(tmp_path / "src"))
+    SphinxPath(str(ROOT)).copytree(srcdir)
+    # A subset of refs.bib from before LDM-151 was cited
+    refs = (ROOT / "refs.bib").read_text()
+    subset = Path(srcdir) / "subset.bib"
+    subset.write_text(refs[: refs.index("@docushare")])
+    index_mtime = (Path(srcdir) / "index.rst").stat().st_mtime
+    subset_mtime = index_mtime - 10 if source_modified else index_mtime + 10
+    os.utime(subset, (subset_mtime, subset_mtime))
+
+    app = make_app(
+        "html",
+        srcdir=srcdir,
+        freshenv=True,
+        confoverrides={
+            "bibtex_bibfiles": ["strings.bib", "subset.bib"],
+            "documenteer_bibtex_subsets": {"subset.bib": ["refs.bib"]},
+        },
+    )
+
+    if source_modified:
+        assert app.config.bibtex_bibfiles == ["strings.bib", "refs.bib"]
+        assert "cited keys LDM-151" in app._warning.getvalue()
+        app.build()
+        html = (Path(app.outdir) / "index.html").read_text()
+        assert "https://ls.st/LDM-151" in html
+    else:
+        assert app.config.bibtex_bibfiles == ["strings.bib", "subset.bib"]
+        assert "cited keys" not in app._warning.getvalue()
@@ -0,0 +1,62 @@
+"""Tests for documenteer.sphinxext.docnameindex."""
+
+from documenteer.sphinxext.docnameindex import (
+    DocnameIndex,
+    _build_index,
+    _drop_index,
+    get_docname_index,
+)
+
+DOCNAMES = [
+    "index",
+    "modules/lsst.afw/index",
+    "modules/lsst.afw/tasks/lsst.afw.Task",
+    "modules/lsst.pipe.tasks/index",
+    "modules/lsst.pipe.tasks/tasks/lsst.pipe.tasks.A",
+    "modules/lsst.pipe.tasks/tasks/lsst.pipe.tasks.B",
+    "modules-extra/index",
+    "packages/afw/index",
+    "py-api/lsst.afw.Exposure",
+]
+
+
+def test_prefixed():
+    index = DocnameIndex(reversed(DOCNAMES))
+    assert len(index) == len(DOCNAMES)
+    assert index.prefixed("modules/lsst.pipe.tasks/tasks") == [
+        "modules/lsst.pipe.tasks/tasks/lsst.pipe.tasks.A",
+        "modules/lsst.pipe.tasks/tasks/lsst.pipe.tasks.B",
+    ]
+    assert index.prefixed("modules/lsst.meas") == []
+    assert index.prefixed("zzz") == []
+    assert len(index.prefixed("")) == len(DOCNAMES)
+
+
+def test_index_pages():
+    index = DocnameIndex(DOCNAMES)
+    assert index.index_pages("modules") == [
+        "modules/lsst.afw/index",
+        "modules/lsst.pipe.tasks/index",
+    ]
+    assert index.index_pages("packages") == ["packages/afw/index"]
+
+
+class _Env:
+    """Stand-in for the build environment's ``found_docs``."""
+
+    def __init__(self, found_docs):
+        self.found_docs = found_docs
+
+
+def test_get_docname_index():
+    env = _Env(found_docs=set(DOCNAMES))
+    _build_index(None, env, [])
+    index = get_docname_index(env)
+    assert get_docname_index(env) is index
+
+    # After reading, the index is dropped and rebuilt on demand
+    _drop_index(None, env)
+    env.found_docs.add("packages/daf_butler/index")
+    rebuilt = get_docname_index(env)
+    assert rebuilt is not index
+    assert "packages/daf_butler/index" in rebuilt.index_pages("packages")
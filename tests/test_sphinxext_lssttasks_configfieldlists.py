@@ -0,0 +1,157 @@
+"""Tests for the config field render cache in
+``documenteer.sphinxext.lssttasks.configfieldlists``.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from docutils import nodes
+from docutils.frontend import OptionParser
+from docutils.parsers.rst import Parser
+from docutils.utils import new_document
+from sphinx import addnodes
+
+from documenteer.sphinxext.lssttasks import configfieldlists
+from documenteer.sphinxext.lssttasks.configfieldlists import (
+    clone_field_section,
+    render_field_section,
+)
+from documenteer.sphinxext.utils import make_section
+
+
+def _make_state(docname):
+    settings = OptionParser(components=(Parser,)).get_default_values()
+    document = new_document(docname, settings)
+    document.settings.env = SimpleNamespace(
+        docname=docname,
+        ref_context={"py:module": "example"},
+        config=SimpleNamespace(documenteer_lssttasks_render_cache=True),
+    )
+    return SimpleNamespace(document=document)
+
+
+def format_example_field(field_name, field, field_id, state, lineno):
+    format_example_field.calls += 1
+    title = nodes.title(text=field_name)
+    title += nodes.target("", "", ids=[field_id])
+    label = nodes.target("", "", names=["example-label"])
+    state.document.note_explicit_target(label)
+    para = nodes.paragraph()
+    para += nodes.reference("", "label", refid=label["ids"][0])
+    para += addnodes.pending_xref(
+        "", refdomain="py", reftype="obj", refdoc=state.document["source"]
+    )
+    section = make_section(
+        section_id=field_id + "-section", contents=[title, label, para]
+    )
+    return section
+
+
+@pytest.fixture
+def example_formatter():
+    configfieldlists._RENDER_CACHE.clear()
+    format_example_field.calls = 0
+    yield format_example_field
+    configfieldlists._RENDER_CACHE.clear()
+
+
+def test_clone_field_section(example_formatter):
+    state = _make_state("first")
+    section = example_formatter("field", None, "field-a", state, 1)
+
+    other_state = _make_state("second")
+    clone = clone_field_section(
+        section, "field-a", "field-b", other_state.document, "second"
+    )
+
+    assert section["ids"] == ["field-a-section"]
+    assert clone["ids"] == ["field-b-section"]
+    assert clone["names"] == ["field-b-section"]
+    assert clone.children[0].children[1]["ids"] == ["field-b"]
+
+    # The docstring's target is registered with the new document and the
+    # reference to it is updated
+    label = clone.children[1]
+    assert label["ids"][0] in other_state.document.ids
+    para = clone.children[2]
+    assert para.children[0]["refid"] == label["ids"][0]
+    assert para.children[1]["refdoc"] == "second"
+
+
+def test_render_field_section(example_formatter):
+    state = _make_state("first")
+    first = render_field_section(
+        example_formatter, "example.Config", "field", None, "a", state, 1
+    )
+    second_state = _make_state("second")
+    second = render_field_section(
+        example_formatter,
+        "example.Config",
+        "field",
+        None,
+        "b",
+        second_state,
+        1,
+    )
+
+    assert example_formatter.calls == 1
+    assert first["ids"] == ["a-section"]
+    assert second["ids"] == ["b-section"]
+    assert second is not first
+
+    stats = second_state.document.settings.env.lsst_configfield_render_stats
+    stats = stats["second"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 0
+    assert stats["seconds_saved"] >= 0.0
+
+
+def test_render_field_section_disabled(example_formatter):
+    for docname in ("first", "second"):
+        state = _make_state(docname)
+        config = state.document.settings.env.config
+        config.documenteer_lssttasks_render_cache = False
+        render_field_section(
+            example_formatter, "example.Config", "field", None, "a", state, 1
+        )
+    assert example_formatter.calls == 2
+
+
+def test_merge_render_stats():
+    """Test that statistics inherited by a forked reader process aren't
+    merged twice.
+    """
+    config = SimpleNamespace(documenteer_lssttasks_render_cache=True)
+    app = SimpleNamespace(config=config)
+    env = SimpleNamespace()
+    first_chunk = SimpleNamespace(
+        lsst_configfield_render_stats={
+            "a": {"hits": 2, "misses": 1, "seconds_saved": 0.5}
+        }
+    )
+    configfieldlists._merge_render_stats(app, env, {"a"}, first_chunk)
+
+    # Forked after the first chunk was merged
+    second_chunk = SimpleNamespace(
+        lsst_configfield_render_stats={
+            "a": {"hits": 2, "misses": 1, "seconds_saved": 0.5},
+            "b": {"hits": 3, "misses": 0, "seconds_saved": 0.25},
+        }
+    )
+    configfieldlists._merge_render_stats(app, env, {"b"}, second_chunk)
+    assert env.lsst_configfield_render_stats == {
+        "a": {"hits": 2, "misses": 1, "seconds_saved": 0.5},
+        "b": {"hits": 3, "misses": 0, "seconds_saved": 0.25},
+    }
+
+
+@pytest.mark.sphinx("html", testroot="lssttasks-configfields")
+def test_standalone_config_fields_ids(stub_pex_config, app):
+    """Test that the lsst-config-fields directive builds field IDs from the
+    config class's own name, not the (re-exported) name in its argument.
+    """
+    app.build()
+    field_id = "lsst-configfield-configtreestubs-outputconfig-compress"
+    assert field_id in app.env.get_domain("lsst").configfields
+    html = (app.outdir / "index.html").read_text()
+    assert 'id="{}"'.format(field_id) in html
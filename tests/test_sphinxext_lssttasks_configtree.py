@@ -0,0 +1,111 @@
+"""Tests for the ``documenteer.sphinxext.lssttasks.configtree`` module.
+"""
+
+import lxml.html
+import pytest
+
+from documenteer.sphinxext.lssttasks.configtree import (
+    ConfigTreeDirective,
+    get_config_tree_fields,
+)
+
+
+@pytest.mark.sphinx("html", testroot="lssttasks-configtree")
+def test_config_tree_html(stub_pex_config, app, monkeypatch):
+    """Test the HTML rendering of the lsst-task-config-tree directive."""
+    rendered = []
+    make_config_nodes = ConfigTreeDirective._make_config_nodes
+
+    def record_make_config_nodes(self, config_class, path, ancestors):
+        rendered.append(config_class.__name__)
+        return make_config_nodes(self, config_class, path, ancestors)
+
+    monkeypatch.setattr(
+        ConfigTreeDirective, "_make_config_nodes", record_make_config_nodes
+    )
+    app.build()
+    doc = lxml.html.document_fromstring(
+        (app.outdir / "index.html").read_text()
+    )
+
+    tree = doc.cssselect("div.lsst-config-tree")[0]
+    branches = tree.xpath("./details")
+    summaries = [
+        b.xpath("./summary")[0].text_content().split() for b in branches
+    ]
+    assert summaries == [
+        ["backgroundDetection", "configtreestubs.DetectionTask"],
+        ["detection", "configtreestubs.DetectionTask"],
+        ["measurement"],
+        ["output", "configtreestubs.OutputConfig"],
+    ]
+    choices = branches[2].xpath("./details/summary")
+    assert [c.text_content() for c in choices] == [
+        "'detect' configtreestubs.DetectionTask",
+        '"it\'s" configtreestubs.MeasurementTask',
+    ]
+
+    # The fields of the nested configurations are inside the branches,
+    # with IDs based on the path through the tree
+    prefix = "#lsst-config-tree-configtreestubs-toptask-"
+    assert branches[0].cssselect(prefix + "backgrounddetection-threshold")
+    assert branches[1].cssselect(prefix + "detection-threshold")
+    assert branches[2].cssselect(prefix + "measurement-detect-threshold")
+    assert branches[2].cssselect(prefix + "measurement-it-s-radius")
+    assert branches[3].cssselect(prefix + "output-compress")
+    # Fields without nested configurations aren't branches
+    dowrite = tree.cssselect(prefix + "dowrite")
+    assert dowrite
+    assert not dowrite[0].xpath("ancestor::details")
+
+    # The DetectionConfig branch is rendered once, and cloned for the other
+    # places it appears
+    assert rendered.count("DetectionConfig") == 1
+
+
+def test_get_config_tree_fields_registry_keys(stub_pex_config):
+    """Test that registry choices keep their names, including quotes, for
+    the IDs of their fields.
+    """
+    import configtreestubs
+
+    tree_fields = {
+        f.name: f for f in get_config_tree_fields(configtreestubs.TopConfig)
+    }
+    children = tree_fields["measurement"].children
+    assert [child.label for child in children] == ["'detect'", '"it\'s"']
+    assert [child.key for child in children] == ["detect", "it's"]
+
+
+def test_get_config_tree_fields():
+    """Test get_config_tree_fields() using ProcessCcdConfig."""
+    # Need the LSST Science Pipelines installed for this test
+    pytest.importorskip("lsst.pipe.tasks")
+    from lsst.pipe.tasks.characterizeImage import CharacterizeImageTask
+    from lsst.pipe.tasks.processCcd import ProcessCcdConfig
+
+    tree_fields = {f.name: f for f in get_config_tree_fields(ProcessCcdConfig)}
+    assert list(tree_fields) == sorted(tree_fields)
+
+    children = tree_fields["charImage"].children
+    assert len(children) == 1
+    assert children[0].label == ""
+    assert children[0].reftype == "task"
+    assert children[0].target_name == ".".join(
+        (CharacterizeImageTask.__module__, CharacterizeImageTask.__name__)
+    )
+    assert children[0].config_class is CharacterizeImageTask.ConfigClass
+
+
+def test_get_config_tree_fields_memoized():
+    """Test that each config class is only introspected once."""
+    pytest.importorskip("lsst.pipe.tasks")
+    from lsst.pipe.tasks.processCcd import ProcessCcdConfig
+
+    get_config_tree_fields.cache_clear()
+    first = get_config_tree_fields(ProcessCcdConfig)
+    second = get_config_tree_fields(ProcessCcdConfig)
+    assert first is second
+    info = get_config_tree_fields.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
@@ -0,0 +1,132 @@
+"""Tests for documenteer.sphinxext.lssttasks.domain (the lsst domain and its
+cross-reference roles).
+"""
+
+import pickle
+
+import lxml.html
+import pytest
+from sphinx.util.inventory import InventoryFile
+
+from documenteer.sphinxext.lssttasks.domain import TaskTopic
+
+
+def _read_html(app, docname):
+    path = app.outdir / f"{docname}.html"
+    return lxml.html.document_fromstring(path.read_text())
+
+
+@pytest.mark.parametrize("parallel", [0, 2])
+@pytest.mark.sphinx("html", testroot="lssttasks-domain")
+def test_domain_references(make_app, app_params, parallel):
+    """Test that references to topics resolve, both in serial and parallel
+    builds.
+    """
+    args, kwargs = app_params
+    app = make_app(*args, parallel=parallel, freshenv=True, **kwargs)
+    app.build()
+
+    doc = _read_html(app, "index")
+    links = {
+        a.text_content(): a.attrib["href"]
+        for a in doc.cssselect("li > p > a.reference.internal")
+    }
+    assert (
+        links["json.decoder.JSONDecoder"]
+        == "configurable.html#lsst-task-json-decoder-jsondecoder"
+    )
+    assert (
+        links["JSONDecoder"]
+        == "configurable.html#lsst-task-json-decoder-jsondecoder"
+    )
+    assert (
+        links["Custom text"]
+        == "config.html#lsst-config-collections-ordereddict"
+    )
+    assert (
+        links["collections.OrderedDict"]
+        == "config.html#lsst-config-collections-ordereddict"
+    )
+
+    # The unresolved reference is rendered as a literal, with a warning
+    assert "lsst.example.MissingTask" not in links
+    literals = [n.text_content() for n in doc.cssselect("code")]
+    assert "lsst.example.MissingTask" in literals
+    warnings = app._warning.getvalue()
+    assert "lsst-task could not find a reference to" in warnings
+    assert "lsst.example.MissingTask" in warnings
+
+    # References from other documents (read by other processes in a parallel
+    # build) also resolve
+    filler = _read_html(app, "filler5")
+    hrefs = [a.attrib["href"] for a in filler.cssselect("a.reference")]
+    assert "config.html#lsst-config-collections-ordereddict" in hrefs
+
+    # The topic listing links to the configurable topic
+    listing = doc.cssselect("dl dt a")
+    assert [a.text_content() for a in listing] == ["JSONDecoder"]
+
+
+@pytest.mark.sphinx("html", testroot="lssttasks-domain")
+def test_domain_clear_doc(app):
+    """Test that topics are removed from the domain when their document is
+    cleared.
+    """
+    app.build()
+    domain = app.env.get_domain("lsst")
+    assert "lsst-config-collections-ordereddict" in domain.topics
+
+    domain.clear_doc("config")
+    assert "lsst-config-collections-ordereddict" not in domain.topics
+    assert "lsst-task-json-decoder-jsondecoder" in domain.topics
+
+
+@pytest.mark.sphinx("html", testroot="lssttasks-domain")
+def test_domain_inventory(app):
+    """Test that topics are included in objects.inv."""
+    app.build()
+    with open(app.outdir / "objects.inv", "rb") as f:
+        inventory = InventoryFile.load(f, "", lambda *args: args[1])
+
+    assert inventory["lsst:task"]["json.decoder.JSONDecoder"][2] == (
+        "configurable.html#lsst-task-json-decoder-jsondecoder"
+    )
+    assert inventory["lsst:config"]["collections.OrderedDict"][2] == (
+        "config.html#lsst-config-collections-ordereddict"
+    )
+
+
+@pytest.mark.sphinx("html", testroot="lssttasks-domain")
+def test_domain_topic_records(app):
+    """Test that the topic directives register plain `TaskTopic` records that
+    can be looked up by reference target.
+    """
+    app.build()
+    domain = app.env.get_domain("lsst")
+
+    config_topic = domain.topics["lsst-config-collections-ordereddict"]
+    assert isinstance(config_topic, TaskTopic)
+    assert config_topic.docname == "config"
+    assert config_topic.target_id == "lsst-config-collections-ordereddict"
+    assert config_topic.fully_qualified_name == "collections.OrderedDict"
+    assert config_topic.type == "Config"
+    assert config_topic.summary == "Summary of the OrderedDict config topic."
+
+    task_topic = domain.topics["lsst-task-json-decoder-jsondecoder"]
+    assert isinstance(task_topic, TaskTopic)
+    assert task_topic.docname == "configurable"
+    assert task_topic.fully_qualified_name == "json.decoder.JSONDecoder"
+    assert task_topic.type == "Configurable"
+
+    # Records hold only plain data, so they pickle without any doctree
+    assert pickle.loads(pickle.dumps(config_topic)) == config_topic
+
+    assert (
+        domain._find_record("config", "collections.OrderedDict")
+        == config_topic
+    )
+    assert (
+        domain._find_record("task", "json.decoder.JSONDecoder") == task_topic
+    )
+    assert domain._find_record("task", "collections.OrderedDict") is None
+    assert domain._find_record("config", "lsst.example.Missing") is None
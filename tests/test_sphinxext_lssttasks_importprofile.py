@@ -0,0 +1,104 @@
+"""Tests for documenteer.sphinxext.lssttasks.importprofile."""
+
+import json
+
+import pytest
+
+from documenteer.sphinxext.lssttasks import taskutils
+from documenteer.sphinxext.lssttasks.importprofile import (
+    aggregate_import_profile,
+    format_import_profile,
+)
+
+
+def test_format_import_profile():
+    records = {
+        "fast.module": {
+            "seconds": 0.001,
+            "calls": 3,
+            "new_modules": 0,
+            "docname": "a",
+        },
+        "slow.module": {
+            "seconds": 2.5,
+            "calls": 1,
+            "new_modules": 120,
+            "docname": "b",
+        },
+    }
+    report = format_import_profile(records, limit=1)
+    lines = report.splitlines()
+    assert lines[0] == "lssttasks import profile: 2 modules, 2.501 s total"
+    assert len(lines) == 2
+    assert "slow.module (120 new modules, first used in b)" in lines[1]
+
+
+def test_aggregate_import_profile():
+    records = {
+        "b": {"json": {"seconds": 0.5, "calls": 1, "new_modules": 3}},
+        "a": {
+            "json": {"seconds": 0.25, "calls": 2, "new_modules": 0},
+            "csv": {"seconds": 0.1, "calls": 1, "new_modules": 1},
+        },
+    }
+    assert aggregate_import_profile(records) == {
+        "json": {
+            "seconds": 0.75,
+            "calls": 3,
+            "new_modules": 3,
+            "docname": "a",
+        },
+        "csv": {"seconds": 0.1, "calls": 1, "new_modules": 1, "docname": "a"},
+    }
+
+
+def test_import_profile_parallel(make_app, rootdir, sphinx_test_tempdir):
+    """Test that a parallel build, with more reader chunks than processes,
+    records the same imports as a serial build.
+
+    Sphinx forks the reader processes of later chunks after the records of
+    earlier chunks were merged, so they must not be merged twice.
+    """
+    srcdir = sphinx_test_tempdir / "lssttasks-importprofile"
+    if not srcdir.exists():
+        (rootdir / "test-lssttasks-importprofile").copytree(srcdir)
+
+    def calls(app):
+        records = aggregate_import_profile(app.env.lsst_import_profile)
+        return {name: record["calls"] for name, record in records.items()}
+
+    serial_app = make_app("html", srcdir=srcdir, freshenv=True)
+    serial_app.build()
+    serial_calls = calls(serial_app)
+    assert len(serial_app.env.lsst_import_profile) == 9
+
+    # 10 documents in 3 processes are read in 4 chunks
+    parallel_app = make_app("html", srcdir=srcdir, freshenv=True, parallel=3)
+    parallel_app.build(force_all=True)
+    assert parallel_app.parallel == 3
+    assert calls(parallel_app) == serial_calls
+    assert sorted(parallel_app.env.lsst_import_profile) == sorted(
+        serial_app.env.lsst_import_profile
+    )
+
+
+@pytest.mark.sphinx(
+    "html",
+    testroot="lssttasks-domain",
+    freshenv=True,
+    confoverrides={
+        "documenteer_lssttasks_import_profile": True,
+        "documenteer_lssttasks_import_profile_json": "import-profile.json",
+    },
+)
+def test_import_profile_build(app, status):
+    app.build()
+
+    # The import hook is removed when the build finishes
+    assert taskutils._import_hook is None
+
+    assert "lssttasks import profile" in status.getvalue()
+    data = json.loads((app.confdir / "import-profile.json").read_text())
+    records = {record["module"]: record for record in data}
+    assert records["json.decoder"]["docname"] == "configurable"
+    assert records["json.decoder"]["calls"] >= 1
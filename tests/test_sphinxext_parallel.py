@@ -0,0 +1,55 @@
+"""Tests that documenteer's Sphinx extensions produce the same HTML in
+serial and parallel (``sphinx-build -j``) builds.
+"""
+
+from pathlib import Path
+
+import pytest
+
+
+def _read_html(app):
+    outdir = Path(app.outdir)
+    return {
+        path.relative_to(outdir).as_posix(): path.read_text()
+        for path in sorted(outdir.glob("**/*.html"))
+    }
+
+
+@pytest.mark.parametrize(
+    "testroot", ["sphinxext-parallel", "lssttasks-domain"]
+)
+def test_parallel_build_matches_serial(
+    make_app, rootdir, sphinx_test_tempdir, testroot
+):
+    """Build a test root serially and with four processes, and compare the
+    HTML output.
+    """
+    srcdir = sphinx_test_tempdir / testroot
+    if not srcdir.exists():
+        (rootdir / ("test-" + testroot)).copytree(srcdir)
+
+    serial_app = make_app("html", srcdir=srcdir, freshenv=True)
+    serial_app.build()
+    serial_html = _read_html(serial_app)
+
+    parallel_app = make_app("html", srcdir=srcdir, freshenv=True, parallel=4)
+    parallel_app.build(force_all=True)
+    assert parallel_app.parallel == 4
+    parallel_html = _read_html(parallel_app)
+
+    assert "index.html" in serial_html
+    assert serial_html.keys() == parallel_html.keys()
+    for name, serial_text in serial_html.items():
+        assert parallel_html[name] == serial_text, name
+
+
+@pytest.mark.sphinx("html", testroot="sphinxext-parallel")
+def test_sphinxext_parallel_metadata(app):
+    """Test that every extension loaded by documenteer.sphinxext declares
+    itself parallel-safe.
+    """
+    for name, extension in app.extensions.items():
+        if not name.startswith("documenteer"):
+            continue
+        assert extension.parallel_read_safe is True, name
+        assert extension.parallel_write_safe is True, name
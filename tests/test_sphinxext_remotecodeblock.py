@@ -0,0 +1,74 @@
+"""Tests for the documenteer.sphinxext.remotecodeblock extension, using a
+local HTTP server.
+"""
+
+import pytest
+from sphinx.testing.path import path
+
+from documenteer.sphinxext.remotecodeblock import REMOTE_CODE_BLOCK_PATTERN
+
+
+def test_remote_code_block_pattern():
+    source = (
+        ".. remote-code-block:: https://example.com/a.py\n"
+        "   :language: python\n"
+        "\n"
+        "```{remote-code-block} https://example.com/b.py\n"
+        "```\n"
+        "Text about remote-code-block:: https://example.com/c.py\n"
+    )
+    urls = [m.group("url") for m in REMOTE_CODE_BLOCK_PATTERN.finditer(source)]
+    assert urls == ["https://example.com/a.py", "https://example.com/b.py"]
+
+
+@pytest.fixture
+def remote_srcdir(tmp_path, http_server):
+    """A Sphinx project whose pages include code from ``http_server``."""
+    for name in ("a", "b", "c"):
+        http_server.content["/{}.py".format(name)] = "{} = 1\n".format(name)
+    (tmp_path / "conf.py").write_text(
+        'extensions = ["documenteer.sphinxext.remotecodeblock"]\n'
+    )
+    (tmp_path / "index.rst").write_text(
+        "Remote\n"
+        "======\n"
+        "\n"
+        + "".join(
+            ".. remote-code-block:: {}/{}.py\n\n".format(http_server.url, name)
+            for name in ("a", "b", "c", "a")
+        )
+    )
+    return path(str(tmp_path))
+
+
+def test_prefetch(make_app, remote_srcdir, http_server):
+    app = make_app(
+        "html",
+        srcdir=remote_srcdir,
+        confoverrides={
+            "remote_code_block_cache": False,
+            "remote_code_block_prefetch_concurrency": 4,
+        },
+    )
+    app.build()
+
+    # Each URL is requested once, by the prefetcher
+    assert sorted(p for p, _ in http_server.requests) == [
+        "/a.py",
+        "/b.py",
+        "/c.py",
+    ]
+    html = (app.outdir / "index.html").read_text()
+    for name in ("a", "b", "c"):
+        assert '{}</span> <span class="o">=</span>'.format(name) in html
+    assert "prefetched 3 of 3 URLs" in app._status.getvalue()
+
+
+def test_rebuild_uses_cache(make_app, remote_srcdir, http_server):
+    app = make_app("html", srcdir=remote_srcdir)
+    app.build()
+    assert len(http_server.requests) == 3
+
+    app = make_app("html", srcdir=remote_srcdir, freshenv=True)
+    app.build(force_all=True)
+    assert len(http_server.requests) == 3
@@ -0,0 +1,111 @@
+"""Tests for the documenteer.sphinxrunner module."""
+
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from documenteer.sphinxrunner import run_sphinx
+
+
+@pytest.fixture()
+def project_dir(tmp_path: Path) -> Path:
+    project_dir = tmp_path / "doc"
+    project_dir.mkdir()
+    (project_dir / "conf.py").write_text('project = "Example"\n')
+    (project_dir / "index.rst").write_text("Example\n=======\n\nHello.\n")
+    return project_dir
+
+
+def _run(
+    caplog: pytest.LogCaptureFixture, project_dir: Path, **kwargs: object
+) -> List[str]:
+    """Run a build and return the full rebuild reasons that it logged."""
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="documenteer.sphinxrunner"):
+        assert run_sphinx(project_dir, **kwargs) == 0  # type: ignore
+    return [
+        r.getMessage()
+        for r in caplog.records
+        if r.name == "documenteer.sphinxrunner"
+        and r.getMessage().startswith("Full rebuild")
+    ]
+
+
+def test_incremental_build(
+    caplog: pytest.LogCaptureFixture, project_dir: Path
+) -> None:
+    reasons = _run(caplog, project_dir)
+    assert len(reasons) == 1
+    assert "no saved environment" in reasons[0]
+    assert (
+        project_dir / "_build" / ".doctrees" / "environment.pickle"
+    ).exists()
+    assert (project_dir / "_build" / "html" / "index.html").exists()
+
+    assert _run(caplog, project_dir) == []
+
+    reasons = _run(caplog, project_dir, fresh_env=True)
+    assert reasons == ["Full rebuild: a fresh environment was requested"]
+
+
+def test_config_changed(
+    caplog: pytest.LogCaptureFixture, project_dir: Path
+) -> None:
+    _run(caplog, project_dir)
+
+    with (project_dir / "conf.py").open("a") as f:
+        f.write('rst_epilog = ".. |name| replace:: Example"\n')
+    reasons = _run(caplog, project_dir)
+    assert len(reasons) == 1
+    assert "a configuration value changed" in reasons[0]
+    assert "rst_epilog" in reasons[0]
+
+    with (project_dir / "conf.py").open("a") as f:
+        f.write('html_title = "Another title"\n')
+    reasons = _run(caplog, project_dir)
+    assert len(reasons) == 1
+    assert "HTML configuration" in reasons[0]
+
+
+def test_external_doctree_dir(
+    caplog: pytest.LogCaptureFixture, project_dir: Path, tmp_path: Path
+) -> None:
+    doctree_dir = tmp_path / "cache" / "doctrees"
+    _run(caplog, project_dir, doctree_dir=doctree_dir)
+    assert (doctree_dir / "environment.pickle").exists()
+    assert not (project_dir / "_build" / ".doctrees").exists()
+
+    assert _run(caplog, project_dir, doctree_dir=str(doctree_dir)) == []
+
+
+def test_no_color_when_piped(project_dir: Path) -> None:
+    (project_dir / "broken.rst").write_text("Broken\n======\n\n:bad:`x`\n")
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if k not in ("FORCE_COLOR", "NO_COLOR")
+    }
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from documenteer.sphinxrunner import run_sphinx; "
+            "sys.exit(run_sphinx(sys.argv[1]))",
+            str(project_dir),
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        text=True,
+        check=True,
+    )
+    assert "build succeeded" in result.stdout
+    assert "Unknown interpreted text role" in result.stderr
+    assert "\x1b[" not in result.stdout + result.stderr
@@ -0,0 +1,119 @@
+"""Tests for the documenteer.startupprofile module."""
+
+from __future__ import annotations
+
+import json
+import pstats
+import shutil
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import pytest
+from sphinx.events import EventManager
+from sphinx.registry import SphinxComponentRegistry
+
+from documenteer.startupprofile import StartupProfiler
+
+ROOTS = Path(__file__).parent / "roots"
+
+
+def _copy_root(name: str, tmp_path: Path) -> Path:
+    src_dir = tmp_path / name
+    shutil.copytree(ROOTS / name, src_dir)
+    return src_dir
+
+
+def test_startup_profiler(tmp_path: Path) -> None:
+    src_dir = _copy_root("test-sphinxext-parallel", tmp_path)
+    load_extension = SphinxComponentRegistry.load_extension
+    connect = EventManager.connect
+
+    profiler = StartupProfiler(str(src_dir))
+    timings = profiler.run(cprofile_path=str(tmp_path / "startup.pstats"))
+
+    # The Sphinx internals are restored
+    assert SphinxComponentRegistry.load_extension is load_extension
+    assert EventManager.connect is connect
+
+    assert timings[0].kind == "conf"
+    assert timings[0].name == str(src_dir / "conf.py")
+    by_name = {t.name: t for t in profiler.ranked()}
+    assert by_name["documenteer.sphinxext"].kind == "extension"
+    # Extensions set up by other extensions are nested
+    packagetoctree = by_name["documenteer.sphinxext"]
+    assert "documenteer.sphinxext.docnameindex" in [
+        t.name for t in packagetoctree.children
+    ]
+    assert packagetoctree.self_seconds <= packagetoctree.seconds
+    assert "documenteer.sphinxext.remotecodeblock.setup_cache" in by_name
+    assert by_name[
+        "documenteer.sphinxext.remotecodeblock.setup_cache"
+    ].kind == ("builder-inited")
+    assert by_name["load build environment"].kind == "env"
+
+    ranked = profiler.ranked()
+    assert [t.self_seconds for t in ranked] == sorted(
+        (t.self_seconds for t in ranked), reverse=True
+    )
+    table = profiler.format_table(limit=5)
+    assert len(table.splitlines()) == 7
+    assert "Total startup time" in table
+
+    stats = pstats.Stats(str(tmp_path / "startup.pstats"))
+    assert stats.total_calls > 0  # type: ignore[attr-defined]
+
+
+def test_startup_profiler_config_inited(tmp_path: Path) -> None:
+    src_dir = _copy_root("test-sphinxext-bibtex", tmp_path)
+    profiler = StartupProfiler(str(src_dir))
+    profiler.run()
+    by_name = {t.name: t for t in profiler.ranked()}
+    handler = by_name["documenteer.sphinxext.bibtex.install_bib_cache"]
+    assert handler.kind == "config-inited"
+
+
+def test_connect_without_priority(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the instrumented connect with the Sphinx 2 signature, which
+    doesn't have a priority argument.
+    """
+    calls: List[Tuple[str, Callable]] = []
+
+    def connect(events: Any, name: str, callback: Callable) -> int:
+        calls.append((name, callback))
+        return 1
+
+    monkeypatch.setattr(EventManager, "connect", connect)
+    profiler = StartupProfiler(str(tmp_path))
+    with profiler._instrument():
+        instrumented = getattr(EventManager, "connect")
+        assert instrumented is not connect
+        listener_id = instrumented(None, "builder-inited", print)
+    assert listener_id == 1
+    assert calls[0][0] == "builder-inited"
+    assert getattr(EventManager, "connect") is connect
+
+
+def test_write_speedscope(tmp_path: Path) -> None:
+    src_dir = _copy_root("test-sphinxext-parallel", tmp_path)
+    profiler = StartupProfiler(str(src_dir))
+    profiler.run()
+    path = tmp_path / "startup.speedscope.json"
+    profiler.write_speedscope(str(path))
+
+    data = json.loads(path.read_text())
+    frames = data["shared"]["frames"]
+    events = data["profiles"][0]["events"]
+    # Events are balanced and ordered
+    stack = []
+    at = 0.0
+    for event in events:
+        assert event["at"] >= at
+        at = event["at"]
+        if event["type"] == "O":
+            stack.append(event["frame"])
+        else:
+            assert stack.pop() == event["frame"]
+    assert not stack
+    assert any(f["name"].startswith("documenteer.sphinxext ") for f in frames)
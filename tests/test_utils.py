@@ -0,0 +1,34 @@
+"""Tests for the documenteer.utils module."""
+
+from __future__ import annotations
+
+import os
+import stat
+from pathlib import Path
+
+from documenteer.utils import atomic_write
+
+
+def _mode(path: Path) -> int:
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+def test_atomic_write_mode(tmp_path: Path) -> None:
+    umask = os.umask(0o022)
+    try:
+        path = tmp_path / "new.bib"
+        atomic_write(path, b"new")
+        assert path.read_bytes() == b"new"
+        assert _mode(path) == 0o644
+
+        # An existing file keeps its mode
+        path.chmod(0o640)
+        atomic_write(str(path), b"updated")
+        assert path.read_bytes() == b"updated"
+        assert _mode(path) == 0o640
+
+        atomic_write(path, b"explicit", mode=0o600)
+        assert _mode(path) == 0o600
+    finally:
+        os.umask(umask)
+    assert [p.name for p in tmp_path.iterdir()] == ["new.bib"]
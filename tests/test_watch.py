@@ -0,0 +1,120 @@
+"""Tests for the documenteer.watch module."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import urllib.request
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from documenteer.watch import (
+    RELOAD_PATH,
+    LiveReloadServer,
+    PollingWatcher,
+    find_watch_dirs,
+    watch_and_rebuild,
+)
+
+
+class StopWatching(BaseException):
+    """Raised by a test build function to stop `watch_and_rebuild`."""
+
+
+@pytest.fixture()
+def project_dir(tmp_path: Path) -> Path:
+    project_dir = tmp_path / "project"
+    (project_dir / "_build" / "html").mkdir(parents=True)
+    (project_dir / "index.rst").write_text("Hello\n")
+    return project_dir
+
+
+def test_find_watch_dirs(project_dir: Path, tmp_path: Path) -> None:
+    package_doc_dir = tmp_path / "package" / "doc"
+    (package_doc_dir / "lsst.example").mkdir(parents=True)
+    (project_dir / "modules").mkdir()
+    os.symlink(
+        package_doc_dir / "lsst.example",
+        project_dir / "modules" / "lsst.example",
+    )
+    # A link inside the project doesn't add a watch directory
+    (project_dir / "_static").mkdir()
+    os.symlink(project_dir / "_static", project_dir / "static-link")
+
+    assert find_watch_dirs(str(project_dir)) == [
+        os.path.realpath(project_dir),
+        os.path.realpath(package_doc_dir / "lsst.example"),
+    ]
+
+
+def test_polling_watcher(project_dir: Path) -> None:
+    watcher = PollingWatcher([str(project_dir)], interval=0.01)
+    assert watcher.get_changes(timeout=0.05) == set()
+
+    # Build products and editor files are ignored
+    (project_dir / "_build" / "html" / "index.html").write_text("Hello")
+    (project_dir / ".index.rst.swp").write_text("")
+    (project_dir / "index.rst~").write_text("")
+    assert watcher.get_changes(timeout=0.05) == set()
+
+    (project_dir / "new.rst").write_text("New\n")
+    os.remove(project_dir / "index.rst")
+    assert watcher.get_changes(timeout=1.0) == {
+        str(project_dir.resolve() / "new.rst"),
+        str(project_dir.resolve() / "index.rst"),
+    }
+
+
+def test_live_reload_server(project_dir: Path) -> None:
+    html_dir = project_dir / "_build" / "html"
+    (html_dir / "index.html").write_text("<html><body>Hello</body></html>")
+    (html_dir / "style.css").write_text("body {}")
+
+    server = LiveReloadServer(str(html_dir), port=0)
+    server.start()
+    try:
+        with urllib.request.urlopen(server.url) as response:
+            page = response.read().decode("utf-8")
+        assert RELOAD_PATH in page
+        assert page.index(RELOAD_PATH) < page.index("</body>")
+
+        with urllib.request.urlopen(server.url + "style.css") as response:
+            assert response.read() == b"body {}"
+
+        server.notify_build()
+        with urllib.request.urlopen(
+            server.url.rstrip("/") + RELOAD_PATH
+        ) as response:
+            assert json.load(response) == {"build": 1}
+    finally:
+        server.close()
+
+
+def test_watch_and_rebuild(project_dir: Path) -> None:
+    builds: List[int] = []
+
+    def build() -> int:
+        builds.append(1)
+        raise StopWatching()
+
+    def edit() -> None:
+        (project_dir / "index.rst").write_text("Hello, again\n")
+
+    timer = threading.Timer(0.5, edit)
+    timer.start()
+    try:
+        with pytest.raises(StopWatching):
+            watch_and_rebuild(
+                build,
+                [str(project_dir)],
+                html_dir=str(project_dir / "_build" / "html"),
+                port=0,
+                debounce=0.1,
+                polling=True,
+            )
+    finally:
+        timer.cancel()
+    assert builds == [1]